@@ -177,6 +177,11 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Janela do scheduler de sync: clientes são espalhados dentro dela (com jitter)
+ZABBIX_SYNC_WINDOW_SECONDS = int(os.getenv("ZABBIX_SYNC_WINDOW_SECONDS", "300"))
+ZABBIX_FULL_SYNC_WINDOW_SECONDS = int(os.getenv("ZABBIX_FULL_SYNC_WINDOW_SECONDS", "3600"))
+ZABBIX_SYNC_JITTER_SECONDS = int(os.getenv("ZABBIX_SYNC_JITTER_SECONDS", "30"))
+
 CELERY_BEAT_SCHEDULE = {
 
     "full-sync-diario-02h": {
@@ -186,7 +191,18 @@ CELERY_BEAT_SCHEDULE = {
 
     "incremental-sync-5-min": {
         "task": "zabbix_integration.tasks.incremental_sync_all_clients",
-        "schedule": 300.0,
+        "schedule": float(ZABBIX_SYNC_WINDOW_SECONDS),
+    },
+
+    "history-partitions-diario-01h": {
+        "task": "zabbix_integration.tasks.maintain_history_partitions_task",
+        "schedule": crontab(hour=1, minute=0),
+    },
+
+    # rede de segurança do webhook (o flush normal é agendado pela própria requisição)
+    "webhook-flush-1-min": {
+        "task": "zabbix_integration.tasks.flush_webhook_events_task",
+        "schedule": 60.0,
     },
 }
 
@@ -197,4 +213,58 @@ AZURE_TENANT_ID = os.getenv("AZURE_TENANT_ID")
 AZURE_CLIENT_ID = os.getenv("AZURE_CLIENT_ID")
 AZURE_CLIENT_SECRET = os.getenv("AZURE_CLIENT_SECRET")
 
-AZURE_SENDER_EMAIL = "thiago.tosatti@conversys.global"
\ No newline at end of file
+AZURE_SENDER_EMAIL = "thiago.tosatti@conversys.global"
+
+# =====================================
+# ZABBIX INTEGRATION
+# =====================================
+# Pool de clients por processo (sessão HTTP keep-alive + token do user.login em cache)
+ZABBIX_CLIENT_POOL_MAX_SIZE = int(os.getenv("ZABBIX_CLIENT_POOL_MAX_SIZE", "50"))
+ZABBIX_TOKEN_TTL_SECONDS = int(os.getenv("ZABBIX_TOKEN_TTL_SECONDS", "600"))
+
+# Sync concorrente (chunks buscados em paralelo; limitado por ZabbixConnection.max_concorrencia)
+ZABBIX_SYNC_CONCURRENCY = int(os.getenv("ZABBIX_SYNC_CONCURRENCY", "4"))
+
+# Tamanho dos lotes de INSERT ... ON CONFLICT DO UPDATE nos upserts em massa
+ZABBIX_BULK_BATCH_SIZE = int(os.getenv("ZABBIX_BULK_BATCH_SIZE", "1000"))
+
+# Tamanho da página de event.get (paginação por cursor de eventid)
+ZABBIX_EVENT_PAGE_SIZE = int(os.getenv("ZABBIX_EVENT_PAGE_SIZE", "1000"))
+
+# Lease do lock/dedup de sync por cliente (expira se o worker morrer no meio)
+ZABBIX_SYNC_LEASE_SECONDS = int(os.getenv("ZABBIX_SYNC_LEASE_SECONDS", "3600"))
+
+# Histórico tipado particionado por mês: retenção (DROP de partição) e meses criados adiante
+ZABBIX_HISTORY_RETENTION_MONTHS = int(os.getenv("ZABBIX_HISTORY_RETENTION_MONTHS", "12"))
+ZABBIX_HISTORY_PREMAKE_MONTHS = int(os.getenv("ZABBIX_HISTORY_PREMAKE_MONTHS", "2"))
+
+# Ingestão de history.get: tamanho da fatia de tempo (s) e linhas por página
+ZABBIX_HISTORY_SLICE_SECONDS = int(os.getenv("ZABBIX_HISTORY_SLICE_SECONDS", "21600"))
+ZABBIX_HISTORY_PAGE_SIZE = int(os.getenv("ZABBIX_HISTORY_PAGE_SIZE", "10000"))
+
+# Orçamento padrão de pontos por série (escolha automática de resolução do rollup)
+ZABBIX_HISTORY_MAX_POINTS = int(os.getenv("ZABBIX_HISTORY_MAX_POINTS", "500"))
+
+# Cache (TTL em segundos) do resumo services.dashboards.dashboard_executivo por cliente/janela
+ZABBIX_DASHBOARD_CACHE_TTL = int(os.getenv("ZABBIX_DASHBOARD_CACHE_TTL", "60"))
+
+# Disponibilidade mensal: severidade mínima do incidente que conta como indisponibilidade
+ZABBIX_AVAILABILITY_MIN_SEVERITY = int(os.getenv("ZABBIX_AVAILABILITY_MIN_SEVERITY", "4"))
+
+# Payload bruto (raw) das tabelas espelho: full | on_change | compressed | off (ver services.raw_storage)
+ZABBIX_RAW_STORAGE = os.getenv("ZABBIX_RAW_STORAGE", "full")
+ZABBIX_RAW_ZSTD_LEVEL = int(os.getenv("ZABBIX_RAW_ZSTD_LEVEL", "3"))
+ZABBIX_RAW_PRUNE_GRACE_HOURS = int(os.getenv("ZABBIX_RAW_PRUNE_GRACE_HOURS", "24"))
+
+# Webhook do Zabbix (media type -> /api/zabbix/webhook/<cliente_id>/)
+ZABBIX_WEBHOOK_FLUSH_BATCH = int(os.getenv("ZABBIX_WEBHOOK_FLUSH_BATCH", "1000"))
+ZABBIX_WEBHOOK_FLUSH_DELAY_SECONDS = int(os.getenv("ZABBIX_WEBHOOK_FLUSH_DELAY_SECONDS", "5"))
+# com webhook ativo (evento recebido nos últimos STALE segundos) o incremental só reconcilia
+ZABBIX_WEBHOOK_RECONCILE_SECONDS = int(os.getenv("ZABBIX_WEBHOOK_RECONCILE_SECONDS", "3600"))
+ZABBIX_WEBHOOK_STALE_SECONDS = int(os.getenv("ZABBIX_WEBHOOK_STALE_SECONDS", "900"))
+# fuso de {EVENT.DATE}/{EVENT.TIME}
+ZABBIX_WEBHOOK_TIME_ZONE = os.getenv("ZABBIX_WEBHOOK_TIME_ZONE", TIME_ZONE)
+
+# Reconciliação de r_eventid dos problemas abertos (só os recentes, com teto por execução)
+ZABBIX_RECONCILE_WINDOW_DAYS = int(os.getenv("ZABBIX_RECONCILE_WINDOW_DAYS", "62"))
+ZABBIX_RECONCILE_MAX_EVENTS = int(os.getenv("ZABBIX_RECONCILE_MAX_EVENTS", "20000"))
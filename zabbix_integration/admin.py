@@ -16,24 +16,33 @@ from .models import (
     ZabbixAlarmEvent, 
     ZabbixAlertSent,
     ZabbixHostGroup,
+    ZabbixIncident,
 )
 
 @admin.register(ZabbixConnection)
 class ZabbixConnectionAdmin(admin.ModelAdmin):
-    list_display = ("id", "cliente", "base_url", "usuario", "ativo", "atualizado_em")
+    list_display = ("id", "cliente", "base_url", "usuario", "ativo", "intervalo_sync_segundos", "ultimo_webhook_em", "atualizado_em")
     list_filter = ("ativo",)
     search_fields = ("cliente__nome", "base_url", "usuario")
     ordering = ("-atualizado_em",)
 
     autocomplete_fields = ("cliente",)
-    readonly_fields = ("criado_em", "atualizado_em")
+    readonly_fields = ("ultimo_webhook_em", "criado_em", "atualizado_em")
+    actions = ("gerar_webhook_token",)
 
     fieldsets = (
         ("Cliente", {"fields": ("cliente", "ativo")}),
         ("Conexão Zabbix", {"fields": ("base_url", "usuario", "senha")}),
+        ("Webhook", {"fields": ("webhook_token", "ultimo_webhook_em")}),
         ("Auditoria", {"fields": ("criado_em", "atualizado_em")}),
     )
 
+    @admin.action(description="Gerar novo token do webhook")
+    def gerar_webhook_token(self, request, queryset):
+        for conn in queryset:
+            conn.gerar_webhook_token()
+        self.message_user(request, f"{queryset.count()} token(s) gerado(s)")
+
 
 @admin.register(ZabbixHost)
 class ZabbixHostAdmin(admin.ModelAdmin):
@@ -245,4 +254,13 @@ class ZabbixHostGroupAdmin(admin.ModelAdmin):
                 "atualizado_em",
             )
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(ZabbixIncident)
+class ZabbixIncidentAdmin(admin.ModelAdmin):
+    list_display = ("eventid", "cliente", "hostname", "name", "severity", "start", "end", "duration_seconds")
+    list_filter = ("cliente", "severity")
+    search_fields = ("eventid", "r_eventid", "hostname", "name", "cliente__nome")
+    ordering = ("-start",)
+    autocomplete_fields = ("cliente",)
+    raw_id_fields = ("host", "trigger")
@@ -4,14 +4,19 @@ def gerar_resumo_executivo(dados: dict) -> str:
 
     client = OpenAI()
 
+    # KPI ainda não calculado aparece como "n/d" (em vez de KeyError)
+    def kpi(nome):
+        valor = dados.get(nome)
+        return "n/d" if valor is None else valor
+
     prompt = f"""
     Gere um resumo executivo para diretoria com base nos seguintes indicadores:
 
-    SLA Geral: {dados['sla_geral']}%
-    Disponibilidade Média: {dados['disponibilidade_media']}%
-    Total de Incidentes: {dados['total_incidentes']}
-    Eventos Críticos: {dados['eventos_criticos']}
-    MTTR Médio (min): {dados['mttr_medio_minutos']}
+    SLA Geral: {kpi('sla_geral')}%
+    Disponibilidade Média: {kpi('disponibilidade_media')}%
+    Total de Incidentes: {kpi('total_incidentes')}
+    Eventos Críticos: {kpi('eventos_criticos')}
+    MTTR Médio (min): {kpi('mttr_medio_minutos')}
 
     Destaque riscos, pontos fortes e recomendações estratégicas.
     """
@@ -21,4 +26,4 @@ def gerar_resumo_executivo(dados: dict) -> str:
         messages=[{"role": "user", "content": prompt}]
     )
 
-    return response.choices[0].message.content
\ No newline at end of file
+    return response.choices[0].message.content
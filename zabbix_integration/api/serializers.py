@@ -16,9 +16,12 @@ class DashboardExecutivoResponseSerializer(serializers.Serializer):
     cliente_id = serializers.IntegerField()
     periodo = serializers.CharField()
     sla_geral = serializers.FloatField()
-    disponibilidade_media = serializers.FloatField()
-    total_incidentes = serializers.IntegerField()
-    eventos_criticos = serializers.IntegerField()
-    mttr_medio_minutos = serializers.FloatField()
-    top_hosts_criticos = TopHostSerializer(many=True)
-    resumo_executivo = serializers.CharField()
\ No newline at end of file
+    # KPIs ainda não calculados vêm ausentes/nulos
+    disponibilidade_media = serializers.FloatField(required=False, allow_null=True)
+    total_incidentes = serializers.IntegerField(required=False, allow_null=True)
+    eventos_criticos = serializers.IntegerField(required=False, allow_null=True)
+    mttr_medio_minutos = serializers.FloatField(required=False, allow_null=True)
+    top_hosts_criticos = TopHostSerializer(many=True, required=False)
+    resumo_executivo = serializers.CharField(allow_null=True)
+    resumo_desatualizado = serializers.BooleanField()
+    atualizado_em = serializers.DateTimeField()
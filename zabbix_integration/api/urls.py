@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import RelatorioEventosRecoveryAPIView, ZabbixDashboardExecutivoAPIView, SyncHostGroupsAPIView
+from .views import RelatorioEventosRecoveryAPIView, RelatorioJobStatusAPIView, RelatorioJobDownloadAPIView, ZabbixDashboardExecutivoAPIView, SyncHostGroupsAPIView
 
 urlpatterns = [
     path("dashboard/executivo/", ZabbixDashboardExecutivoAPIView.as_view(), name="zabbix-dashboard-executivo",),
     path("sync/hostgroups/", SyncHostGroupsAPIView.as_view()),
     path("relatorio/eventos-recovery/",RelatorioEventosRecoveryAPIView.as_view()),
+    path("relatorio/jobs/<int:job_id>/", RelatorioJobStatusAPIView.as_view(), name="zabbix-relatorio-job"),
+    path("relatorio/jobs/<int:job_id>/download/", RelatorioJobDownloadAPIView.as_view(), name="zabbix-relatorio-job-download"),
 ]
\ No newline at end of file
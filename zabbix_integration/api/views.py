@@ -11,7 +11,10 @@ from .serializers import (
     DashboardExecutivoResponseSerializer,
 )
 from zabbix_integration.services.sync_hostgroups import sync_hostgroups
-from zabbix_integration.services.relatorio_eventos import gerar_relatorio_eventos_recovery
+from zabbix_integration.services.relatorio_eventos import parse_periodo
+from zabbix_integration.models import ZabbixRelatorioJob
+from zabbix_integration.tasks import gerar_relatorio_task
+from django.db import transaction
 
 class ZabbixDashboardExecutivoAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -65,6 +68,13 @@ class SyncHostGroupsAPIView(APIView):
             )
         
 class RelatorioEventosRecoveryAPIView(APIView):
+    """
+    POST {"cliente_id": 1, "data_inicio": "2026-02-01", "data_fim": "2026-02-28"}
+
+    Enfileira a geração do PDF e responde 202 com o job_id; acompanhe em
+    relatorio/jobs/<job_id>/ e baixe em relatorio/jobs/<job_id>/download/
+    (só quem solicitou o job enxerga status e arquivo).
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -77,16 +87,71 @@ class RelatorioEventosRecoveryAPIView(APIView):
             )
 
         try:
-            caminho = gerar_relatorio_eventos_recovery(int(cliente_id))
+            cliente_id = int(cliente_id)
+        except (TypeError, ValueError):
+            return Response({"erro": "cliente_id deve ser numérico"}, status=status.HTTP_400_BAD_REQUEST)
 
-            return FileResponse(
-                open(caminho, "rb"),
-                as_attachment=True,
-                filename=os.path.basename(caminho)
-            )
+        data_inicio = request.data.get("data_inicio")
+        data_fim = request.data.get("data_fim")
 
-        except Exception as e:
+        try:
+            parse_periodo(data_inicio)
+            parse_periodo(data_fim)
+        except ValueError as e:
+            return Response({"erro": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = ZabbixRelatorioJob.objects.create(
+            cliente_id=cliente_id,
+            solicitado_por=request.user,
+            tipo="eventos_recovery",
+            parametros={"data_inicio": data_inicio, "data_fim": data_fim},
+        )
+
+        transaction.on_commit(lambda: gerar_relatorio_task.delay(job.pk))
+
+        return Response(
+            {"job_id": job.pk, "status": job.status},
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class RelatorioJobStatusAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id: int):
+        job = ZabbixRelatorioJob.objects.filter(pk=job_id, solicitado_por=request.user).first()
+        if not job:
+            return Response({"erro": "Job não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "job_id": job.pk,
+            "cliente_id": job.cliente_id,
+            "tipo": job.tipo,
+            "status": job.status,
+            "parametros": job.parametros,
+            "total_linhas": job.total_linhas,
+            "erro": job.erro,
+            "criado_em": job.criado_em,
+            "concluido_em": job.concluido_em,
+        })
+
+
+class RelatorioJobDownloadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id: int):
+        job = ZabbixRelatorioJob.objects.filter(pk=job_id, solicitado_por=request.user).first()
+        if not job:
+            return Response({"erro": "Job não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        if job.status != "concluido" or not job.arquivo or not os.path.exists(job.arquivo):
             return Response(
-                {"erro": str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+                {"erro": "Relatório ainda não disponível", "status": job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return FileResponse(
+            open(job.arquivo, "rb"),
+            as_attachment=True,
+            filename=os.path.basename(job.arquivo)
+        )
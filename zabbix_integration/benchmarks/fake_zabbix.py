@@ -0,0 +1,373 @@
+"""
+Servidor JSON-RPC local que imita o api_jsonrpc.php do Zabbix, com dados
+sintéticos gerados sob demanda (nada é montado inteiro em memória).
+
+Uso avulso:
+    python -m zabbix_integration.benchmarks.fake_zabbix --port 8081 --hosts 500 --events 100000
+
+Usado pelo comando `bench_zabbix_sync` (roda num processo separado, para o
+RSS medido ser só o do sync).
+"""
+import argparse
+import heapq
+import json
+import multiprocessing
+import time
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+
+HOSTID_BASE = 10000
+ITEMID_BASE = 100000
+TRIGGERID_BASE = 5000000
+GROUPID_BASE = 100
+# eventids altos para não colidir com eventos reais (ZabbixEvent é único por cliente + eventid)
+EVENTID_BASE = 900000000000
+
+
+@dataclass
+class FakeZabbixConfig:
+    hosts: int = 200
+    items_per_host: int = 20
+    triggers_per_host: int = 5
+    groups: int = 10
+    events: int = 20000
+    history_interval: int = 60  # segundos entre valores de um item
+    latency_ms: int = 0  # atraso por requisição HTTP
+    now: int = 0  # 0 = hora de início do servidor
+
+
+class FakeZabbixDataset:
+    """
+    Gera hosts, itens, triggers, eventos e histórico de forma determinística
+    a partir dos índices (ids calculados, sem estado).
+    """
+
+    def __init__(self, config: FakeZabbixConfig):
+        self.config = config
+        self.now = config.now or int(time.time())
+
+        self.total_triggers = config.hosts * config.triggers_per_host
+        # eventos espalhados nos últimos ~29 dias (dentro da janela do backfill)
+        self.event_interval = max(1, (29 * 86400) // max(config.events, 1))
+        self.event_start = self.now - config.events * self.event_interval
+
+    # ---------- hosts / grupos ----------
+
+    def _host(self, h: int) -> dict:
+        groupid = str(GROUPID_BASE + h % max(self.config.groups, 1))
+        return {
+            "hostid": str(HOSTID_BASE + h),
+            "host": f"bench-host-{h:05d}",
+            "name": f"Bench Host {h:05d}",
+            "status": "0",
+            "groups": [{"groupid": groupid, "name": f"Bench Group {groupid}"}],
+        }
+
+    def _host_index(self, hostid) -> int | None:
+        h = int(hostid) - HOSTID_BASE
+        return h if 0 <= h < self.config.hosts else None
+
+    def host_get(self, p: dict) -> list[dict]:
+        if p.get("hostids"):
+            indices = [self._host_index(hid) for hid in p["hostids"]]
+            indices = sorted(h for h in indices if h is not None)
+        else:
+            indices = range(self.config.hosts)
+
+        hosts = [self._host(h) for h in indices]
+        if "selectHostGroups" in p:
+            for host in hosts:
+                host["hostgroups"] = host["groups"]
+        return hosts
+
+    def hostgroup_get(self, p: dict) -> list[dict]:
+        return [
+            {"groupid": str(GROUPID_BASE + g), "name": f"Bench Group {GROUPID_BASE + g}"}
+            for g in range(self.config.groups)
+        ]
+
+    # ---------- itens ----------
+
+    def _value_type(self, j: int) -> int:
+        return 3 if j % 4 == 3 else 0  # 3 = uint, 0 = float
+
+    def _item(self, h: int, j: int) -> dict:
+        itemid = ITEMID_BASE + h * self.config.items_per_host + j
+        return {
+            "itemid": str(itemid),
+            "hostid": str(HOSTID_BASE + h),
+            "name": f"Bench item {j}",
+            "key_": f"bench.item[{j}]",
+            "value_type": str(self._value_type(j)),
+            "units": "%",
+            "delay": "1m",
+            "lastvalue": str(itemid % 100),
+            "lastclock": str(self.now),
+            "status": "0",
+        }
+
+    def _item_index(self, itemid) -> tuple[int, int] | None:
+        i = int(itemid) - ITEMID_BASE
+        if not 0 <= i < self.config.hosts * self.config.items_per_host:
+            return None
+        return divmod(i, self.config.items_per_host)
+
+    def item_get(self, p: dict) -> list[dict]:
+        if p.get("itemids"):
+            indices = [self._item_index(iid) for iid in p["itemids"]]
+            return [self._item(h, j) for h, j in sorted(i for i in indices if i is not None)]
+
+        hosts = p.get("hostids")
+        indices = (
+            sorted(h for h in (self._host_index(hid) for hid in hosts) if h is not None)
+            if hosts else range(self.config.hosts)
+        )
+        return [self._item(h, j) for h in indices for j in range(self.config.items_per_host)]
+
+    # ---------- triggers ----------
+
+    def _trigger_item(self, t: int) -> int:
+        h, k = divmod(t, self.config.triggers_per_host)
+        return ITEMID_BASE + h * self.config.items_per_host + k % self.config.items_per_host
+
+    def _trigger(self, t: int) -> dict:
+        itemid = self._trigger_item(t)
+        return {
+            "triggerid": str(TRIGGERID_BASE + t),
+            "description": f"Bench trigger {t}",
+            "priority": str(t % 5 + 1),
+            "status": "0",
+            "lastchange": str(self.now),
+            "value": "0",
+            "expression": f"last(/bench/item{itemid})>90",
+            "items": [{"itemid": str(itemid)}],
+        }
+
+    def trigger_get(self, p: dict) -> list[dict]:
+        if p.get("itemids"):
+            triggers = set()
+            k_max = self.config.triggers_per_host
+            for iid in p["itemids"]:
+                idx = self._item_index(iid)
+                if idx is None:
+                    continue
+                h, j = idx
+                # triggers do host h cujo item é j
+                triggers.update(h * k_max + k for k in range(k_max) if k % self.config.items_per_host == j)
+            indices = sorted(triggers)
+        else:
+            indices = range(self.total_triggers)
+
+        return [self._trigger(t) for t in indices]
+
+    # ---------- eventos ----------
+    # evento i: trigger (i // 2) % T; i par = problema, ímpar = recuperação do anterior
+
+    def _event(self, i: int) -> dict:
+        t = (i // 2) % self.total_triggers
+        problema = i % 2 == 0
+        recuperado = problema and i + 1 < self.config.events
+        return {
+            "eventid": str(EVENTID_BASE + i),
+            "source": "0",
+            "object": "0",
+            "objectid": str(TRIGGERID_BASE + t),
+            "clock": str(self.event_start + i * self.event_interval),
+            "ns": "0",
+            "value": "1" if problema else "0",
+            "acknowledged": "0",
+            "severity": str(t % 5 + 1) if problema else "0",
+            "name": f"Bench trigger {t}",
+            "r_eventid": str(EVENTID_BASE + i + 1) if recuperado else "0",
+            "c_eventid": "0",
+            "opdata": "",
+        }
+
+    def _event_range(self, p: dict) -> tuple[int, int]:
+        lo, hi = 0, self.config.events - 1
+
+        if p.get("eventid_from") is not None:
+            lo = max(lo, int(p["eventid_from"]) - EVENTID_BASE)
+        if p.get("eventid_till") is not None:
+            hi = min(hi, int(p["eventid_till"]) - EVENTID_BASE)
+        if p.get("time_from") is not None:
+            lo = max(lo, -(-(int(p["time_from"]) - self.event_start) // self.event_interval))
+        if p.get("time_till") is not None:
+            hi = min(hi, (int(p["time_till"]) - self.event_start) // self.event_interval)
+
+        return lo, hi
+
+    def _indices_trigger(self, t: int, lo: int, hi: int):
+        # eventos da trigger t: i = 2 * (t + k * T) + {0, 1}
+        passo = 2 * self.total_triggers
+        base = 2 * t
+        k = max(0, (lo - base) // passo)
+        while base + k * passo <= hi:
+            for i in (base + k * passo, base + k * passo + 1):
+                if lo <= i <= hi:
+                    yield i
+            k += 1
+
+    def event_get(self, p: dict) -> list[dict]:
+        limit = int(p["limit"]) if p.get("limit") else None
+        lo, hi = self._event_range(p)
+        desc = p.get("sortorder") == "DESC"
+
+        if p.get("eventids"):
+            indices = sorted(
+                i for i in (int(eid) - EVENTID_BASE for eid in p["eventids"])
+                if 0 <= i < self.config.events
+            )
+        elif p.get("objectids"):
+            triggers = [int(tid) - TRIGGERID_BASE for tid in p["objectids"]]
+            triggers = [t for t in triggers if 0 <= t < self.total_triggers]
+            indices = heapq.merge(*(self._indices_trigger(t, lo, hi) for t in triggers))
+        else:
+            indices = range(hi, lo - 1, -1) if desc else range(lo, hi + 1)
+
+        if p.get("filter", {}).get("value") is not None:
+            valor = str(p["filter"]["value"])
+            indices = (i for i in indices if ("1" if i % 2 == 0 else "0") == valor)
+
+        if desc and not isinstance(indices, range):
+            indices = sorted(indices, reverse=True)
+
+        return [self._event(i) for i in islice(indices, limit)]
+
+    # ---------- histórico ----------
+
+    def history_get(self, p: dict) -> list[dict]:
+        value_type = int(p.get("history", 0))
+        intervalo = self.config.history_interval
+        limit = int(p["limit"]) if p.get("limit") else None
+
+        itemids = []
+        for iid in p.get("itemids") or []:
+            idx = self._item_index(iid)
+            if idx is not None and self._value_type(idx[1]) == value_type:
+                itemids.append(str(iid))
+
+        if not itemids:
+            return []
+
+        inicio = int(p.get("time_from") or self.now - 3600)
+        fim = int(p.get("time_till") or self.now)
+        clock = -(-inicio // intervalo) * intervalo
+
+        rows = []
+        while clock <= fim:
+            for itemid in itemids:
+                valor = (int(itemid) * 7 + clock // intervalo) % 100
+                rows.append({
+                    "itemid": itemid,
+                    "clock": str(clock),
+                    "ns": "0",
+                    "value": str(valor) if value_type == 3 else f"{valor + 0.5}",
+                })
+                if limit and len(rows) >= limit:
+                    return rows
+            clock += intervalo
+
+        return rows
+
+    # ---------- despacho ----------
+
+    def call(self, method: str, params):
+        params = params if isinstance(params, dict) else {}
+        handlers = {
+            "user.login": lambda p: "bench-token",
+            "user.logout": lambda p: True,
+            "apiinfo.version": lambda p: "7.0.0",
+            "host.get": self.host_get,
+            "hostgroup.get": self.hostgroup_get,
+            "item.get": self.item_get,
+            "trigger.get": self.trigger_get,
+            "event.get": self.event_get,
+            "problem.get": lambda p: [],
+            "history.get": self.history_get,
+            "maintenance.get": lambda p: [],
+            "sla.get": lambda p: [],
+            "alert.get": lambda p: [],
+        }
+        handler = handlers.get(method)
+        if handler is None:
+            raise KeyError(method)
+        return handler(params)
+
+
+def _make_handler(dataset: FakeZabbixDataset):
+    latencia = dataset.config.latency_ms / 1000
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _responder(self, req: dict) -> dict:
+            try:
+                result = dataset.call(req.get("method"), req.get("params"))
+                return {"jsonrpc": "2.0", "id": req.get("id"), "result": result}
+            except KeyError:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": req.get("id"),
+                    "error": {"code": -32601, "message": "Method not found.", "data": str(req.get("method"))},
+                }
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+
+            if latencia:
+                time.sleep(latencia)
+
+            resposta = [self._responder(r) for r in body] if isinstance(body, list) else self._responder(body)
+            payload = json.dumps(resposta).encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(config: FakeZabbixConfig, host: str = "127.0.0.1", port: int = 0, ready=None):
+    server = ThreadingHTTPServer((host, port), _make_handler(FakeZabbixDataset(config)))
+    server.daemon_threads = True
+    if ready is not None:
+        ready.put(server.server_port)
+    server.serve_forever()
+
+
+def start_fake_zabbix(config: FakeZabbixConfig, host: str = "127.0.0.1", port: int = 0):
+    """
+    Sobe o servidor num processo separado. Retorna (processo, url base).
+    """
+    ready = multiprocessing.Queue()
+    processo = multiprocessing.Process(target=serve, args=(config, host, port, ready), daemon=True)
+    processo.start()
+    porta = ready.get(timeout=30)
+    return processo, f"http://{host}:{porta}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zabbix JSON-RPC falso para benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    for campo, valor in asdict(FakeZabbixConfig()).items():
+        parser.add_argument(f"--{campo.replace('_', '-')}", type=int, default=valor)
+    args = vars(parser.parse_args())
+
+    host, port = args.pop("host"), args.pop("port")
+    config = FakeZabbixConfig(**args)
+
+    print(f"Fake Zabbix em http://{host}:{port}/api_jsonrpc.php ({config})")
+    serve(config, host, port)
+
+
+if __name__ == "__main__":
+    main()
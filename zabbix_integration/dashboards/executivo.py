@@ -1,40 +1,102 @@
 from datetime import datetime
+from django.utils import timezone
+from ..models import ZabbixDashboardSnapshot
 from ..services.sla_service import get_sla_summary
 from ..services.availability_service import get_availability_summary
 from ..services.event_service import get_event_summary
 from ..services.mttr_service import get_mttr
+from ..services.utils import content_hash
 from ..ai.executive_summary import gerar_resumo_executivo
 
 
-def zabbix_dashboard_executivo(cliente_id: int, ano: int, mes: int) -> dict:
-    print(f"Gerando dashboard executivo para cliente_id={cliente_id}, ano={ano}, mes={mes}")
+# casas decimais dos KPIs no hash: com incidente aberto a disponibilidade muda a cada sync,
+# e só uma variação visível no dashboard deve pagar um novo resumo da IA
+KPI_HASH_CASAS = 1
+
+
+def _kpis_para_hash(valor):
+    if isinstance(valor, float):
+        return round(valor, KPI_HASH_CASAS)
+    if isinstance(valor, dict):
+        return {k: _kpis_para_hash(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_kpis_para_hash(v) for v in valor]
+    return valor
+
+
+def calcular_kpis_executivo(cliente_id: int, ano: int, mes: int) -> dict:
+    print(f"Calculando KPIs do dashboard executivo para cliente_id={cliente_id}, ano={ano}, mes={mes}")
     # 1️⃣ SLA
     sla = get_sla_summary(cliente_id, ano, mes)
     print(f"SLA summary: {sla}")
     # 2️⃣ Disponibilidade
-    #disponibilidade = get_availability_summary(cliente_id, ano, mes)
-    #print(f"Disponibilidade summary: {disponibilidade}")
-    # 3️⃣ Eventos
-    #eventos = get_event_summary(cliente_id, ano, mes)
-    #print(f"Eventos summary: {eventos}")
-    # 4️⃣ MTTR
-    #mttr = get_mttr(cliente_id, ano, mes)
-    #print(f"MTTR: {mttr} minutos")
+    disponibilidade = get_availability_summary(cliente_id, ano, mes)
+    print(f"Disponibilidade summary: {disponibilidade}")
+    # 3️⃣ Incidentes (ZabbixIncident, um por problema)
+    eventos = get_event_summary(cliente_id, ano, mes)
+    print(f"Incidentes summary: {eventos}")
+    # 4️⃣ MTTR (agregado sobre ZabbixIncident)
+    mttr = get_mttr(cliente_id, ano, mes)
+    print(f"MTTR: {mttr} minutos")
     # 5️⃣ Consolidação
-    dashboard = {
+    return {
         "cliente_id": cliente_id,
         "periodo": f"{mes}/{ano}",
         "sla_geral": sla["sla_geral"],
-        #"disponibilidade_media": disponibilidade["media"],
-        #"total_incidentes": eventos["total"],
-        #"eventos_criticos": eventos["criticos"],
-        #"mttr_medio_minutos": mttr,
-        #"top_hosts_criticos": eventos["top_hosts"],
+        "disponibilidade_media": disponibilidade["media"],
+        "total_incidentes": eventos["total"],
+        "eventos_criticos": eventos["criticos"],
+        "mttr_medio_minutos": mttr,
+        "top_hosts_criticos": eventos["top_hosts"],
     }
-    print(f"Dashboard executivo gerado: {dashboard}")
-    # 6️⃣ Geração de Resumo com IA
-    resumo = gerar_resumo_executivo(dashboard)
-    print(f"Resumo executivo gerado pela IA: {resumo}")
-    dashboard["resumo_executivo"] = resumo
 
-    return dashboard
\ No newline at end of file
+
+def atualizar_snapshot_executivo(cliente_id: int, ano: int, mes: int) -> ZabbixDashboardSnapshot:
+    """
+    Recalcula os KPIs e grava o snapshot. O resumo da IA (lento e pago) só é
+    gerado de novo quando o hash dos KPIs (arredondados) muda.
+    """
+    kpis = calcular_kpis_executivo(cliente_id, ano, mes)
+    kpis_hash = content_hash(_kpis_para_hash(kpis))
+
+    snapshot, _ = ZabbixDashboardSnapshot.objects.get_or_create(
+        cliente_id=cliente_id,
+        ano=ano,
+        mes=mes,
+        defaults={"kpis": kpis, "kpis_hash": kpis_hash},
+    )
+    snapshot.kpis = kpis
+    snapshot.kpis_hash = kpis_hash
+
+    if snapshot.resumo_hash != kpis_hash:
+        # 6️⃣ Geração de Resumo com IA
+        try:
+            snapshot.resumo_executivo = gerar_resumo_executivo(kpis)
+            snapshot.resumo_hash = kpis_hash
+            snapshot.resumo_gerado_em = timezone.now()
+            print(f"Resumo executivo gerado pela IA: {snapshot.resumo_executivo}")
+        except Exception as e:
+            # mantém o resumo anterior; tenta de novo no próximo refresh
+            print(f"Erro ao gerar resumo executivo (cliente_id={cliente_id}): {e}")
+
+    snapshot.save()
+    return snapshot
+
+
+def zabbix_dashboard_executivo(cliente_id: int, ano: int, mes: int) -> dict:
+    """
+    Serve o snapshot pré-calculado (atualizado após cada sync).
+    Só calcula na hora se o mês ainda não tiver snapshot.
+    """
+    snapshot = ZabbixDashboardSnapshot.objects.filter(cliente_id=cliente_id, ano=ano, mes=mes).first()
+
+    if snapshot is None:
+        print(f"Sem snapshot para cliente_id={cliente_id} {mes}/{ano}, calculando agora")
+        snapshot = atualizar_snapshot_executivo(cliente_id, ano, mes)
+
+    dashboard = dict(snapshot.kpis)
+    dashboard["resumo_executivo"] = snapshot.resumo_executivo
+    dashboard["atualizado_em"] = snapshot.calculado_em
+    dashboard["resumo_desatualizado"] = snapshot.resumo_hash != snapshot.kpis_hash
+
+    return dashboard
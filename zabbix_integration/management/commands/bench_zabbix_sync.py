@@ -0,0 +1,187 @@
+import json
+import resource
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from clientes.models import Cliente
+from zabbix_integration.benchmarks.fake_zabbix import FakeZabbixConfig, start_fake_zabbix
+from zabbix_integration.models import (
+    ZabbixConnection,
+    ZabbixEvent,
+    ZabbixHistoryNumeric,
+    ZabbixHistoryUint,
+    ZabbixHost,
+    ZabbixItem,
+    ZabbixSyncWatermark,
+    ZabbixTrigger,
+)
+from zabbix_integration.services.sync import get_client_for_cliente
+from zabbix_integration.services.sync_events import sync_events_incremental
+from zabbix_integration.services.sync_hosts import sync_hosts
+from zabbix_integration.services.sync_items import sync_items_enterprise
+from zabbix_integration.services.sync_level2 import sync_history
+from zabbix_integration.services.sync_triggers import sync_triggers_enterprise
+
+
+BENCH_CLIENTE_NOME = "Benchmark Zabbix (fake)"
+
+
+class _QueryCounter:
+    # conta statements sem guardar o SQL (CaptureQueriesContext cresce com a execução e distorce o RSS)
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def _peak_rss_mb() -> float:
+    # Linux: ru_maxrss em KB
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _count(querysets) -> int:
+    # histórico fica em mais de uma tabela (float / uint)
+    if isinstance(querysets, tuple):
+        return sum(qs.count() for qs in querysets)
+    return querysets.count()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o throughput do sync (hosts, itens, triggers, eventos, histórico) contra um "
+        "Zabbix JSON-RPC falso local: linhas/s, queries por linha, pico de RSS e tempo"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hosts", type=int, default=200)
+        parser.add_argument("--items-per-host", type=int, default=20)
+        parser.add_argument("--triggers-per-host", type=int, default=5)
+        parser.add_argument("--events", type=int, default=20000)
+        parser.add_argument("--history-hours", type=int, default=6, help="Janela de histórico sincronizada")
+        parser.add_argument("--history-interval", type=int, default=60, help="Segundos entre valores de um item")
+        parser.add_argument("--latency-ms", type=int, default=20, help="Atraso por requisição no servidor falso")
+        parser.add_argument("--concurrency", type=int, help="Concorrência do sync (padrão: ZABBIX_SYNC_CONCURRENCY)")
+        parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON")
+        parser.add_argument("--keep", action="store_true", help="Mantém o cliente de benchmark e os dados gravados")
+
+    def handle(self, *args, **options):
+        config = FakeZabbixConfig(
+            hosts=options["hosts"],
+            items_per_host=options["items_per_host"],
+            triggers_per_host=options["triggers_per_host"],
+            events=options["events"],
+            history_interval=options["history_interval"],
+            latency_ms=options["latency_ms"],
+        )
+
+        # servidor sobe antes de qualquer acesso ao banco (processo filho via fork)
+        servidor, url = start_fake_zabbix(config)
+
+        try:
+            cliente = self._preparar_cliente(url)
+            resultados = self._executar(cliente.id, options)
+        finally:
+            servidor.terminate()
+            servidor.join()
+
+        if options["keep"]:
+            # servidor falso já caiu: conexão fica inativa para o scheduler não tentar sincronizar
+            ZabbixConnection.objects.filter(cliente=cliente).update(ativo=False)
+        else:
+            Cliente.objects.filter(pk=cliente.pk).delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"config": config.__dict__, "etapas": resultados}, indent=2))
+        else:
+            self._imprimir(config, resultados)
+
+    def _preparar_cliente(self, url: str) -> Cliente:
+        cliente, _ = Cliente.objects.get_or_create(nome=BENCH_CLIENTE_NOME)
+
+        # começa sempre do zero (sem marca d'água, sem linhas de rodadas anteriores)
+        ZabbixEvent.objects.filter(cliente=cliente).delete()
+        ZabbixSyncWatermark.objects.filter(cliente=cliente).delete()
+        ZabbixTrigger.objects.filter(cliente=cliente).delete()
+        ZabbixItem.objects.filter(cliente=cliente).delete()
+        ZabbixHost.objects.filter(cliente=cliente).delete()
+
+        ZabbixConnection.objects.update_or_create(
+            cliente=cliente,
+            defaults={"base_url": url, "usuario": "bench", "senha": "bench", "ativo": True},
+        )
+        return cliente
+
+    def _executar(self, cliente_id: int, options) -> list[dict]:
+        concurrency = options["concurrency"]
+        agora = timezone.now()
+
+        def history():
+            itemids = list(ZabbixItem.objects.filter(cliente_id=cliente_id).values_list("itemid", flat=True))
+            return sync_history(cliente_id, itemids, agora - timedelta(hours=options["history_hours"]), agora)
+
+        etapas = [
+            ("hosts", lambda: sync_hosts(cliente_id), ZabbixHost.objects.filter(cliente_id=cliente_id)),
+            ("itens", lambda: sync_items_enterprise(cliente_id, concurrency=concurrency),
+             ZabbixItem.objects.filter(cliente_id=cliente_id)),
+            ("triggers", lambda: sync_triggers_enterprise(cliente_id, concurrency=concurrency),
+             ZabbixTrigger.objects.filter(cliente_id=cliente_id)),
+            ("eventos", lambda: sync_events_incremental(cliente_id, concurrency=concurrency),
+             ZabbixEvent.objects.filter(cliente_id=cliente_id)),
+            ("historico", history, (
+                ZabbixHistoryNumeric.objects.filter(item__cliente_id=cliente_id),
+                ZabbixHistoryUint.objects.filter(item__cliente_id=cliente_id),
+            )),
+        ]
+
+        client = get_client_for_cliente(cliente_id)
+        resultados = []
+
+        for nome, func, queryset in etapas:
+            antes = _count(queryset)
+            requisicoes_antes = client.stats["requisicoes"]
+            contador = _QueryCounter()
+
+            inicio = time.perf_counter()
+            with connection.execute_wrapper(contador):
+                func()
+            duracao = time.perf_counter() - inicio
+
+            linhas = _count(queryset) - antes
+
+            resultados.append({
+                "etapa": nome,
+                "linhas": linhas,
+                "segundos": round(duracao, 3),
+                "linhas_por_segundo": round(linhas / duracao, 1) if duracao else None,
+                "queries": contador.total,
+                "queries_por_linha": round(contador.total / linhas, 4) if linhas else None,
+                "requisicoes_zabbix": client.stats["requisicoes"] - requisicoes_antes,
+                "pico_rss_mb": _peak_rss_mb(),
+            })
+
+        return resultados
+
+    def _imprimir(self, config: FakeZabbixConfig, resultados: list[dict]):
+        self.stdout.write(
+            f"Fake Zabbix: {config.hosts} hosts x {config.items_per_host} itens, "
+            f"{config.triggers_per_host} triggers/host, {config.events} eventos, latência {config.latency_ms}ms"
+        )
+
+        cabecalho = f"{'etapa':<10} {'linhas':>9} {'tempo(s)':>9} {'linhas/s':>10} {'queries':>8} {'q/linha':>8} {'reqs':>6} {'RSS(MB)':>8}"
+        self.stdout.write(cabecalho)
+        self.stdout.write("-" * len(cabecalho))
+
+        for r in resultados:
+            self.stdout.write(
+                f"{r['etapa']:<10} {r['linhas']:>9} {r['segundos']:>9} {r['linhas_por_segundo'] or '-':>10} "
+                f"{r['queries']:>8} {r['queries_por_linha'] or '-':>8} {r['requisicoes_zabbix']:>6} {r['pico_rss_mb']:>8}"
+            )
+
+        total = sum(r["segundos"] for r in resultados)
+        self.stdout.write(self.style.SUCCESS(f"✅ Tempo total: {round(total, 2)}s"))
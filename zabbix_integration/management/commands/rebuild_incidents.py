@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand
+
+from zabbix_integration.services.incidents import rebuild_incidents
+from zabbix_integration.services.scheduler import active_tenants
+
+
+class Command(BaseCommand):
+    help = "Reconstrói a tabela de incidentes (problema -> recuperação) a partir dos eventos gravados"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cliente",
+            type=int,
+            help="ID do cliente específico"
+        )
+
+        parser.add_argument(
+            "--todos",
+            action="store_true",
+            help="Executar para todos os clientes com conexão Zabbix ativa"
+        )
+
+    def handle(self, *args, **options):
+
+        cliente_id = options.get("cliente")
+        todos = options.get("todos")
+
+        if not cliente_id and not todos:
+            self.stdout.write(
+                self.style.ERROR(
+                    "Informe --cliente ID ou use --todos"
+                )
+            )
+            return
+
+        if todos:
+            clientes = [cid for cid, _ in active_tenants()]
+        else:
+            clientes = [cliente_id]
+
+        for cid in clientes:
+            inicio = time.time()
+
+            result = rebuild_incidents(cid)
+
+            duracao = round(time.time() - inicio, 2)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Cliente {cid}: {result['abertos']} incidentes, "
+                    f"{result['fechados']} fechados ({duracao}s)"
+                )
+            )
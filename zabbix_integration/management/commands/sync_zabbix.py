@@ -4,7 +4,8 @@ from django.utils import timezone
 
 from zabbix_integration.services.sync_full import run_full_sync
 from zabbix_integration.services.sync_incremental import run_incremental_sync
-from clientes.models import Cliente
+from zabbix_integration.services.sync_lock import run_with_tenant_lock
+from zabbix_integration.services.scheduler import active_tenants
 
 
 class Command(BaseCommand):
@@ -28,7 +29,7 @@ class Command(BaseCommand):
         parser.add_argument(
             "--todos",
             action="store_true",
-            help="Executar para todos os clientes"
+            help="Executar para todos os clientes com conexão Zabbix ativa"
         )
 
     def handle(self, *args, **options):
@@ -46,7 +47,8 @@ class Command(BaseCommand):
             return
 
         if todos:
-            clientes = Cliente.objects.values_list("id", flat=True)
+            # só clientes com ZabbixConnection ativa
+            clientes = [cid for cid, _ in active_tenants()]
         else:
             clientes = [cliente_id]
 
@@ -60,15 +62,21 @@ class Command(BaseCommand):
 
             inicio = time.time()
 
-            if tipo == "full":
-                run_full_sync(cid)
+            # 🔒 mesmo lock das tasks Celery: não roda junto com um worker
+            resultados = []
 
-            elif tipo == "incremental":
-                run_incremental_sync(cid)
+            if tipo in ("full", "ambos"):
+                resultados.append(run_with_tenant_lock(cid, run_full_sync))
 
-            elif tipo == "ambos":
-                run_full_sync(cid)
-                run_incremental_sync(cid)
+            if tipo in ("incremental", "ambos"):
+                resultados.append(run_with_tenant_lock(cid, run_incremental_sync))
+
+            if any(r["status"] == "skipped" for r in resultados):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"⏭️ Cliente {cid}: sync já em execução em outro processo, pulado"
+                    )
+                )
 
             duracao = round(time.time() - inicio, 2)
 
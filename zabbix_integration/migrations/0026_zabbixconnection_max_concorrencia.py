@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0025_zabbixevent_c_eventid_zabbixevent_opdata_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zabbixconnection',
+            name='max_concorrencia',
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+    ]
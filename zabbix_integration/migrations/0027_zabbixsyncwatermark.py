@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0026_zabbixconnection_max_concorrencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixSyncWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=50)),
+                ('last_id', models.BigIntegerField(blank=True, null=True)),
+                ('last_clock', models.DateTimeField(blank=True, null=True)),
+                ('extra', models.JSONField(blank=True, default=dict)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+            ],
+            options={
+                'unique_together': {('cliente', 'entity')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0027_zabbixsyncwatermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zabbixsynccontrol',
+            name='full_queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixsynccontrol',
+            name='incremental_queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixsynccontrol',
+            name='runs_coalesced',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='zabbixsynccontrol',
+            name='runs_skipped',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0028_zabbixsynccontrol_queue_and_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zabbixconnection',
+            name='intervalo_sync_segundos',
+            field=models.PositiveIntegerField(default=300),
+        ),
+    ]
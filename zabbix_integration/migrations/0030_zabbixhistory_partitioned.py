@@ -0,0 +1,90 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:06
+
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+TABLES = (
+    ("zabbix_integration_zabbixhistorynumeric", "double precision"),
+    ("zabbix_integration_zabbixhistorytext", "text"),
+)
+
+
+def _create_sql(table, value_type):
+    # particionada por mês em clock; a PK precisa conter a chave de partição
+    return f"""
+        CREATE TABLE {table} (
+            item_id bigint NOT NULL
+                REFERENCES zabbix_integration_zabbixitem (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            clock timestamp with time zone NOT NULL,
+            ns integer NOT NULL DEFAULT 0,
+            value {value_type} NOT NULL,
+            PRIMARY KEY (item_id, clock, ns)
+        ) PARTITION BY RANGE (clock);
+    """
+
+
+def create_initial_partitions(apps, schema_editor):
+    """
+    Partições do mês atual e do próximo; as seguintes são criadas pela task
+    maintain_history_partitions (e sob demanda pela ingestão).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    hoje = date.today()
+    meses = [(hoje.year, hoje.month)]
+    meses.append((hoje.year + (hoje.month // 12), hoje.month % 12 + 1))
+
+    for table, _ in TABLES:
+        for ano, mes in meses:
+            inicio = date(ano, mes, 1)
+            fim = date(ano + (mes // 12), mes % 12 + 1, 1)
+            schema_editor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_p{ano}{mes:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0029_zabbixconnection_intervalo_sync_segundos'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ZabbixHistoryNumeric',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('item', 'clock', 'ns', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('clock', models.DateTimeField()),
+                        ('ns', models.IntegerField(default=0)),
+                        ('value', models.FloatField()),
+                        ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='history_numeric', to='zabbix_integration.zabbixitem')),
+                    ],
+                ),
+                migrations.CreateModel(
+                    name='ZabbixHistoryText',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('item', 'clock', 'ns', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('clock', models.DateTimeField()),
+                        ('ns', models.IntegerField(default=0)),
+                        ('value', models.TextField()),
+                        ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='history_text', to='zabbix_integration.zabbixitem')),
+                    ],
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    _create_sql(table, value_type),
+                    reverse_sql=f"DROP TABLE IF EXISTS {table} CASCADE;",
+                )
+                for table, value_type in TABLES
+            ],
+        ),
+        migrations.RunPython(create_initial_partitions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0030_zabbixhistory_partitioned'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixHistoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('5m', '5 minutos'), ('1h', '1 hora'), ('1d', '1 dia')], max_length=2)),
+                ('bucket', models.DateTimeField()),
+                ('min', models.FloatField()),
+                ('max', models.FloatField()),
+                ('avg', models.FloatField()),
+                ('sum', models.FloatField()),
+                ('count', models.IntegerField()),
+                ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='zabbix_integration.zabbixitem')),
+            ],
+            options={
+                'unique_together': {('item', 'resolution', 'bucket')},
+            },
+        ),
+    ]
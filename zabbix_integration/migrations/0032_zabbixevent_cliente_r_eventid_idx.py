@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0031_zabbixhistoryrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='zabbixevent',
+            index=models.Index(fields=['cliente', 'r_eventid'], name='zabbix_inte_cliente_eecd21_idx'),
+        ),
+    ]
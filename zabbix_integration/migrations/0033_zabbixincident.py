@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0032_zabbixevent_cliente_r_eventid_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixIncident',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('eventid', models.CharField(max_length=50)),
+                ('r_eventid', models.CharField(blank=True, max_length=50, null=True)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField(blank=True, null=True)),
+                ('duration_seconds', models.IntegerField(blank=True, null=True)),
+                ('hostid', models.CharField(blank=True, max_length=50, null=True)),
+                ('hostname', models.CharField(blank=True, max_length=255, null=True)),
+                ('triggerid', models.CharField(blank=True, max_length=50, null=True)),
+                ('severity', models.IntegerField(blank=True, null=True)),
+                ('name', models.CharField(blank=True, max_length=255, null=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+                ('host', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='zabbix_integration.zabbixhost')),
+                ('trigger', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='zabbix_integration.zabbixtrigger')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cliente', 'start'], name='zabbix_inte_cliente_6fa435_idx'), models.Index(fields=['cliente', 'end'], name='zabbix_inte_cliente_7801f6_idx'), models.Index(fields=['cliente', 'hostid', 'start'], name='zabbix_inte_cliente_f2ba49_idx'), models.Index(fields=['cliente', 'triggerid', 'end'], name='zabbix_inte_cliente_f556c3_idx')],
+                'unique_together': {('cliente', 'eventid')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0033_zabbixincident'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixRelatorioJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluido', 'Concluído'), ('erro', 'Erro')], default='pendente', max_length=20)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('arquivo', models.CharField(blank=True, max_length=500, null=True)),
+                ('total_linhas', models.IntegerField(blank=True, null=True)),
+                ('erro', models.TextField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cliente', 'criado_em'], name='zabbix_inte_cliente_528c09_idx')],
+            },
+        ),
+    ]
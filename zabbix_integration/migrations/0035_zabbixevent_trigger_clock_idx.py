@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0034_zabbixrelatoriojob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='zabbixevent',
+            index=models.Index(fields=['trigger', 'clock'], name='zabbix_inte_trigger_18582a_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0035_zabbixevent_trigger_clock_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixSLAMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slaid', models.CharField(max_length=50)),
+                ('ano', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('name', models.CharField(blank=True, max_length=255, null=True)),
+                ('slo', models.FloatField(blank=True, null=True)),
+                ('sli_avg', models.FloatField(blank=True, null=True)),
+                ('uptime_seconds', models.BigIntegerField(default=0)),
+                ('downtime_seconds', models.BigIntegerField(default=0)),
+                ('services', models.JSONField(blank=True, default=list)),
+                ('period_from', models.BigIntegerField()),
+                ('period_to', models.BigIntegerField()),
+                ('fechado', models.BooleanField(default=False)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cliente', 'ano', 'mes'], name='zabbix_inte_cliente_826428_idx')],
+                'unique_together': {('cliente', 'slaid', 'ano', 'mes')},
+            },
+        ),
+    ]
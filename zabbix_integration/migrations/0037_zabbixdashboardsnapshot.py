@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0036_zabbixslamensal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixDashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('kpis', models.JSONField(blank=True, default=dict)),
+                ('kpis_hash', models.CharField(max_length=64)),
+                ('resumo_executivo', models.TextField(blank=True, null=True)),
+                ('resumo_hash', models.CharField(blank=True, max_length=64, null=True)),
+                ('resumo_gerado_em', models.DateTimeField(blank=True, null=True)),
+                ('calculado_em', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+            ],
+            options={
+                'unique_together': {('cliente', 'ano', 'mes')},
+            },
+        ),
+    ]
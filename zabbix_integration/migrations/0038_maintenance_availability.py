@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0037_zabbixdashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixAvailabilityMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('escopo', models.CharField(choices=[('host', 'Host'), ('grupo', 'Grupo de hosts'), ('cliente', 'Cliente')], max_length=10)),
+                ('chave', models.CharField(blank=True, default='', max_length=50)),
+                ('nome', models.CharField(blank=True, max_length=255, null=True)),
+                ('hosts', models.IntegerField(default=1)),
+                ('periodo_segundos', models.BigIntegerField(default=0)),
+                ('indisponivel_segundos', models.BigIntegerField(default=0)),
+                ('manutencao_segundos', models.BigIntegerField(default=0)),
+                ('disponibilidade', models.FloatField(blank=True, null=True)),
+                ('calculado_ate', models.BigIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+            ],
+            options={
+                'unique_together': {('cliente', 'ano', 'mes', 'escopo', 'chave')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ZabbixMaintenance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('maintenanceid', models.CharField(max_length=50)),
+                ('name', models.CharField(blank=True, max_length=255, null=True)),
+                ('active_since', models.DateTimeField(blank=True, null=True)),
+                ('active_till', models.DateTimeField(blank=True, null=True)),
+                ('hostids', models.JSONField(blank=True, default=list)),
+                ('groupids', models.JSONField(blank=True, default=list)),
+                ('periods', models.JSONField(blank=True, default=list)),
+                ('raw', models.JSONField(blank=True, default=dict)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+            ],
+            options={
+                'unique_together': {('cliente', 'maintenanceid')},
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0038_maintenance_availability'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZabbixRawPayload',
+            fields=[
+                ('hash', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('data', models.BinaryField()),
+                ('tamanho_original', models.IntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='zabbixalarm',
+            name='raw_hash',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixevent',
+            name='raw_hash',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixhost',
+            name='raw_hash',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixitem',
+            name='raw_hash',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixtrigger',
+            name='raw_hash',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+    ]
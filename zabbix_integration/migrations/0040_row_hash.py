@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0039_raw_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zabbixhost',
+            name='row_hash',
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixitem',
+            name='row_hash',
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixtrigger',
+            name='row_hash',
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+    ]
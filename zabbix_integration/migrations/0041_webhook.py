@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0040_row_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zabbixconnection',
+            name='ultimo_webhook_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='zabbixconnection',
+            name='webhook_token',
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.CreateModel(
+            name='ZabbixWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.JSONField()),
+                ('recebido_em', models.DateTimeField(auto_now_add=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clientes.cliente')),
+            ],
+        ),
+    ]
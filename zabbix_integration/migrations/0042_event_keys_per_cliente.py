@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cliente_logotipo'),
+        ('zabbix_integration', '0041_webhook'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='zabbixalarmevent',
+            name='eventid',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='zabbixalertsent',
+            name='alertid',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='zabbixevent',
+            name='eventid',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterUniqueTogether(
+            name='zabbixalarmevent',
+            unique_together={('cliente', 'eventid')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='zabbixalertsent',
+            unique_together={('cliente', 'alertid')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='zabbixevent',
+            unique_together={('cliente', 'eventid')},
+        ),
+    ]
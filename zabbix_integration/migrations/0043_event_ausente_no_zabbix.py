@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0042_event_keys_per_cliente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zabbixevent',
+            name='ausente_no_zabbix',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:49
+
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+TABLE = "zabbix_integration_zabbixhistoryuint"
+NUMERIC_TABLE = "zabbix_integration_zabbixhistorynumeric"
+ITEM_TABLE = "zabbix_integration_zabbixitem"
+
+# mesma estrutura da 0030, com o valor em numeric(20,0) (uint64 do Zabbix)
+CREATE_SQL = f"""
+    CREATE TABLE {TABLE} (
+        item_id bigint NOT NULL
+            REFERENCES {ITEM_TABLE} (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        clock timestamp with time zone NOT NULL,
+        ns integer NOT NULL DEFAULT 0,
+        value numeric(20,0) NOT NULL,
+        PRIMARY KEY (item_id, clock, ns)
+    ) PARTITION BY RANGE (clock);
+"""
+
+
+def _add_month(d: date) -> date:
+    return date(d.year + (d.month // 12), d.month % 12 + 1, 1)
+
+
+def move_uint_history(apps, schema_editor):
+    """
+    Cria as partições do uint para os meses que o histórico numérico já tem
+    (e o atual/próximo) e move para cá as linhas de itens value_type 3.
+    Valores acima de 2^53 já gravados em double continuam arredondados.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [NUMERIC_TABLE],
+        )
+        meses = {
+            date(int(nome[-6:-2]), int(nome[-2:]), 1)
+            for (nome,) in cursor.fetchall()
+            if nome[-6:].isdigit()
+        }
+
+    hoje = date.today()
+    meses |= {date(hoje.year, hoje.month, 1), _add_month(date(hoje.year, hoje.month, 1))}
+
+    for mes in sorted(meses):
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE}_p{mes.year}{mes.month:02d} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{_add_month(mes).isoformat()}')"
+        )
+
+    schema_editor.execute(
+        f"""
+        INSERT INTO {TABLE} (item_id, clock, ns, value)
+        SELECT h.item_id, h.clock, h.ns, round(h.value)::numeric(20,0)
+        FROM {NUMERIC_TABLE} h
+        JOIN {ITEM_TABLE} i ON i.id = h.item_id
+        WHERE i.value_type = 3
+        ON CONFLICT DO NOTHING
+        """
+    )
+    schema_editor.execute(
+        f"""
+        DELETE FROM {NUMERIC_TABLE} h
+        USING {ITEM_TABLE} i
+        WHERE i.id = h.item_id AND i.value_type = 3
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zabbix_integration', '0044_relatorio_job_solicitado_por'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ZabbixHistoryUint',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('item', 'clock', 'ns', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('clock', models.DateTimeField()),
+                        ('ns', models.IntegerField(default=0)),
+                        ('value', models.DecimalField(decimal_places=0, max_digits=20)),
+                        ('item', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='history_uint', to='zabbix_integration.zabbixitem')),
+                    ],
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(CREATE_SQL, reverse_sql=f"DROP TABLE IF EXISTS {TABLE} CASCADE;"),
+            ],
+        ),
+        migrations.RunPython(move_uint_history, migrations.RunPython.noop),
+    ]
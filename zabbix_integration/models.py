@@ -1,3 +1,6 @@
+import secrets
+
+from django.conf import settings
 from django.db import models
 
 class ZabbixConnection(models.Model):
@@ -13,12 +16,28 @@ class ZabbixConnection(models.Model):
 
     ativo = models.BooleanField(default=True)
 
+    # limite de chamadas simultâneas ao frontend do cliente (sync concorrente)
+    max_concorrencia = models.PositiveSmallIntegerField(default=4)
+
+    # intervalo do sync incremental deste cliente (o scheduler roda a cada janela)
+    intervalo_sync_segundos = models.PositiveIntegerField(default=300)
+
+    # webhook (media type do Zabbix -> /zabbix/webhook/<cliente_id>/); com webhook ativo
+    # o polling vira reconciliação de baixa frequência
+    webhook_token = models.CharField(max_length=128, blank=True, null=True)
+    ultimo_webhook_em = models.DateTimeField(blank=True, null=True)
+
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"ZabbixConnection({self.cliente.nome})"
 
+    def gerar_webhook_token(self) -> str:
+        self.webhook_token = secrets.token_urlsafe(32)
+        self.save(update_fields=["webhook_token", "atualizado_em"])
+        return self.webhook_token
+
 class ZabbixHostGroup(models.Model):
     cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
 
@@ -49,6 +68,8 @@ class ZabbixHost(models.Model):
 
     groups = models.ManyToManyField(ZabbixHostGroup, related_name="hosts", blank=True)
     raw = models.JSONField(default=dict, blank=True)
+    raw_hash = models.CharField(max_length=32, blank=True, null=True)  # xxh3-128 do payload (ver services.raw_storage)
+    row_hash = models.CharField(max_length=16, blank=True, null=True)  # xxh3-64 dos campos normalizados (ver services.change_detection)
 
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
@@ -75,6 +96,8 @@ class ZabbixTrigger(models.Model):
     status = models.BooleanField(null=True)
 
     raw = models.JSONField(null=True)
+    raw_hash = models.CharField(max_length=32, blank=True, null=True)
+    row_hash = models.CharField(max_length=16, blank=True, null=True)
     
     # 🔥 AGORA CORRETO
     items = models.ManyToManyField(
@@ -123,6 +146,8 @@ class ZabbixItem(models.Model):
     atualizado_em = models.DateTimeField(auto_now=True)
     
     raw = models.JSONField(blank=True, null=True)
+    raw_hash = models.CharField(max_length=32, blank=True, null=True)
+    row_hash = models.CharField(max_length=16, blank=True, null=True)
 
     class Meta:
         unique_together = ("cliente", "itemid")
@@ -149,9 +174,74 @@ class ZabbixHistory(models.Model):
             models.Index(fields=["cliente", "item", "clock"]),
         ]
 
+class ZabbixHistoryNumeric(models.Model):
+    """
+    Histórico numérico float (value_type 0) em colunas tipadas.
+
+    Tabela particionada por mês em `clock` no Postgres (ver migração 0030 e
+    services/history_partitions.py); retenção = DROP da partição inteira.
+    """
+    pk = models.CompositePrimaryKey("item", "clock", "ns")
+
+    item = models.ForeignKey("zabbix_integration.ZabbixItem", on_delete=models.CASCADE, related_name="history_numeric", db_index=False)
+    clock = models.DateTimeField()
+    ns = models.IntegerField(default=0)
+    value = models.FloatField()
+
+
+class ZabbixHistoryUint(models.Model):
+    """
+    Histórico numérico uint (value_type 3), particionado como o float.
+    numeric(20,0) como no Zabbix: contadores acima de 2^53 (bytes) não cabem exatos em double.
+    """
+    pk = models.CompositePrimaryKey("item", "clock", "ns")
+
+    item = models.ForeignKey("zabbix_integration.ZabbixItem", on_delete=models.CASCADE, related_name="history_uint", db_index=False)
+    clock = models.DateTimeField()
+    ns = models.IntegerField(default=0)
+    value = models.DecimalField(max_digits=20, decimal_places=0)
+
+
+class ZabbixHistoryText(models.Model):
+    """
+    Histórico texto (value_type 1 char / 2 log / 4 text), particionado como o numérico.
+    """
+    pk = models.CompositePrimaryKey("item", "clock", "ns")
+
+    item = models.ForeignKey("zabbix_integration.ZabbixItem", on_delete=models.CASCADE, related_name="history_text", db_index=False)
+    clock = models.DateTimeField()
+    ns = models.IntegerField(default=0)
+    value = models.TextField()
+
+
+class ZabbixHistoryRollup(models.Model):
+    """
+    Agregados do histórico numérico por item em 5m / 1h / 1d
+    (recalculados só nos buckets tocados a cada lote de ingestão).
+    """
+    RESOLUTION_CHOICES = (
+        ("5m", "5 minutos"),
+        ("1h", "1 hora"),
+        ("1d", "1 dia"),
+    )
+
+    item = models.ForeignKey("zabbix_integration.ZabbixItem", on_delete=models.CASCADE, related_name="rollups", db_index=False)
+    resolution = models.CharField(max_length=2, choices=RESOLUTION_CHOICES)
+    bucket = models.DateTimeField()  # início do intervalo
+
+    min = models.FloatField()
+    max = models.FloatField()
+    avg = models.FloatField()
+    sum = models.FloatField()
+    count = models.IntegerField()
+
+    class Meta:
+        unique_together = ("item", "resolution", "bucket")
+
+
 class ZabbixEvent(models.Model):
     cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
-    eventid = models.CharField(max_length=50, unique=True)
+    eventid = models.CharField(max_length=50)
     trigger = models.ForeignKey("zabbix_integration.ZabbixTrigger", null=True, blank=True, on_delete=models.SET_NULL)
     
     name = models.CharField(max_length=255, blank=True, null=True)
@@ -164,6 +254,7 @@ class ZabbixEvent(models.Model):
 
     hostid = models.CharField(max_length=50, blank=True, null=True)  # redundante mas útil para consultas sem join
     raw = models.JSONField(blank=True, null=True)
+    raw_hash = models.CharField(max_length=32, blank=True, null=True)
 
     value = models.IntegerField(blank=True, null=True)
 
@@ -175,11 +266,18 @@ class ZabbixEvent(models.Model):
     c_eventid = models.CharField(max_length=50, blank=True, null=True)  # para relacionar com AlarmEvent se necessário
 
     opdata = models.CharField(max_length=255, blank=True, null=True)  # operação: trigger, discovery, auto-reg, etc.
+
+    # problema que o event.get não devolve mais (housekeeping): fora da reconciliação de r_eventid
+    ausente_no_zabbix = models.BooleanField(default=False)
     
     class Meta:
+        # eventid só é único dentro de um servidor Zabbix
+        unique_together = ("cliente", "eventid")
         indexes = [
             models.Index(fields=["cliente", "clock"]),
             models.Index(fields=["cliente", "severity"]),
+            models.Index(fields=["cliente", "r_eventid"]),
+            models.Index(fields=["trigger", "clock"]),
         ]
 
 class ZabbixTemplate(models.Model):
@@ -260,6 +358,7 @@ class ZabbixAlarm(models.Model):
     hostname = models.CharField(max_length=255, blank=True, null=True)
 
     raw = models.JSONField(blank=True, null=True)
+    raw_hash = models.CharField(max_length=32, blank=True, null=True)
 
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
@@ -276,7 +375,7 @@ class ZabbixAlarm(models.Model):
 
 class ZabbixAlarmEvent(models.Model):
     cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
-    eventid = models.CharField(max_length=50, unique=True)
+    eventid = models.CharField(max_length=50)
 
     name = models.CharField(max_length=255, blank=True, null=True)
     severity = models.IntegerField(blank=True, null=True)
@@ -289,6 +388,7 @@ class ZabbixAlarmEvent(models.Model):
     raw = models.JSONField(blank=True, null=True)
 
     class Meta:
+        unique_together = ("cliente", "eventid")
         indexes = [
             models.Index(fields=["cliente", "clock"]),
             models.Index(fields=["cliente", "severity"]),
@@ -296,7 +396,7 @@ class ZabbixAlarmEvent(models.Model):
 
 class ZabbixAlertSent(models.Model):
     cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
-    alertid = models.CharField(max_length=50, unique=True)
+    alertid = models.CharField(max_length=50)
 
     eventid = models.CharField(max_length=50, blank=True, null=True)
     clock = models.DateTimeField()
@@ -309,6 +409,7 @@ class ZabbixAlertSent(models.Model):
     raw = models.JSONField(blank=True, null=True)
 
     class Meta:
+        unique_together = ("cliente", "alertid")
         indexes = [
             models.Index(fields=["cliente", "clock"]),
         ]
@@ -316,4 +417,252 @@ class ZabbixAlertSent(models.Model):
 class ZabbixSyncControl(models.Model):
     cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE) #models.OneToOneField("Cliente", on_delete=models.CASCADE)
     last_full_sync = models.DateTimeField(null=True)
-    last_incremental_sync = models.DateTimeField(null=True)
\ No newline at end of file
+    last_incremental_sync = models.DateTimeField(null=True)
+
+    # dedup de enfileiramento: preenchido ao enfileirar, limpo quando a task termina
+    full_queued_at = models.DateTimeField(null=True, blank=True)
+    incremental_queued_at = models.DateTimeField(null=True, blank=True)
+
+    # métricas: execuções puladas (lock ocupado) e enfileiramentos descartados (já na fila)
+    runs_skipped = models.PositiveIntegerField(default=0)
+    runs_coalesced = models.PositiveIntegerField(default=0)
+
+class ZabbixSyncWatermark(models.Model):
+    """
+    Marca d'água por (cliente, entidade): até onde o sync incremental já gravou.
+
+    Gravada na mesma transação de cada lote, então um sync interrompido
+    recomeça exatamente do último lote confirmado.
+    """
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    entity = models.CharField(max_length=50)  # events, alerts, ...
+
+    last_id = models.BigIntegerField(null=True, blank=True)  # ex.: maior eventid gravado
+    last_clock = models.DateTimeField(null=True, blank=True)  # ex.: clock / lastchange do último registro
+    extra = models.JSONField(default=dict, blank=True)
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("cliente", "entity")
+
+    def __str__(self):
+        return f"{self.cliente_id}:{self.entity} -> {self.last_id}"
+
+
+class ZabbixIncident(models.Model):
+    """
+    Um registro por problema (evento value=1), fechado quando chega a recuperação.
+    Mantido pelo sync de eventos; base de MTTR, relatórios e disponibilidade.
+    """
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    eventid = models.CharField(max_length=50)  # evento de problema
+    r_eventid = models.CharField(max_length=50, blank=True, null=True)  # evento de recuperação
+
+    start = models.DateTimeField()
+    end = models.DateTimeField(null=True, blank=True)  # null = ainda aberto
+    duration_seconds = models.IntegerField(null=True, blank=True)
+
+    host = models.ForeignKey("zabbix_integration.ZabbixHost", on_delete=models.SET_NULL, null=True, blank=True)
+    hostid = models.CharField(max_length=50, blank=True, null=True)
+    hostname = models.CharField(max_length=255, blank=True, null=True)
+
+    trigger = models.ForeignKey("zabbix_integration.ZabbixTrigger", on_delete=models.SET_NULL, null=True, blank=True)
+    triggerid = models.CharField(max_length=50, blank=True, null=True)
+
+    severity = models.IntegerField(blank=True, null=True)
+    name = models.CharField(max_length=255, blank=True, null=True)
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("cliente", "eventid")
+        indexes = [
+            models.Index(fields=["cliente", "start"]),
+            models.Index(fields=["cliente", "end"]),
+            models.Index(fields=["cliente", "hostid", "start"]),
+            models.Index(fields=["cliente", "triggerid", "end"]),
+        ]
+
+    def __str__(self):
+        return f"{self.hostname or '-'} - {self.name or self.eventid}"
+
+
+class ZabbixRelatorioJob(models.Model):
+    """
+    Geração de relatório em background (Celery); o arquivo fica em MEDIA_ROOT/relatorios.
+    """
+    STATUS_CHOICES = (
+        ("pendente", "Pendente"),
+        ("processando", "Processando"),
+        ("concluido", "Concluído"),
+        ("erro", "Erro"),
+    )
+
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    solicitado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+    tipo = models.CharField(max_length=50)  # ex.: eventos_recovery
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pendente")
+    parametros = models.JSONField(default=dict, blank=True)
+
+    arquivo = models.CharField(max_length=500, blank=True, null=True)
+    total_linhas = models.IntegerField(null=True, blank=True)
+    erro = models.TextField(blank=True, null=True)
+
+    criado_em = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["cliente", "criado_em"]),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.pk} ({self.status})"
+
+
+class ZabbixSLAMensal(models.Model):
+    """
+    Resultado de sla.getsli por (cliente, SLA, mês). Meses fechados não mudam:
+    são servidos daqui sem consultar o Zabbix.
+    """
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    slaid = models.CharField(max_length=50)
+    ano = models.IntegerField()
+    mes = models.IntegerField()
+
+    name = models.CharField(max_length=255, blank=True, null=True)
+    slo = models.FloatField(blank=True, null=True)
+    sli_avg = models.FloatField(blank=True, null=True)
+    uptime_seconds = models.BigIntegerField(default=0)
+    downtime_seconds = models.BigIntegerField(default=0)
+    services = models.JSONField(default=list, blank=True)
+
+    period_from = models.BigIntegerField()
+    period_to = models.BigIntegerField()
+    fechado = models.BooleanField(default=False)  # mês encerrado quando foi gravado
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("cliente", "slaid", "ano", "mes")
+        indexes = [
+            models.Index(fields=["cliente", "ano", "mes"]),
+        ]
+
+
+class ZabbixDashboardSnapshot(models.Model):
+    """
+    Dashboard executivo pré-calculado por (cliente, ano, mês).
+    kpis_hash identifica os números de entrada; o resumo da IA só é refeito
+    quando ele muda (resumo_hash != kpis_hash).
+    """
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    ano = models.IntegerField()
+    mes = models.IntegerField()
+
+    kpis = models.JSONField(default=dict, blank=True)
+    kpis_hash = models.CharField(max_length=64)
+
+    resumo_executivo = models.TextField(blank=True, null=True)
+    resumo_hash = models.CharField(max_length=64, blank=True, null=True)
+    resumo_gerado_em = models.DateTimeField(blank=True, null=True)
+
+    calculado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("cliente", "ano", "mes")
+
+    def __str__(self):
+        return f"{self.cliente_id} {self.mes:02d}/{self.ano}"
+
+
+class ZabbixMaintenance(models.Model):
+    """
+    Janela de manutenção (maintenance.get). periods guarda os timeperiods como
+    vieram do Zabbix; são expandidos em intervalos no cálculo de disponibilidade
+    (tempo em manutenção não conta como indisponibilidade).
+    """
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    maintenanceid = models.CharField(max_length=50)
+    name = models.CharField(max_length=255, blank=True, null=True)
+
+    active_since = models.DateTimeField(blank=True, null=True)
+    active_till = models.DateTimeField(blank=True, null=True)
+
+    hostids = models.JSONField(default=list, blank=True)
+    groupids = models.JSONField(default=list, blank=True)
+    periods = models.JSONField(default=list, blank=True)
+
+    raw = models.JSONField(default=dict, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("cliente", "maintenanceid")
+
+    def __str__(self):
+        return f"{self.name} ({self.maintenanceid})"
+
+
+class ZabbixAvailabilityMensal(models.Model):
+    """
+    Disponibilidade pré-calculada por mês, a partir dos incidentes
+    (intervalos unidos, descontada a manutenção).
+    escopo: host (chave=hostid), grupo (chave=groupid) ou cliente (chave="").
+    """
+    ESCOPO_HOST = "host"
+    ESCOPO_GRUPO = "grupo"
+    ESCOPO_CLIENTE = "cliente"
+    ESCOPO_CHOICES = [
+        (ESCOPO_HOST, "Host"),
+        (ESCOPO_GRUPO, "Grupo de hosts"),
+        (ESCOPO_CLIENTE, "Cliente"),
+    ]
+
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    ano = models.IntegerField()
+    mes = models.IntegerField()
+    escopo = models.CharField(max_length=10, choices=ESCOPO_CHOICES)
+    chave = models.CharField(max_length=50, blank=True, default="")
+    nome = models.CharField(max_length=255, blank=True, null=True)
+
+    hosts = models.IntegerField(default=1)
+    periodo_segundos = models.BigIntegerField(default=0)
+    indisponivel_segundos = models.BigIntegerField(default=0)
+    manutencao_segundos = models.BigIntegerField(default=0)
+    disponibilidade = models.FloatField(blank=True, null=True)  # %
+    calculado_ate = models.BigIntegerField(default=0)  # epoch; < fim do mês = mês ainda parcial
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("cliente", "ano", "mes", "escopo", "chave")
+
+
+class ZabbixRawPayload(models.Model):
+    """
+    Payload bruto da API comprimido (zstd), endereçado pelo hash do conteúdo.
+    Usado com ZABBIX_RAW_STORAGE="compressed": as linhas guardam só raw_hash
+    e payloads iguais são gravados uma vez.
+    """
+    hash = models.CharField(max_length=32, primary_key=True)
+    data = models.BinaryField()
+    tamanho_original = models.IntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.hash
+
+
+class ZabbixWebhookEvent(models.Model):
+    """
+    Buffer dos eventos recebidos pelo webhook. O flush (tasks.flush_webhook_events_task)
+    grava em ZabbixEvent/ZabbixAlarm/ZabbixIncident e apaga as linhas processadas.
+    """
+    cliente = models.ForeignKey("clientes.Cliente", on_delete=models.CASCADE)
+    payload = models.JSONField()
+    recebido_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.cliente_id} {self.payload.get('eventid')}"
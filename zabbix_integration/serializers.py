@@ -7,7 +7,11 @@ class ZabbixConnectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = ZabbixConnection
         fields = "__all__"
-        extra_kwargs = {"senha": {"write_only": True}}
+        extra_kwargs = {
+            "senha": {"write_only": True},
+            "webhook_token": {"write_only": True},
+            "ultimo_webhook_em": {"read_only": True},
+        }
 
 class ZabbixHostSerializer(serializers.ModelSerializer):
     class Meta:
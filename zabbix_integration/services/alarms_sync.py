@@ -3,10 +3,16 @@ from django.db import transaction
 
 from zabbix_integration.services.sync import get_client_for_cliente
 from zabbix_integration.models import ZabbixAlarm, ZabbixAlarmEvent, ZabbixAlertSent
+from .bulk import bulk_upsert
+from .event_stream import iter_events
+from .utils import chunked
 
 from django.utils.dateparse import parse_datetime
 
 
+TRIGGERS_PER_CALL = 200
+
+
 def _dt(epoch: str | int) -> datetime:
     return datetime.fromtimestamp(int(epoch), tz=timezone.utc)
 
@@ -63,8 +69,8 @@ def sync_active_alarms(
         selectTags="extend",
     ) or []
 
-    upserts = 0
     results = []
+    rows = []
 
     for p in problems:
         hosts = p.get("hosts") or []
@@ -77,21 +83,26 @@ def sync_active_alarms(
             hostid = str(hosts[0].get("hostid"))
             hostname = hosts[0].get("name")
 
-        ZabbixAlarm.objects.update_or_create(
-            cliente_id=cliente_id,
-            eventid=str(p["eventid"]),
-            defaults={
-                "name": p.get("name") or "",
-                "severity": int(p.get("severity") or 0),
-                "acknowledged": bool(int(p.get("acknowledged") or 0)),
-                "clock": _dt(p["clock"]),
-                "hostid": hostid,
-                "hostname": hostname,
-                "raw": p,
-            },
+        rows.append(
+            ZabbixAlarm(
+                cliente_id=cliente_id,
+                eventid=str(p["eventid"]),
+                name=p.get("name") or "",
+                severity=int(p.get("severity") or 0),
+                acknowledged=bool(int(p.get("acknowledged") or 0)),
+                clock=_dt(p["clock"]),
+                hostid=hostid,
+                hostname=hostname,
+                raw=p,
+            )
         )
 
-        upserts += 1
+    upserts = bulk_upsert(
+        ZabbixAlarm,
+        rows,
+        unique_fields=["cliente", "eventid"],
+        update_fields=["name", "severity", "acknowledged", "clock", "hostid", "hostname", "raw", "atualizado_em"],
+    )
 
     return {
         "cliente_id": cliente_id,
@@ -128,75 +139,102 @@ def sync_alarm_events(
     since_hours: int | None = None,
     data_inicio: str | None = None,
     data_fim: str | None = None,
-    limit: int = 2000,
+    limit: int | None = None,
 ) -> dict:
     """
     Captura eventos (event.get) e GRAVA no banco.
+
+    Pagina por eventid (sem perder eventos em janelas grandes); `limit`, se
+    informado, grava só os `limit` eventos mais recentes (paginação DESC).
     """
     client = get_client_for_cliente(cliente_id)
     time_from, time_till = _resolve_periodo(since_hours, data_inicio, data_fim)
 
-    # ✅ inclua objectid (triggerid) para mapear host
-    params = {
-        "output": ["eventid", "clock", "value", "name", "severity", "acknowledged", "objectid"],
-        "time_from": time_from,
-        "time_till": time_till,
-        "source": 0,  # trigger events
-        "object": 0,  # trigger
-        "sortfield": ["eventid"],
-        "sortorder": "DESC",
-        "limit": limit,
-        # ⚠️ remova selectHosts se seu Zabbix estiver retornando 500
-        # "selectHosts": ["hostid", "name"],
-    }
-
-    events = client._call("event.get", params) or []
-
-    # ---- resolve host via trigger.get (porque event.get nem sempre traz hosts)
-    trigger_ids = list({str(e.get("objectid")) for e in events if e.get("objectid")})
+    # triggerid -> host, acumulado entre as páginas
     trigger_host_map: dict[str, dict] = {}
 
-    if trigger_ids:
-        triggers = client._call("trigger.get", {
-            "output": ["triggerid"],
-            "triggerids": trigger_ids,
-            "selectHosts": ["hostid", "name"],
-        }) or []
-
-        for t in triggers:
-            hosts = t.get("hosts") or []
-            if hosts:
-                trigger_host_map[str(t.get("triggerid"))] = {
-                    "hostid": str(hosts[0].get("hostid")),
-                    "hostname": hosts[0].get("name"),
-                }
-
+    total_recebido = 0
     upserts = 0
-    for e in events:
-        triggerid = str(e.get("objectid")) if e.get("objectid") else None
-        host_data = trigger_host_map.get(triggerid or "", {})
 
-        ZabbixAlarmEvent.objects.update_or_create(
-            cliente_id=cliente_id,
-            eventid=str(e.get("eventid")),
-            defaults={
-                "clock": _dt(e.get("clock")),
-                "name": e.get("name") or "",
-                "severity": int(e.get("severity") or 0),
-                "acknowledged": bool(int(e.get("acknowledged") or 0)),
-                #"value": int(e.get("value") or 0),
-                #"triggerid": triggerid,
-                "hostid": host_data.get("hostid"),
-                "hostname": host_data.get("hostname"),
-                "raw": e,
-            },
+    # ✅ inclua objectid (triggerid) para mapear host
+    for events in iter_events(
+        client,
+        time_from=time_from,
+        time_till=time_till,
+        output=["eventid", "clock", "value", "name", "severity", "acknowledged", "objectid"],
+        source=0,  # trigger events
+        object=0,  # trigger
+        descending=limit is not None,
+        # ⚠️ remova selectHosts se seu Zabbix estiver retornando 500
+        # "selectHosts": ["hostid", "name"],
+    ):
+        if limit is not None:
+            events = events[:max(limit - total_recebido, 0)]
+            if not events:
+                break
+
+        total_recebido += len(events)
+
+        # ---- resolve host via trigger.get (porque event.get nem sempre traz hosts)
+        trigger_ids = list({
+            str(e.get("objectid")) for e in events
+            if e.get("objectid") and str(e.get("objectid")) not in trigger_host_map
+        })
+
+        if trigger_ids:
+            # trigger.get em blocos, todos no mesmo POST (JSON-RPC batch)
+            with client.batch() as batch:
+                request_ids = [
+                    batch.add("trigger.get", {
+                        "output": ["triggerid"],
+                        "triggerids": trigger_chunk,
+                        "selectHosts": ["hostid", "name"],
+                    })
+                    for trigger_chunk in chunked(trigger_ids, TRIGGERS_PER_CALL)
+                ]
+
+            for triggerid in trigger_ids:
+                trigger_host_map[triggerid] = {}
+
+            for request_id in request_ids:
+                for t in batch.result(request_id) or []:
+                    hosts = t.get("hosts") or []
+                    if hosts:
+                        trigger_host_map[str(t.get("triggerid"))] = {
+                            "hostid": str(hosts[0].get("hostid")),
+                            "hostname": hosts[0].get("name"),
+                        }
+
+        rows = []
+        for e in events:
+            triggerid = str(e.get("objectid")) if e.get("objectid") else None
+            host_data = trigger_host_map.get(triggerid or "", {})
+
+            rows.append(
+                ZabbixAlarmEvent(
+                    cliente_id=cliente_id,
+                    eventid=str(e.get("eventid")),
+                    clock=_dt(e.get("clock")),
+                    name=e.get("name") or "",
+                    severity=int(e.get("severity") or 0),
+                    acknowledged=bool(int(e.get("acknowledged") or 0)),
+                    hostid=host_data.get("hostid"),
+                    hostname=host_data.get("hostname"),
+                    raw=e,
+                )
+            )
+
+        upserts += bulk_upsert(
+            ZabbixAlarmEvent,
+            rows,
+            unique_fields=["cliente", "eventid"],
+            update_fields=["clock", "name", "severity", "acknowledged", "hostid", "hostname", "raw"],
         )
-        upserts += 1
 
     return {
         "cliente_id": cliente_id,
         "periodo": {"time_from": time_from, "time_till": time_till},
-        "total_recebido": len(events),
+        "total_recebido": total_recebido,
         "gravados": upserts,
     }
 
@@ -216,22 +254,35 @@ def sync_alerts_sent(cliente_id: int, since_hours: int = 24, limit: int = 2000,)
         limit=limit,
     ) or []
 
-    created = 0
-    for a in alerts:
-        obj, was_created = ZabbixAlertSent.objects.update_or_create(
+    alertids = [str(a["alertid"]) for a in alerts]
+    existentes = set(
+        ZabbixAlertSent.objects
+        .filter(cliente_id=cliente_id, alertid__in=alertids)
+        .values_list("alertid", flat=True)
+    )
+
+    rows = [
+        ZabbixAlertSent(
+            cliente_id=cliente_id,
             alertid=str(a["alertid"]),
-            defaults={
-                "cliente_id": cliente_id,
-                "eventid": str(a.get("eventid")) if a.get("eventid") else None,
-                "clock": _dt(a["clock"]),
-                "sendto": a.get("sendto"),
-                "subject": a.get("subject"),
-                "message": a.get("message"),
-                "status": int(a.get("status") or 0) if a.get("status") is not None else None,
-                "raw": a,
-            },
+            eventid=str(a.get("eventid")) if a.get("eventid") else None,
+            clock=_dt(a["clock"]),
+            sendto=a.get("sendto"),
+            subject=a.get("subject"),
+            message=a.get("message"),
+            status=int(a.get("status") or 0) if a.get("status") is not None else None,
+            raw=a,
         )
-        if was_created:
-            created += 1
+        for a in alerts
+    ]
+
+    bulk_upsert(
+        ZabbixAlertSent,
+        rows,
+        unique_fields=["cliente", "alertid"],
+        update_fields=["eventid", "clock", "sendto", "subject", "message", "status", "raw"],
+    )
+
+    created = len(set(alertids) - existentes)
 
     return {"synced_alerts": len(alerts), "new_alerts": created, "since_hours": since_hours}
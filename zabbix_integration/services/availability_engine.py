@@ -0,0 +1,306 @@
+import calendar
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from zabbix_integration.models import (
+    ZabbixAvailabilityMensal,
+    ZabbixHost,
+    ZabbixIncident,
+    ZabbixMaintenance,
+)
+
+
+DEFAULT_MIN_SEVERITY = 4
+DIA = 86400
+SEMANA = 7 * DIA
+
+# timeperiod_type do Zabbix
+PERIODO_UNICO = 0
+PERIODO_DIARIO = 2
+PERIODO_SEMANAL = 3
+PERIODO_MENSAL = 4
+
+# mensal por dia da semana: every = ocorrência no mês (1ª..4ª, 5 = última)
+ULTIMA_SEMANA = 5
+
+
+def _month_range_epoch(ano: int, mes: int) -> tuple[int, int]:
+    inicio = datetime(ano, mes, 1, tzinfo=timezone.utc)
+    fim = datetime(ano + 1, 1, 1, tzinfo=timezone.utc) if mes == 12 else datetime(ano, mes + 1, 1, tzinfo=timezone.utc)
+    return int(inicio.timestamp()), int(fim.timestamp())
+
+
+def _vazio():
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+
+def merge_intervals(starts, ends) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Une intervalos [start, end) sobrepostos/encostados. Retorna (starts, ends) ordenados e disjuntos.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+
+    validos = ends > starts
+    starts, ends = starts[validos], ends[validos]
+    if starts.size == 0:
+        return _vazio()
+
+    ordem = np.argsort(starts, kind="stable")
+    starts, ends = starts[ordem], ends[ordem]
+
+    # começa um novo bloco quando o início passa do maior fim visto até ali
+    fim_acumulado = np.maximum.accumulate(ends)
+    novo = np.empty(starts.size, dtype=bool)
+    novo[0] = True
+    novo[1:] = starts[1:] > fim_acumulado[:-1]
+
+    inicios_bloco = np.flatnonzero(novo)
+    return starts[inicios_bloco], np.maximum.reduceat(ends, inicios_bloco)
+
+
+def _contem(starts: np.ndarray, ends: np.ndarray, pontos: np.ndarray) -> np.ndarray:
+    if starts.size == 0:
+        return np.zeros(pontos.size, dtype=bool)
+    idx = np.searchsorted(starts, pontos, side="right") - 1
+    return (idx >= 0) & (pontos < ends[np.clip(idx, 0, None)])
+
+
+def split_downtime(inc_starts, inc_ends, man_starts, man_ends) -> tuple[int, int]:
+    """
+    Recebe incidentes e manutenções já unidos (merge_intervals).
+    Retorna (segundos indisponível fora de manutenção, segundos em manutenção).
+    """
+    pontos = np.unique(np.concatenate([inc_starts, inc_ends, man_starts, man_ends]))
+    if pontos.size < 2:
+        return 0, 0
+
+    # segmentos elementares entre pontos consecutivos: cada um está todo dentro ou todo fora
+    larguras = np.diff(pontos)
+    meios = pontos[:-1] + larguras / 2
+
+    em_incidente = _contem(inc_starts, inc_ends, meios)
+    em_manutencao = _contem(man_starts, man_ends, meios)
+
+    return int(larguras[em_incidente & ~em_manutencao].sum()), int(larguras[em_manutencao].sum())
+
+
+def _dias_mensais(ano: int, mes: int, tp: dict) -> list[int]:
+    """
+    Dias (1..31) do mês em que um timeperiod mensal dispara: `day` fixo ou
+    `dayofweek` (bit 0 = segunda) na ocorrência `every` do mês.
+    """
+    ultimo_dia = calendar.monthrange(ano, mes)[1]
+
+    dia = int(tp.get("day") or 0)
+    if dia:
+        return [dia] if dia <= ultimo_dia else []
+
+    every = int(tp.get("every") or 1)
+    dias = []
+    for d in range(7):
+        if not int(tp.get("dayofweek") or 0) & (1 << d):
+            continue
+        ocorrencias = [x for x in range(1, ultimo_dia + 1) if calendar.weekday(ano, mes, x) == d]
+        if every >= ULTIMA_SEMANA:
+            dias.append(ocorrencias[-1])
+        elif every <= len(ocorrencias):
+            dias.append(ocorrencias[every - 1])
+    return dias
+
+
+def maintenance_intervals(periods: list[dict], active_since: int, active_till: int, inicio: int, fim: int) -> list[tuple[int, int]]:
+    """
+    Expande os timeperiods de uma manutenção em intervalos dentro de [inicio, fim).
+    Suporta período único, diário, semanal e mensal (horários em UTC).
+    """
+    lo = max(inicio, active_since)
+    hi = min(fim, active_till)
+    if hi <= lo:
+        return []
+
+    intervalos = []
+
+    for tp in periods or []:
+        tipo = int(tp.get("timeperiod_type") or 0)
+        duracao = int(tp.get("period") or 0)
+        every = max(int(tp.get("every") or 1), 1)
+        start_time = int(tp.get("start_time") or 0)
+
+        if tipo == PERIODO_UNICO:
+            start = int(tp.get("start_date") or 0)
+            intervalos.append((start, start + duracao))
+
+        elif tipo == PERIODO_DIARIO:
+            dia0 = active_since - active_since % DIA
+            passo = every * DIA
+            k = max(0, (lo - duracao - start_time - dia0) // passo)
+            while dia0 + k * passo + start_time < hi:
+                start = dia0 + k * passo + start_time
+                intervalos.append((start, start + duracao))
+                k += 1
+
+        elif tipo == PERIODO_SEMANAL:
+            # epoch 0 foi quinta-feira: +3 dias alinha na segunda
+            semana0 = active_since - (active_since + 3 * DIA) % SEMANA
+            passo = every * SEMANA
+            dias = [d for d in range(7) if int(tp.get("dayofweek") or 0) & (1 << d)]
+            k = max(0, (lo - duracao - start_time - SEMANA - semana0) // passo)
+            while semana0 + k * passo < hi:
+                for d in dias:
+                    start = semana0 + k * passo + d * DIA + start_time
+                    intervalos.append((start, start + duracao))
+                k += 1
+
+        elif tipo == PERIODO_MENSAL:
+            # `month`: bit 0 = janeiro; começa no mês de (lo - duração) para pegar janela que atravessa a virada
+            meses = int(tp.get("month") or 0)
+            cursor = datetime.fromtimestamp(lo - duracao, tz=timezone.utc)
+            ano, mes = cursor.year, cursor.month
+            while int(datetime(ano, mes, 1, tzinfo=timezone.utc).timestamp()) < hi:
+                if meses & (1 << (mes - 1)):
+                    for dia in _dias_mensais(ano, mes, tp):
+                        start = int(datetime(ano, mes, dia, tzinfo=timezone.utc).timestamp()) + start_time
+                        intervalos.append((start, start + duracao))
+                ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+    return [(max(s, lo), min(e, hi)) for s, e in intervalos if e > lo and s < hi]
+
+
+def _epoch(dt) -> int:
+    return int(dt.timestamp()) if dt else 0
+
+
+def _disponibilidade(periodo: int, indisponivel: int, manutencao: int):
+    util = periodo - manutencao
+    if periodo <= 0:
+        return None
+    if util <= 0:
+        return 100.0
+    return round(100.0 * (util - indisponivel) / util, 4)
+
+
+def calcular_disponibilidade_mensal(cliente_id: int, ano: int, mes: int) -> dict:
+    """
+    Calcula e grava a disponibilidade do mês por host, por grupo e do cliente.
+
+    - indisponibilidade = união dos incidentes do host (severidade >= ZABBIX_AVAILABILITY_MIN_SEVERITY),
+      recortada no mês; incidente aberto vai até agora
+    - tempo em manutenção sai do denominador
+    - grupo/cliente: soma dos tempos dos hosts (equivale à média ponderada pelo tempo)
+    """
+    inicio, fim_mes = _month_range_epoch(ano, mes)
+    agora = int(datetime.now(tz=timezone.utc).timestamp())
+    fim = min(fim_mes, agora)
+
+    if fim <= inicio:
+        return {"cliente_id": cliente_id, "ano": ano, "mes": mes, "hosts": 0, "disponibilidade": None}
+
+    min_severity = getattr(settings, "ZABBIX_AVAILABILITY_MIN_SEVERITY", DEFAULT_MIN_SEVERITY)
+
+    # hosts monitorados
+    hosts = dict(
+        ZabbixHost.objects
+        .filter(cliente_id=cliente_id, status="0")
+        .values_list("hostid", "nome")
+    )
+
+    grupos = defaultdict(set)
+    nomes_grupo = {}
+    for hostid, groupid, nome in (
+        ZabbixHost.groups.through.objects
+        .filter(zabbixhost__cliente_id=cliente_id)
+        .values_list("zabbixhost__hostid", "zabbixhostgroup__groupid", "zabbixhostgroup__name")
+    ):
+        grupos[groupid].add(hostid)
+        nomes_grupo[groupid] = nome
+
+    inicio_dt = datetime.fromtimestamp(inicio, tz=timezone.utc)
+    fim_dt = datetime.fromtimestamp(fim, tz=timezone.utc)
+
+    incidentes = defaultdict(lambda: ([], []))
+    for hostid, start, end in (
+        ZabbixIncident.objects
+        .filter(cliente_id=cliente_id, hostid__in=list(hosts), severity__gte=min_severity, start__lt=fim_dt)
+        .filter(Q(end__isnull=True) | Q(end__gt=inicio_dt))
+        .values_list("hostid", "start", "end")
+        .iterator()
+    ):
+        starts, ends = incidentes[hostid]
+        starts.append(max(_epoch(start), inicio))
+        ends.append(min(_epoch(end) if end else fim, fim))
+
+    manutencoes = defaultdict(list)
+    for m in ZabbixMaintenance.objects.filter(cliente_id=cliente_id):
+        intervalos = maintenance_intervals(
+            m.periods,
+            _epoch(m.active_since),
+            _epoch(m.active_till) or fim,
+            inicio,
+            fim,
+        )
+        if not intervalos:
+            continue
+
+        afetados = set(m.hostids or [])
+        for groupid in m.groupids or []:
+            afetados |= grupos.get(groupid, set())
+
+        for hostid in afetados:
+            manutencoes[hostid].extend(intervalos)
+
+    periodo = fim - inicio
+    por_host = {}
+
+    for hostid in hosts:
+        inc_s, inc_e = merge_intervals(*incidentes[hostid]) if hostid in incidentes else _vazio()
+        man = manutencoes.get(hostid)
+        man_s, man_e = merge_intervals([s for s, _ in man], [e for _, e in man]) if man else _vazio()
+
+        por_host[hostid] = split_downtime(inc_s, inc_e, man_s, man_e)
+
+    def linha(escopo, chave, nome, hostids):
+        indisponivel = sum(por_host[h][0] for h in hostids)
+        manutencao = sum(por_host[h][1] for h in hostids)
+        total = periodo * len(hostids)
+        return ZabbixAvailabilityMensal(
+            cliente_id=cliente_id,
+            ano=ano,
+            mes=mes,
+            escopo=escopo,
+            chave=chave,
+            nome=nome,
+            hosts=len(hostids),
+            periodo_segundos=total,
+            indisponivel_segundos=indisponivel,
+            manutencao_segundos=manutencao,
+            disponibilidade=_disponibilidade(total, indisponivel, manutencao),
+            calculado_ate=fim,
+        )
+
+    rows = [linha(ZabbixAvailabilityMensal.ESCOPO_HOST, h, hosts[h], [h]) for h in hosts]
+    rows += [
+        linha(ZabbixAvailabilityMensal.ESCOPO_GRUPO, groupid, nomes_grupo.get(groupid), [h for h in membros if h in por_host])
+        for groupid, membros in grupos.items()
+        if any(h in por_host for h in membros)
+    ]
+    geral = linha(ZabbixAvailabilityMensal.ESCOPO_CLIENTE, "", None, list(hosts))
+    rows.append(geral)
+
+    with transaction.atomic():
+        ZabbixAvailabilityMensal.objects.filter(cliente_id=cliente_id, ano=ano, mes=mes).delete()
+        ZabbixAvailabilityMensal.objects.bulk_create(rows, batch_size=1000)
+
+    return {
+        "cliente_id": cliente_id,
+        "ano": ano,
+        "mes": mes,
+        "hosts": len(hosts),
+        "grupos": len(rows) - len(hosts) - 1,
+        "disponibilidade": geral.disponibilidade,
+    }
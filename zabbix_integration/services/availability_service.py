@@ -1,19 +1,33 @@
-from django.db.models import Avg
-from zabbix_integration.models import ZabbixHost
+from datetime import datetime, timezone
+from zabbix_integration.models import ZabbixAvailabilityMensal
+from zabbix_integration.services.availability_engine import _month_range_epoch, calcular_disponibilidade_mensal
 
 
 def get_availability_summary(cliente_id: int, ano: int, mes: int) -> dict:
     """
-    Considera que ZabbixHost possui campo disponibilidade_mes (% já calculado)
+    Lê a disponibilidade pré-calculada do mês (ZabbixAvailabilityMensal).
+    Calcula na hora se ainda não existe ou se foi gravada com o mês em andamento
+    e o mês já acabou.
     """
+    _, fim_mes = _month_range_epoch(ano, mes)
+    agora = int(datetime.now(tz=timezone.utc).timestamp())
 
-    hosts = ZabbixHost.objects.filter(cliente_id=cliente_id)
-    print(f"Hosts encontrados para cliente_id={cliente_id}: {hosts.count()}")
-    if not hosts.exists():
-        return {"media": 0.0}
+    geral = ZabbixAvailabilityMensal.objects.filter(
+        cliente_id=cliente_id, ano=ano, mes=mes, escopo=ZabbixAvailabilityMensal.ESCOPO_CLIENTE
+    ).first()
+
+    if geral is None or (geral.calculado_ate < fim_mes <= agora):
+        calcular_disponibilidade_mensal(cliente_id, ano, mes)
+        geral = ZabbixAvailabilityMensal.objects.filter(
+            cliente_id=cliente_id, ano=ano, mes=mes, escopo=ZabbixAvailabilityMensal.ESCOPO_CLIENTE
+        ).first()
+
+    print(f"Disponibilidade cliente_id={cliente_id} {mes}/{ano}: {geral and geral.disponibilidade}%")
+
+    if geral is None or geral.disponibilidade is None:
+        return {"media": None, "hosts": 0}
 
-    media = hosts.aggregate(media=Avg("disponibilidade_mes"))["media"] or 0.0
-    print(f"Disponibilidade média calculada: {media}%")
     return {
-        "media": round(media, 2)
-    }
\ No newline at end of file
+        "media": round(geral.disponibilidade, 2),
+        "hosts": geral.hosts,
+    }
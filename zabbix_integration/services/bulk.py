@@ -0,0 +1,105 @@
+from django.conf import settings
+
+from .raw_storage import RAW_STORAGE_FULL, apply_raw_policy, drop_unchanged, get_raw_storage_policy, tracks_raw
+from .utils import chunked
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def get_batch_size(batch_size: int | None = None) -> int:
+    return batch_size or getattr(settings, "ZABBIX_BULK_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+
+def _unique_key(model, obj, unique_fields):
+    return tuple(getattr(obj, model._meta.get_field(f).attname) for f in unique_fields)
+
+
+def bulk_upsert(model, objs, unique_fields: list[str], update_fields: list[str], batch_size: int | None = None) -> int:
+    """
+    Upsert em lote: INSERT ... ON CONFLICT (unique_fields) DO UPDATE SET update_fields.
+
+    Um statement por lote em vez de SELECT + UPDATE/INSERT por linha
+    (update_or_create). Se o mesmo registro vier repetido no payload, vale o
+    último — o Postgres não aceita atualizar a mesma linha duas vezes no
+    mesmo INSERT.
+
+    Retorna a quantidade de registros recebidos (sem repetição), gravados ou
+    não — linhas sem mudança podem ser puladas pela política de raw.
+
+    Atenção: altera os objetos recebidos (raw_hash preenchido e, nas políticas
+    "compressed"/"off", raw esvaziado). Quem precisar do raw depois deve copiá-lo antes.
+    """
+    unicos = {}
+    for obj in objs:
+        unicos[_unique_key(model, obj, unique_fields)] = obj
+
+    if not unicos:
+        return 0
+
+    objs = list(unicos.values())
+    batch_size = get_batch_size(batch_size)
+
+    # 📦 payload bruto conforme ZABBIX_RAW_STORAGE; fora do modo "full", payload igual não é regravado
+    if "raw" in update_fields and tracks_raw(model):
+        policy = get_raw_storage_policy()
+        apply_raw_policy(model, objs, policy)
+        update_fields = [*update_fields, "raw_hash"]
+
+        if policy != RAW_STORAGE_FULL:
+            objs, _ = drop_unchanged(model, objs, unique_fields, update_fields, batch_size)
+
+    for lote in chunked(objs, batch_size):
+        model.objects.bulk_create(
+            lote,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+
+    return len(unicos)
+
+
+def sync_m2m(relation, desired: dict[int, set[int]], batch_size: int | None = None) -> dict:
+    """
+    Aplica numa relação ManyToMany só a diferença entre o que existe e o desejado.
+
+    relation: descritor do M2M (ex.: ZabbixHost.groups)
+    desired: {pk_origem: {pk_destino, ...}} — origens com set vazio perdem todos os vínculos.
+
+    Um SELECT das linhas atuais da tabela intermediária, um DELETE filtrado e
+    um bulk INSERT, em vez de clear()/add()/set() por objeto.
+    """
+    through = relation.through
+    origem = relation.field.m2m_field_name()
+    destino = relation.field.m2m_reverse_field_name()
+
+    if not desired:
+        return {"adicionados": 0, "removidos": 0}
+
+    atuais = through.objects.filter(**{f"{origem}_id__in": list(desired.keys())}).values_list(
+        "id", f"{origem}_id", f"{destino}_id"
+    )
+
+    existentes = set()
+    to_delete = []
+    for pk, src, dst in atuais:
+        if dst in desired.get(src, ()):
+            existentes.add((src, dst))
+        else:
+            to_delete.append(pk)
+
+    to_create = [
+        through(**{f"{origem}_id": src, f"{destino}_id": dst})
+        for src, dsts in desired.items()
+        for dst in dsts
+        if (src, dst) not in existentes
+    ]
+
+    if to_delete:
+        through.objects.filter(id__in=to_delete).delete()
+
+    if to_create:
+        through.objects.bulk_create(to_create, batch_size=get_batch_size(batch_size), ignore_conflicts=True)
+
+    return {"adicionados": len(to_create), "removidos": len(to_delete)}
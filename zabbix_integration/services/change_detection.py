@@ -0,0 +1,67 @@
+from django.utils import timezone
+
+from .raw_storage import apply_raw_policy, get_raw_storage_policy
+from .utils import chunked
+
+
+def prefetch_row_hashes(model, cliente_id: int, key_field: str, keys=None, batch_size: int = 1000) -> dict:
+    """
+    {id Zabbix: (pk, row_hash)} das linhas já gravadas. Sem `keys`, traz o cliente todo.
+    """
+    qs = model.objects.filter(cliente_id=cliente_id)
+
+    if keys is None:
+        return {k: (pk, h) for k, pk, h in qs.values_list(key_field, "id", "row_hash")}
+
+    atuais = {}
+    for lote in chunked(list(keys), batch_size):
+        atuais.update(
+            (k, (pk, h))
+            for k, pk, h in qs.filter(**{f"{key_field}__in": lote}).values_list(key_field, "id", "row_hash")
+        )
+    return atuais
+
+
+def split_changed(objs: list, key_field: str, atuais: dict) -> tuple[list, list, int]:
+    """
+    Compara o row_hash (já calculado em cada objeto) com o gravado.
+    Retorna (novos, alterados com pk preenchido, quantidade inalterada).
+    """
+    novos, alterados = [], []
+    inalterados = 0
+
+    for obj in objs:
+        atual = atuais.get(getattr(obj, key_field))
+        if atual is None:
+            novos.append(obj)
+        elif atual[1] == obj.row_hash:
+            inalterados += 1
+        else:
+            obj.pk = atual[0]
+            alterados.append(obj)
+
+    return novos, alterados, inalterados
+
+
+def update_changed(model, objs: list, fields: list[str], batch_size: int = 1000) -> int:
+    """
+    bulk_update só das linhas alteradas (row_hash e raw conforme a política incluídos).
+    """
+    if not objs:
+        return 0
+
+    fields = [*fields, "row_hash"]
+
+    # bulk_update não aplica auto_now
+    if any(f.name == "atualizado_em" for f in model._meta.concrete_fields):
+        agora = timezone.now()
+        for obj in objs:
+            obj.atualizado_em = agora
+        fields.append("atualizado_em")
+
+    if "raw" in fields:
+        apply_raw_policy(model, objs, get_raw_storage_policy())
+        fields.append("raw_hash")
+
+    model.objects.bulk_update(objs, fields, batch_size=batch_size)
+    return len(objs)
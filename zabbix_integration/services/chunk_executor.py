@@ -0,0 +1,126 @@
+import asyncio
+import inspect
+import queue
+import threading
+
+from django.conf import settings
+
+from .zabbix_async import AsyncZabbixClient
+from .zabbix_client import ZabbixClient
+
+
+DEFAULT_CONCURRENCY = 4
+
+_FIM = object()
+
+# Semáforo por frontend Zabbix: vale para todas as execuções deste processo
+_semaforos: dict[str, tuple[int, threading.BoundedSemaphore]] = {}
+_semaforos_lock = threading.Lock()
+
+
+def _semaforo_conexao(client: ZabbixClient, limite: int) -> threading.BoundedSemaphore:
+    with _semaforos_lock:
+        atual = _semaforos.get(client.endpoint)
+        if not atual or atual[0] != limite:
+            atual = (limite, threading.BoundedSemaphore(limite))
+            _semaforos[client.endpoint] = atual
+        return atual[1]
+
+
+def resolve_concurrency(client: ZabbixClient, concurrency: int | None = None) -> int:
+    """
+    Concorrência efetiva = pedida (ou ZABBIX_SYNC_CONCURRENCY), limitada pela conexão.
+    """
+    pedida = concurrency or getattr(settings, "ZABBIX_SYNC_CONCURRENCY", DEFAULT_CONCURRENCY)
+    limite = getattr(client, "max_concorrencia", None) or pedida
+    return max(1, min(pedida, limite))
+
+
+def run_chunks_concurrently(client: ZabbixClient, chunks, fetch, handle, concurrency: int | None = None) -> int:
+    """
+    Busca N chunks em paralelo (asyncio/httpx numa thread separada) enquanto
+    a thread chamadora grava os resultados — um único "writer", então ORM e
+    transações continuam na conexão de banco de quem chamou.
+
+    fetch(aclient, chunk): coroutine que retorna o resultado do chunk, ou
+        async generator que produz páginas do chunk.
+    handle(chunk, resultado): chamado na thread chamadora, um resultado por vez.
+
+    A fila entre as duas pontas é limitada: se o banco ficar para trás, as
+    buscas esperam (memória não cresce com o tamanho do tenant).
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return 0
+
+    concurrency = resolve_concurrency(client, concurrency)
+    semaforo = _semaforo_conexao(client, getattr(client, "max_concorrencia", None) or concurrency)
+
+    resultados: queue.Queue = queue.Queue(maxsize=concurrency * 2)
+    cancelar = threading.Event()
+
+    def _put(item):
+        while not cancelar.is_set():
+            try:
+                resultados.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    async def _buscar(aclient, chunk):
+        await asyncio.to_thread(semaforo.acquire)
+        try:
+            if cancelar.is_set():
+                return
+            if inspect.isasyncgenfunction(fetch):
+                async for pagina in fetch(aclient, chunk):
+                    if cancelar.is_set():
+                        return
+                    await asyncio.to_thread(_put, ("ok", chunk, pagina))
+            else:
+                resultado = await fetch(aclient, chunk)
+                await asyncio.to_thread(_put, ("ok", chunk, resultado))
+        finally:
+            semaforo.release()
+
+    async def _produzir():
+        pendentes = iter(chunks)
+
+        async with AsyncZabbixClient(client, max_connections=concurrency) as aclient:
+
+            async def _worker():
+                for chunk in pendentes:
+                    if cancelar.is_set():
+                        return
+                    await _buscar(aclient, chunk)
+
+            await asyncio.gather(*(_worker() for _ in range(concurrency)))
+
+    def _thread_produtora():
+        try:
+            asyncio.run(_produzir())
+        except BaseException as e:
+            _put(("erro", None, e))
+        finally:
+            _put((_FIM, None, None))
+
+    produtor = threading.Thread(target=_thread_produtora, name="zabbix-chunk-fetch", daemon=True)
+    produtor.start()
+
+    processados = 0
+    try:
+        while True:
+            status, chunk, valor = resultados.get()
+
+            if status is _FIM:
+                break
+            if status == "erro":
+                raise valor
+
+            handle(chunk, valor)
+            processados += 1
+    finally:
+        cancelar.set()
+        produtor.join()
+
+    return processados
@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .zabbix_client import ZabbixClient
+
+
+DEFAULT_MAX_SIZE = 50
+DEFAULT_TOKEN_TTL = 600
+
+
+def _conexoes_http(client: ZabbixClient) -> int:
+    """
+    Quantas conexões TCP/TLS o urllib3 abriu para esta sessão (= handshakes).
+    """
+    total = 0
+    try:
+        for adapter in client.session.adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                total += getattr(pool, "num_connections", 0) if pool else 0
+    except Exception:
+        pass
+    return total
+
+
+class ZabbixClientPool:
+    """
+    Pool de ZabbixClient por processo, chaveado pela ZabbixConnection.
+
+    Reaproveita a sessão HTTP (keep-alive) e o token do user.login entre chamadas.
+    O token é renovado quando passa do TTL ou quando o Zabbix responde erro de auth.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, token_ttl: int = DEFAULT_TOKEN_TTL):
+        self.max_size = max_size
+        self.token_ttl = token_ttl
+        self._clients: OrderedDict[int, tuple[tuple, ZabbixClient]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.logins_evitados = 0
+
+        # contadores de clientes que já saíram do pool (para não perder histórico)
+        self._retirados = {"requisicoes": 0, "logins": 0, "relogins_por_erro": 0, "conexoes": 0}
+
+    @staticmethod
+    def _fingerprint(conn) -> tuple:
+        # se a conexão for editada (url/usuário/senha), o client antigo é descartado
+        return (conn.base_url, conn.usuario, conn.senha, conn.atualizado_em)
+
+    def _retirar(self, client: ZabbixClient):
+        for k in ("requisicoes", "logins", "relogins_por_erro"):
+            self._retirados[k] += client.stats[k]
+        self._retirados["conexoes"] += _conexoes_http(client)
+
+    def get_client(self, conn) -> ZabbixClient:
+        fingerprint = self._fingerprint(conn)
+        descartados = []
+
+        with self._lock:
+            entry = self._clients.get(conn.pk)
+
+            if entry and entry[0] == fingerprint:
+                self._clients.move_to_end(conn.pk)
+                client = entry[1]
+                self.hits += 1
+            else:
+                if entry:
+                    self._clients.pop(conn.pk)
+                    self._retirar(entry[1])
+                    descartados.append(entry[1])
+
+                client = ZabbixClient(conn.base_url)
+                client.set_credentials(conn.usuario, conn.senha)
+                self._clients[conn.pk] = (fingerprint, client)
+                self.misses += 1
+
+                while len(self._clients) > self.max_size:
+                    _, (_, antigo) = self._clients.popitem(last=False)
+                    self._retirar(antigo)
+                    descartados.append(antigo)
+                    self.evictions += 1
+
+        # logout/fechamento só quando a última thread largar o client
+        for antigo in descartados:
+            antigo.close_when_unused()
+
+        client.max_concorrencia = getattr(conn, "max_concorrencia", None)
+
+        # login fora do lock (rede); só o contador é protegido
+        if not client.ensure_token(self.token_ttl):
+            with self._lock:
+                self.logins_evitados += 1
+
+        return client
+
+    def invalidate(self, conn_pk: int):
+        with self._lock:
+            entry = self._clients.pop(conn_pk, None)
+            if entry:
+                self._retirar(entry[1])
+        if entry:
+            entry[1].close_when_unused()
+
+    def clear(self):
+        with self._lock:
+            descartados = [client for _, client in self._clients.values()]
+            for client in descartados:
+                self._retirar(client)
+            self._clients.clear()
+        for client in descartados:
+            client.close_when_unused()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            ativos = [client for _, client in self._clients.values()]
+
+            requisicoes = self._retirados["requisicoes"] + sum(c.stats["requisicoes"] for c in ativos)
+            logins = self._retirados["logins"] + sum(c.stats["logins"] for c in ativos)
+            relogins = self._retirados["relogins_por_erro"] + sum(c.stats["relogins_por_erro"] for c in ativos)
+            conexoes = self._retirados["conexoes"] + sum(_conexoes_http(c) for c in ativos)
+
+            return {
+                "clientes_em_cache": len(ativos),
+                "max_size": self.max_size,
+                "token_ttl_segundos": self.token_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "logins_realizados": logins,
+                "logins_evitados": self.logins_evitados,
+                "relogins_por_erro": relogins,
+                "requisicoes_http": requisicoes,
+                "handshakes_realizados": conexoes,
+                "handshakes_evitados": max(requisicoes - conexoes, 0),
+            }
+
+
+_pool: ZabbixClientPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ZabbixClientPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ZabbixClientPool(
+                    max_size=getattr(settings, "ZABBIX_CLIENT_POOL_MAX_SIZE", DEFAULT_MAX_SIZE),
+                    token_ttl=getattr(settings, "ZABBIX_TOKEN_TTL_SECONDS", DEFAULT_TOKEN_TTL),
+                )
+    return _pool
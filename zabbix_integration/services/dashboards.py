@@ -1,4 +1,6 @@
-from django.db.models import Count
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
 
@@ -9,44 +11,85 @@ from zabbix_integration.models import (
 )
 
 
-def dashboard_executivo(cliente_id: int):
+DEFAULT_CACHE_TTL = 60
 
-    now = timezone.now()
-    last_24h = now - timedelta(hours=24)
 
-    total_hosts = ZabbixHost.objects.filter(cliente_id=cliente_id).count()
+def _cache_key(cliente_id: int, since, until) -> str:
+    # janela padrão (últimas 24h) usa chave fixa; janela explícita entra na chave
+    janela = "24h" if since is None and until is None else f"{since and since.isoformat()}_{until and until.isoformat()}"
+    return f"zabbix:dashboard_executivo:{cliente_id}:{janela}"
 
-    hosts_ativos = ZabbixHost.objects.filter(
-        cliente_id=cliente_id,
-        status=0
-    ).count()
 
-    triggers_ativas = ZabbixTrigger.objects.filter(
-        cliente_id=cliente_id,
-        value=1
-    ).count()
+def dashboard_executivo(cliente_id: int, since=None, until=None, use_cache: bool = True):
+    """
+    Resumo do ambiente do cliente em uma consulta agregada por tabela
+    (Count com filter=Q). Eventos: um GROUP BY pelo host gravado no próprio
+    evento, de onde saem os totais e o top de hosts.
 
-    eventos_criticos = ZabbixEvent.objects.filter(
-        cliente_id=cliente_id,
-        severity__gte=4,
-        clock__gte=last_24h
-    ).count()
+    since/until: janela dos eventos (padrão: últimas 24h).
+    Resultado fica em cache por ZABBIX_DASHBOARD_CACHE_TTL segundos por cliente/janela.
+    """
+    key = _cache_key(cliente_id, since, until)
 
-    top_hosts = (
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    until = until or timezone.now()
+    since = since or (until - timedelta(hours=24))
+
+    hosts = ZabbixHost.objects.filter(cliente_id=cliente_id).aggregate(
+        total=Count("id"),
+        ativos=Count("id", filter=Q(status="0")),
+    )
+
+    triggers = ZabbixTrigger.objects.filter(cliente_id=cliente_id).aggregate(
+        ativas=Count("id", filter=Q(value=1)),
+    )
+
+    # 🔥 eventos numa passada só: contagens condicionais por host do próprio evento
+    # (sem join por trigger -> items -> host, que multiplica linhas); os totais saem
+    # da soma dos grupos e o top de hosts da mesma lista
+    por_host = list(
         ZabbixEvent.objects
-        .filter(cliente_id=cliente_id, clock__gte=last_24h)
-        .values("trigger__items__host__hostname")
-        .annotate(total=Count("id"))
-        .order_by("-total")[:5]
+        .filter(cliente_id=cliente_id, clock__gte=since, clock__lt=until)
+        .values("hostid", "hostname")
+        .annotate(
+            total=Count("id"),
+            criticos=Count("id", filter=Q(severity__gte=4)),
+        )
+        .order_by()
     )
 
-    return {
+    eventos_criticos = sum(h["criticos"] for h in por_host)
+
+    top_hosts = sorted(
+        (
+            {"hostid": h["hostid"], "hostname": h["hostname"], "total": h["total"]}
+            for h in por_host
+            if h["hostid"] is not None
+        ),
+        key=lambda h: -h["total"],
+    )[:5]
+
+    data = {
+        "periodo": {
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+        },
         "resumo": {
-            "total_hosts": total_hosts,
-            "hosts_ativos": hosts_ativos,
-            "hosts_inativos": total_hosts - hosts_ativos,
-            "triggers_ativas": triggers_ativas,
+            "total_hosts": hosts["total"],
+            "hosts_ativos": hosts["ativos"],
+            "hosts_inativos": hosts["total"] - hosts["ativos"],
+            "triggers_ativas": triggers["ativas"],
+            # nomes mantidos por compatibilidade; valem para a janela since/until
             "eventos_criticos_24h": eventos_criticos,
         },
-        "top_hosts_problemas_24h": list(top_hosts),
-    }
\ No newline at end of file
+        "top_hosts_problemas_24h": top_hosts,
+    }
+
+    if use_cache:
+        cache.set(key, data, getattr(settings, "ZABBIX_DASHBOARD_CACHE_TTL", DEFAULT_CACHE_TTL))
+
+    return data
@@ -1,42 +1,44 @@
-from datetime import datetime
-from calendar import monthrange
-from django.db.models import Count
-from zabbix_integration.models import ZabbixEvent
+from datetime import datetime, timezone
+from django.db.models import Count, Q
+from zabbix_integration.models import ZabbixIncident
 
 
 def _month_range(year: int, month: int):
-    start = datetime(year, month, 1)
-    last_day = monthrange(year, month)[1]
-    end = datetime(year, month, last_day, 23, 59, 59)
+    # [início do mês, início do mês seguinte) em UTC, como o MTTR
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
     return start, end
 
 
 def get_event_summary(cliente_id: int, ano: int, mes: int) -> dict:
+    """
+    Incidentes iniciados no mês (ZabbixIncident: um por problema), numa consulta:
+    contagens condicionais agrupadas pelo host do incidente; total, críticos e
+    top de hosts saem das mesmas linhas.
+    """
     start, end = _month_range(ano, mes)
 
-    eventos = ZabbixEvent.objects.filter(
-        cliente_id=cliente_id,
-        clock__range=(start, end)
+    por_host = list(
+        ZabbixIncident.objects
+        .filter(cliente_id=cliente_id, start__gte=start, start__lt=end)
+        .values("hostid", "hostname")
+        .annotate(
+            total=Count("id"),
+            criticos=Count("id", filter=Q(severity__gte=4)),
+        )
+        .order_by()
     )
 
-    total = eventos.count()
-
-    criticos = eventos.filter(severity__gte=4).count()
-
-    top_hosts = (
-        eventos
-        .values("host__name")
-        .annotate(total=Count("id"))
-        .order_by("-total")[:5]
-    )
-
-    top_hosts_formatado = [
-        {"host": h["host__name"], "incidentes": h["total"]}
-        for h in top_hosts
-    ]
+    top_hosts = sorted(
+        (h for h in por_host if h["hostid"] is not None),
+        key=lambda h: -h["total"],
+    )[:5]
 
     return {
-        "total": total,
-        "criticos": criticos,
-        "top_hosts": top_hosts_formatado
-    }
\ No newline at end of file
+        "total": sum(h["total"] for h in por_host),
+        "criticos": sum(h["criticos"] for h in por_host),
+        "top_hosts": [
+            {"host": h["hostname"] or h["hostid"], "incidentes": h["total"]}
+            for h in top_hosts
+        ],
+    }
@@ -0,0 +1,74 @@
+from django.conf import settings
+
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def get_page_size(page: int | None = None) -> int:
+    return page or getattr(settings, "ZABBIX_EVENT_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+
+def _page_params(params: dict, time_from, time_till, cursor, page: int, descending: bool = False) -> dict:
+    req = dict(params)
+    req["sortfield"] = ["eventid"]
+    req["sortorder"] = "DESC" if descending else "ASC"
+    req["limit"] = page
+
+    if time_from is not None:
+        req["time_from"] = int(time_from)
+    if time_till is not None:
+        req["time_till"] = int(time_till)
+    if cursor is not None:
+        req["eventid_till" if descending else "eventid_from"] = str(cursor)
+
+    return req
+
+
+def _next_cursor(events: list[dict], page: int, descending: bool = False):
+    if len(events) < page:
+        return None
+    ultimo = int(events[-1]["eventid"])
+    return ultimo - 1 if descending else ultimo + 1
+
+
+def iter_events(client, time_from=None, time_till=None, page: int | None = None, eventid_from=None, descending: bool = False, **params):
+    """
+    Gera páginas de event.get (listas com no máximo `page` eventos).
+
+    Pagina por cursor de eventid (sortfield=eventid ASC + eventid_from), então
+    nada é perdido por causa de `limit` e a memória fica limitada a uma página,
+    qualquer que seja o volume do tenant. descending=True pagina do mais novo
+    para o mais antigo (eventid DESC + eventid_till), para quem só quer os N últimos.
+    """
+    page = get_page_size(page)
+    cursor = eventid_from
+
+    while True:
+        events = client.event_get(**_page_params(params, time_from, time_till, cursor, page, descending)) or []
+        if not events:
+            return
+
+        yield events
+
+        cursor = _next_cursor(events, page, descending)
+        if cursor is None:
+            return
+
+
+async def aiter_events(aclient, time_from=None, time_till=None, page: int | None = None, eventid_from=None, **params):
+    """
+    Versão assíncrona de iter_events (AsyncZabbixClient).
+    """
+    page = get_page_size(page)
+    cursor = eventid_from
+
+    while True:
+        events = await aclient.event_get(**_page_params(params, time_from, time_till, cursor, page)) or []
+        if not events:
+            return
+
+        yield events
+
+        cursor = _next_cursor(events, page)
+        if cursor is None:
+            return
@@ -0,0 +1,210 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from zabbix_integration.models import ZabbixItem, ZabbixHistoryNumeric, ZabbixHistoryText, ZabbixHistoryUint
+from .history_partitions import HISTORY_MODEL_BY_VALUE_TYPE, ensure_partitions
+from .history_rollup import refresh_rollups
+from .utils import chunked, dt_from_epoch
+
+
+DEFAULT_SLICE_SECONDS = 6 * 3600
+DEFAULT_PAGE_SIZE = 10000
+ITEMS_PER_CALL = 200
+
+# tipo da coluna value na tabela de staging do COPY
+VALUE_SQL_TYPES = {
+    ZabbixHistoryNumeric: "double precision",
+    ZabbixHistoryUint: "numeric(20,0)",
+    ZabbixHistoryText: "text",
+}
+
+
+def _epoch(value) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def iter_history_pages(client, value_type: int, itemids: list[str], time_from, time_till,
+                       slice_seconds: int | None = None, page: int | None = None):
+    """
+    Gera páginas de history.get (listas de dicts) para um value_type.
+
+    A janela é fatiada em intervalos de `slice_seconds`; se uma fatia vier
+    cheia (== page), continua a partir do último clock recebido (o próprio
+    segundo é pedido de novo, pois pode ter linhas além da página). Linhas
+    repetidas são descartadas no merge (ON CONFLICT DO NOTHING).
+
+    history.get não pagina dentro de um segundo (sem filtro por ns): página
+    cheia toda no mesmo segundo faz esse segundo ser buscado inteiro, sem limit.
+    """
+    slice_seconds = slice_seconds or getattr(settings, "ZABBIX_HISTORY_SLICE_SECONDS", DEFAULT_SLICE_SECONDS)
+    page = page or getattr(settings, "ZABBIX_HISTORY_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+    inicio = _epoch(time_from)
+    fim = _epoch(time_till)
+
+    while inicio <= fim:
+        fim_fatia = min(inicio + slice_seconds - 1, fim)
+        cursor = inicio
+
+        while True:
+            rows = client.history_get(
+                output=["itemid", "clock", "ns", "value"],
+                history=value_type,  # 0 float, 1 char, 2 log, 3 uint, 4 text
+                itemids=itemids,
+                time_from=cursor,
+                time_till=fim_fatia,
+                sortfield="clock",
+                sortorder="ASC",
+                limit=page,
+            ) or []
+
+            if rows:
+                yield rows
+
+            if len(rows) < page:
+                break
+
+            ultimo = int(rows[-1]["clock"])
+            if ultimo > cursor:
+                cursor = ultimo
+                continue
+
+            # página inteira num único segundo: busca o segundo todo e segue para o próximo
+            resto = client.history_get(
+                output=["itemid", "clock", "ns", "value"],
+                history=value_type,
+                itemids=itemids,
+                time_from=cursor,
+                time_till=cursor,
+            ) or []
+            if resto:
+                yield resto
+
+            cursor += 1
+            if cursor > fim_fatia:
+                break
+
+        inicio = fim_fatia + 1
+
+
+def _staging_sql(table: str, value_sql_type: str) -> str:
+    return (
+        f"CREATE TEMP TABLE {table}_stage "
+        f"(item_id bigint, clock bigint, ns integer, value {value_sql_type}) ON COMMIT DROP"
+    )
+
+
+def copy_history_rows(model, rows) -> int:
+    """
+    Grava tuplas (item_pk, clock_epoch, ns, value) no histórico tipado, sem ORM.
+
+    Postgres: COPY para uma tabela temporária + INSERT ... SELECT ... ON CONFLICT
+    DO NOTHING (um round-trip de dados e um merge por lote).
+    Outros bancos: INSERT ... ON CONFLICT DO NOTHING com executemany.
+    Retorna quantas linhas novas entraram.
+    """
+    table = model._meta.db_table
+
+    if connection.vendor != "postgresql":
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (item_id, clock, ns, value) VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING",
+                [(item_pk, dt_from_epoch(clock), ns, value) for item_pk, clock, ns, value in rows],
+            )
+            return max(cursor.rowcount, 0)
+
+    value_sql_type = VALUE_SQL_TYPES[model]
+    stage = f"{table}_stage"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+        cursor.execute(_staging_sql(table, value_sql_type))
+
+        with cursor.copy(f"COPY {stage} (item_id, clock, ns, value) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (item_id, clock, ns, value)
+            SELECT item_id, to_timestamp(clock), ns, value FROM {stage}
+            ON CONFLICT DO NOTHING
+            """
+        )
+        inseridas = cursor.rowcount
+
+        # se estivermos dentro de uma transação maior, o ON COMMIT DROP ainda não rodou
+        cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+
+    return inseridas
+
+
+def ingest_history(client, cliente_id: int, itemids: list[str], time_from, time_till) -> dict:
+    """
+    Backfill/sync de histórico em streaming: itens agrupados por value_type e
+    em blocos, history.get fatiado por tempo, cada página copiada direto para
+    o banco. Memória limitada a uma página, qualquer que seja a janela.
+    """
+    # itemid -> (pk, value_type), sem instanciar ZabbixItem
+    itens = {
+        itemid: (pk, value_type)
+        for itemid, pk, value_type in ZabbixItem.objects
+        .filter(cliente_id=cliente_id, itemid__in=itemids)
+        .values_list("itemid", "id", "value_type")
+    }
+
+    if not itens:
+        return {"itens": 0, "recebidas": 0, "gravadas": 0}
+
+    ensure_partitions(dt_from_epoch(_epoch(time_from)), dt_from_epoch(_epoch(time_till)))
+
+    by_type: dict[int, list[str]] = {}
+    for itemid, (_, value_type) in itens.items():
+        by_type.setdefault(int(value_type), []).append(itemid)
+
+    recebidas = 0
+    gravadas = 0
+
+    for value_type, ids in by_type.items():
+        model = HISTORY_MODEL_BY_VALUE_TYPE.get(value_type)
+        if model is None:
+            continue
+        numerico = model is not ZabbixHistoryText
+
+        for ids_chunk in chunked(ids, ITEMS_PER_CALL):
+            for rows in iter_history_pages(client, value_type, ids_chunk, time_from, time_till):
+                rows = [r for r in rows if r.get("itemid") in itens]
+                if not rows:
+                    continue
+
+                recebidas += len(rows)
+                gravadas += copy_history_rows(
+                    model,
+                    (
+                        (
+                            itens[r["itemid"]][0],
+                            int(r["clock"]),
+                            int(r.get("ns") or 0),
+                            r["value"] if numerico else (r.get("value") or ""),
+                        )
+                        for r in rows
+                    ),
+                )
+
+                # 📊 rollups 5m/1h/1d só dos buckets que este lote tocou
+                if numerico:
+                    clocks = [int(r["clock"]) for r in rows]
+                    refresh_rollups(
+                        {itens[r["itemid"]][0] for r in rows},
+                        min(clocks),
+                        max(clocks),
+                        model=model,
+                    )
+
+    return {"itens": len(itens), "recebidas": recebidas, "gravadas": gravadas}
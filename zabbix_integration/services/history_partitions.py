@@ -0,0 +1,136 @@
+import re
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import connection
+
+from zabbix_integration.models import ZabbixHistoryNumeric, ZabbixHistoryText, ZabbixHistoryUint
+
+
+DEFAULT_RETENTION_MONTHS = 12
+DEFAULT_PREMAKE_MONTHS = 2
+
+PARTITIONED_TABLES = (
+    ZabbixHistoryNumeric._meta.db_table,
+    ZabbixHistoryUint._meta.db_table,
+    ZabbixHistoryText._meta.db_table,
+)
+
+# value_type do Zabbix -> model do histórico tipado
+HISTORY_MODEL_BY_VALUE_TYPE = {
+    0: ZabbixHistoryNumeric,  # float
+    3: ZabbixHistoryUint,     # uint
+    1: ZabbixHistoryText,     # char
+    2: ZabbixHistoryText,     # log
+    4: ZabbixHistoryText,     # text
+}
+
+_PARTITION_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def _month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _add_months(d: date, n: int) -> date:
+    total = d.year * 12 + (d.month - 1) + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def partition_name(table: str, mes: date) -> str:
+    return f"{table}_p{mes.year}{mes.month:02d}"
+
+
+def _enabled() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def ensure_partitions(inicio, fim) -> list[str]:
+    """
+    Garante uma partição mensal (por tabela) para cada mês entre inicio e fim.
+    Retorna as partições criadas agora.
+    """
+    if not _enabled():
+        return []
+
+    if isinstance(inicio, datetime):
+        inicio = inicio.date()
+    if isinstance(fim, datetime):
+        fim = fim.date()
+
+    criadas = []
+    mes = _month_start(inicio)
+    ultimo = _month_start(fim)
+
+    with connection.cursor() as cursor:
+        existentes = set(_list_partitions(cursor))
+
+        while mes <= ultimo:
+            proximo = _add_months(mes, 1)
+            for table in PARTITIONED_TABLES:
+                nome = partition_name(table, mes)
+                if nome in existentes:
+                    continue
+                # DDL não aceita parâmetros: datas vêm de date.isoformat()
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {nome} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{proximo.isoformat()}')"
+                )
+                criadas.append(nome)
+            mes = proximo
+
+    return criadas
+
+
+def _list_partitions(cursor, table: str | None = None) -> list[str]:
+    tables = [table] if table else list(PARTITIONED_TABLES)
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = ANY(%s)
+        """,
+        [tables],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def drop_expired_partitions(retention_months: int | None = None, hoje: date | None = None) -> list[str]:
+    """
+    Retenção: remove partições inteiras (DROP TABLE) cujo mês terminou antes
+    do corte — sem DELETE linha a linha nem bloat/vacuum.
+    """
+    if not _enabled():
+        return []
+
+    retention_months = retention_months or getattr(
+        settings, "ZABBIX_HISTORY_RETENTION_MONTHS", DEFAULT_RETENTION_MONTHS
+    )
+    corte = _add_months(_month_start(hoje or date.today()), -retention_months)
+
+    removidas = []
+    with connection.cursor() as cursor:
+        for nome in _list_partitions(cursor):
+            m = _PARTITION_RE.search(nome)
+            if not m:
+                continue
+            if date(int(m.group(1)), int(m.group(2)), 1) < corte:
+                cursor.execute(f"DROP TABLE IF EXISTS {nome}")
+                removidas.append(nome)
+
+    return removidas
+
+
+def maintain_history_partitions() -> dict:
+    """
+    Cria as partições dos próximos meses e aplica a retenção.
+    """
+    hoje = date.today()
+    premake = getattr(settings, "ZABBIX_HISTORY_PREMAKE_MONTHS", DEFAULT_PREMAKE_MONTHS)
+
+    criadas = ensure_partitions(hoje, _add_months(_month_start(hoje), premake))
+    removidas = drop_expired_partitions(hoje=hoje)
+
+    return {"criadas": criadas, "removidas": removidas}
@@ -0,0 +1,153 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connection
+
+from zabbix_integration.models import ZabbixHistoryNumeric, ZabbixHistoryRollup, ZabbixHistoryUint, ZabbixItem
+
+
+DEFAULT_MAX_POINTS = 500
+
+# resolução -> tamanho do bucket (s), da mais fina para a mais grossa
+ROLLUP_SECONDS = {
+    "5m": 300,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+# cada nível é agregado a partir do anterior (1h <- 5m, 1d <- 1h)
+_ROLLUP_SOURCE = {
+    "1h": "5m",
+    "1d": "1h",
+}
+
+
+def _floor(epoch: int, seconds: int) -> int:
+    return epoch - epoch % seconds
+
+
+def _epoch(value) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+_UPSERT_SQL = """
+    ON CONFLICT (item_id, resolution, bucket) DO UPDATE SET
+        min = EXCLUDED.min,
+        max = EXCLUDED.max,
+        avg = EXCLUDED.avg,
+        sum = EXCLUDED.sum,
+        count = EXCLUDED.count
+"""
+
+
+def refresh_rollups(item_pks, clock_min, clock_max, model=ZabbixHistoryNumeric) -> int:
+    """
+    Recalcula os buckets 5m/1h/1d que contêm [clock_min, clock_max] para os
+    itens informados. Só os buckets tocados pelo lote são lidos e regravados;
+    1h é agregado do 5m e 1d do 1h (buckets em UTC).
+
+    model: tabela de histórico dos itens (float ou uint); o rollup é double nos dois casos.
+    """
+    item_pks = sorted(set(item_pks))
+    if not item_pks or connection.vendor != "postgresql":
+        return 0
+
+    history_table = model._meta.db_table
+    rollup_table = ZabbixHistoryRollup._meta.db_table
+    clock_min = _epoch(clock_min)
+    clock_max = _epoch(clock_max)
+
+    total = 0
+    with connection.cursor() as cursor:
+        for resolution, seconds in ROLLUP_SECONDS.items():
+            inicio = _floor(clock_min, seconds)
+            fim = _floor(clock_max, seconds) + seconds
+            origem = _ROLLUP_SOURCE.get(resolution)
+
+            if origem is None:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {rollup_table} (item_id, resolution, bucket, min, max, avg, sum, count)
+                    SELECT item_id, %s,
+                           to_timestamp(floor(extract(epoch FROM clock) / %s) * %s),
+                           min(value), max(value), avg(value), sum(value), count(*)
+                    FROM {history_table}
+                    WHERE item_id = ANY(%s)
+                      AND clock >= to_timestamp(%s) AND clock < to_timestamp(%s)
+                    GROUP BY 1, 3
+                    {_UPSERT_SQL}
+                    """,
+                    [resolution, seconds, seconds, item_pks, inicio, fim],
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {rollup_table} (item_id, resolution, bucket, min, max, avg, sum, count)
+                    SELECT item_id, %s,
+                           to_timestamp(floor(extract(epoch FROM bucket) / %s) * %s),
+                           min(min), max(max), sum(sum) / sum(count), sum(sum), sum(count)
+                    FROM {rollup_table}
+                    WHERE resolution = %s
+                      AND item_id = ANY(%s)
+                      AND bucket >= to_timestamp(%s) AND bucket < to_timestamp(%s)
+                    GROUP BY 1, 3
+                    {_UPSERT_SQL}
+                    """,
+                    [resolution, seconds, seconds, origem, item_pks, inicio, fim],
+                )
+            total += max(cursor.rowcount, 0)
+
+    return total
+
+
+def pick_resolution(time_from, time_till, max_points: int) -> str:
+    """
+    Resolução mais fina cujo número de buckets no intervalo cabe em max_points
+    (se nenhuma couber, a diária).
+    """
+    duracao = max(_epoch(time_till) - _epoch(time_from), 0)
+    for resolution, seconds in ROLLUP_SECONDS.items():
+        if duracao / seconds <= max_points:
+            return resolution
+    return "1d"
+
+
+def get_series(item_pk: int, time_from, time_till, max_points: int | None = None) -> dict:
+    """
+    Série de um item para gráficos: usa o histórico bruto se couber no
+    orçamento de pontos, senão o rollup mais fino que couber.
+    """
+    max_points = max_points or getattr(settings, "ZABBIX_HISTORY_MAX_POINTS", DEFAULT_MAX_POINTS)
+    inicio = datetime.fromtimestamp(_epoch(time_from), tz=timezone.utc)
+    fim = datetime.fromtimestamp(_epoch(time_till), tz=timezone.utc)
+
+    uint = ZabbixItem.objects.filter(pk=item_pk, value_type=3).exists()
+    model = ZabbixHistoryUint if uint else ZabbixHistoryNumeric
+
+    bruto = model.objects.filter(item_id=item_pk, clock__gte=inicio, clock__lt=fim)
+    if bruto[:max_points + 1].count() <= max_points:
+        return {
+            "resolution": "raw",
+            "points": [
+                # uint vem Decimal do numeric(20,0): int para sair número no JSON
+                {"clock": clock, "value": int(value) if uint else value}
+                for clock, value in bruto.order_by("clock", "ns").values_list("clock", "value")
+            ],
+        }
+
+    resolution = pick_resolution(inicio, fim, max_points)
+    bucket_inicio = datetime.fromtimestamp(_floor(_epoch(inicio), ROLLUP_SECONDS[resolution]), tz=timezone.utc)
+
+    return {
+        "resolution": resolution,
+        "points": list(
+            ZabbixHistoryRollup.objects
+            .filter(item_id=item_pk, resolution=resolution, bucket__gte=bucket_inicio, bucket__lt=fim)
+            .order_by("bucket")
+            .values("bucket", "min", "max", "avg", "count")
+        ),
+    }
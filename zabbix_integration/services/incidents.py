@@ -0,0 +1,177 @@
+from django.db import transaction
+from django.db.models import BigIntegerField, Q
+from django.db.models.functions import Cast
+
+from zabbix_integration.models import ZabbixEvent, ZabbixIncident
+from .bulk import bulk_upsert
+
+
+INCIDENT_UPDATE_FIELDS = [
+    "start",
+    "host",
+    "hostid",
+    "hostname",
+    "trigger",
+    "triggerid",
+    "severity",
+    "name",
+    "atualizado_em",
+]
+
+REBUILD_BATCH = 5000
+
+
+def apply_events_to_incidents(cliente_id: int, events) -> dict:
+    """
+    Aplica um lote de ZabbixEvent (já gravado) na tabela de incidentes:
+
+    - problema (value=1) -> abre/atualiza o incidente (nunca reabre um fechado)
+    - recuperação (value=0) -> fecha os incidentes abertos da mesma trigger
+      iniciados antes dela (mesma regra do Zabbix sem correlação por tag)
+    - problema que já veio com r_eventid -> fecha pela recuperação indicada
+
+    Chamado dentro da transação que grava o lote de eventos.
+    """
+    events = list(events)
+    problemas = [e for e in events if e.value == 1]
+    recuperacoes = [e for e in events if e.value == 0]
+
+    abertos = bulk_upsert(
+        ZabbixIncident,
+        [
+            ZabbixIncident(
+                cliente_id=cliente_id,
+                eventid=e.eventid,
+                start=e.clock,
+                host_id=e.host_id,
+                hostid=e.hostid,
+                hostname=e.hostname,
+                trigger_id=e.trigger_id,
+                triggerid=e.objectid,
+                severity=e.severity,
+                name=e.name,
+            )
+            for e in problemas
+        ],
+        unique_fields=["cliente", "eventid"],
+        update_fields=INCIDENT_UPDATE_FIELDS,
+    )
+
+    fechados = close_incidents(
+        cliente_id,
+        recuperacoes=[(e.eventid, e.objectid, e.clock) for e in recuperacoes],
+        explicitos={e.eventid: e.r_eventid for e in problemas if e.r_eventid},
+    )
+
+    return {"abertos": abertos, "fechados": fechados}
+
+
+def close_incidents(cliente_id: int, recuperacoes=(), explicitos: dict | None = None) -> int:
+    """
+    Fecha incidentes abertos.
+
+    recuperacoes: [(eventid, triggerid, clock)] de eventos de recuperação
+    explicitos: {eventid do problema: r_eventid} (r_eventid informado pelo Zabbix)
+    """
+    explicitos = explicitos or {}
+
+    rec_por_id = {eventid: (clock, triggerid) for eventid, triggerid, clock in recuperacoes}
+
+    faltando = set(explicitos.values()) - rec_por_id.keys()
+    if faltando:
+        for eventid, clock, triggerid in (
+            ZabbixEvent.objects
+            .filter(cliente_id=cliente_id, eventid__in=list(faltando))
+            .values_list("eventid", "clock", "objectid")
+        ):
+            rec_por_id[eventid] = (clock, triggerid)
+
+    por_trigger: dict[str, list] = {}
+    for eventid, triggerid, clock in sorted(recuperacoes, key=lambda r: r[2]):
+        if triggerid:
+            por_trigger.setdefault(str(triggerid), []).append((clock, eventid))
+
+    if not por_trigger and not explicitos:
+        return 0
+
+    abertos = ZabbixIncident.objects.filter(cliente_id=cliente_id, end__isnull=True).filter(
+        Q(triggerid__in=list(por_trigger.keys())) | Q(eventid__in=list(explicitos.keys()))
+    )
+
+    fechados = []
+    for inc in abertos:
+        r_eventid = explicitos.get(inc.eventid)
+        fim = rec_por_id.get(r_eventid, (None, None))[0] if r_eventid else None
+
+        if fim is None:
+            r_eventid = None
+            for clock, eventid in por_trigger.get(inc.triggerid or "", []):
+                if clock >= inc.start:
+                    fim, r_eventid = clock, eventid
+                    break
+
+        if fim is None:
+            continue
+
+        inc.end = fim
+        inc.r_eventid = r_eventid
+        inc.duration_seconds = int((fim - inc.start).total_seconds())
+        fechados.append(inc)
+
+    if not fechados:
+        return 0
+
+    ZabbixIncident.objects.bulk_update(fechados, ["end", "r_eventid", "duration_seconds"], batch_size=1000)
+
+    # 🔗 mantém o r_eventid do evento de problema coerente com o incidente, só quando
+    # informado pelo Zabbix: o pareado pela trigger é palpite e fica só no incidente
+    # (ZabbixEvent.r_eventid preenchido tira o evento da reconciliação com o Zabbix)
+    r_por_problema = {inc.eventid: inc.r_eventid for inc in fechados if explicitos.get(inc.eventid) == inc.r_eventid}
+    if not r_por_problema:
+        return len(fechados)
+
+    eventos = list(
+        ZabbixEvent.objects
+        .filter(cliente_id=cliente_id, eventid__in=list(r_por_problema.keys()), r_eventid__isnull=True)
+        .only("id", "eventid")
+    )
+    for ev in eventos:
+        ev.r_eventid = r_por_problema[ev.eventid]
+    ZabbixEvent.objects.bulk_update(eventos, ["r_eventid"], batch_size=1000)
+
+    return len(fechados)
+
+
+def rebuild_incidents(cliente_id: int) -> dict:
+    """
+    Reconstrói os incidentes do cliente a partir dos eventos gravados
+    (em ordem de eventid, em lotes, sem carregar tudo em memória).
+    """
+    total = {"abertos": 0, "fechados": 0}
+
+    with transaction.atomic():
+        ZabbixIncident.objects.filter(cliente_id=cliente_id).delete()
+
+        lote = []
+        eventos = (
+            ZabbixEvent.objects
+            .filter(cliente_id=cliente_id, value__in=[0, 1])
+            .annotate(eventid_num=Cast("eventid", BigIntegerField()))
+            .order_by("eventid_num")
+            .only(
+                "eventid", "value", "clock", "host_id", "hostid", "hostname",
+                "trigger_id", "objectid", "severity", "name", "r_eventid",
+            )
+        )
+        for ev in eventos.iterator(chunk_size=REBUILD_BATCH):
+            lote.append(ev)
+            if len(lote) >= REBUILD_BATCH:
+                parcial = apply_events_to_incidents(cliente_id, lote)
+                total = {k: total[k] + parcial[k] for k in total}
+                lote = []
+
+        if lote:
+            parcial = apply_events_to_incidents(cliente_id, lote)
+            total = {k: total[k] + parcial[k] for k in total}
+
+    return total
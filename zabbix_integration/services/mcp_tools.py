@@ -1,9 +1,31 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
 from zabbix_integration.services.dashboards import dashboard_executivo
 from zabbix_integration.services.reports import relatorio_incidentes
 
 
-def tool_dashboard_executivo(cliente_id: int):
-    return dashboard_executivo(cliente_id)
+def _parse_datetime(nome: str, valor: str | None):
+    # datas chegam como texto ISO 8601; sem fuso = fuso do projeto (TIME_ZONE)
+    if not valor:
+        return None
+    try:
+        dt = parse_datetime(valor)
+    except ValueError:
+        dt = None  # formato certo, data impossível (ex.: mês 13)
+    if dt is None:
+        raise ValueError(f"{nome} inválido: {valor!r} (use ISO 8601, ex.: 2026-10-18T14:00:00-03:00)")
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def tool_dashboard_executivo(cliente_id: int, since: str | None = None, until: str | None = None):
+    return dashboard_executivo(
+        cliente_id,
+        since=_parse_datetime("since", since),
+        until=_parse_datetime("until", until),
+    )
 
 
 def tool_relatorio_incidentes(cliente_id: int, dias: int = 30):
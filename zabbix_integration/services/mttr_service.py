@@ -1,37 +1,93 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from calendar import monthrange
-from django.db.models import Q
-from zabbix_integration.models import ZabbixEvent
+from django.db import connection
+from zabbix_integration.models import ZabbixIncident
 
 
 def _month_range(year: int, month: int):
-    start = datetime(year, month, 1)
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
     last_day = monthrange(year, month)[1]
-    end = datetime(year, month, last_day, 23, 59, 59)
+    end = datetime(year, month, last_day, 23, 59, 59, tzinfo=timezone.utc)
     return start, end
 
 
-def get_mttr(cliente_id: int, ano: int, mes: int) -> float:
+# um incidente fechado = um par problema -> recuperação
+_MTTR_SQL = """
+    SELECT GROUPING(hostid, triggerid, severity) AS nivel,
+           hostid,
+           MAX(hostname) AS hostname,
+           triggerid,
+           MAX(name) AS name,
+           severity,
+           COUNT(*) AS total,
+           AVG(duration_seconds) AS media,
+           PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY duration_seconds) AS mediana,
+           PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY duration_seconds) AS p95
+    FROM {table}
+    WHERE cliente_id = %s
+      AND "end" IS NOT NULL
+      AND start BETWEEN %s AND %s
+    GROUP BY GROUPING SETS ((), (hostid), (triggerid), (severity))
+"""
+
+# GROUPING(hostid, triggerid, severity): bit = 1 quando a coluna NÃO está no agrupamento
+_NIVEIS = {
+    0b111: "geral",
+    0b011: "por_host",
+    0b101: "por_trigger",
+    0b110: "por_severidade",
+}
+
+
+def _minutos(segundos) -> float:
+    return round(float(segundos or 0) / 60, 2)
+
+
+def get_mttr_breakdown(cliente_id: int, ano: int, mes: int) -> dict:
+    """
+    MTTR do mês numa única consulta agregada sobre ZabbixIncident: média,
+    mediana e p95 (minutos) geral, por host, por trigger e por severidade.
+    """
     start, end = _month_range(ano, mes)
 
-    eventos = ZabbixEvent.objects.filter(
-        cliente_id=cliente_id,
-        clock__range=(start, end)
-    ).order_by("eventid", "clock")
+    resultado = {"geral": None, "por_host": [], "por_trigger": [], "por_severidade": []}
 
-    mttrs = []
-    problemas = {}
+    with connection.cursor() as cursor:
+        cursor.execute(_MTTR_SQL.format(table=ZabbixIncident._meta.db_table), [cliente_id, start, end])
+        colunas = [c[0] for c in cursor.description]
+        linhas = [dict(zip(colunas, row)) for row in cursor.fetchall()]
 
-    for ev in eventos:
-        if ev.value == 1:
-            problemas[ev.eventid] = ev.clock
+    for linha in linhas:
+        nivel = _NIVEIS.get(linha["nivel"])
+        if not nivel:
+            continue
 
-        elif ev.value == 0 and ev.eventid in problemas:
-            inicio = problemas.pop(ev.eventid)
-            duracao = (ev.clock - inicio).total_seconds() / 60
-            mttrs.append(duracao)
+        registro = {
+            "total": linha["total"],
+            "mttr_medio_minutos": _minutos(linha["media"]),
+            "mttr_mediana_minutos": _minutos(linha["mediana"]),
+            "mttr_p95_minutos": _minutos(linha["p95"]),
+        }
+
+        if nivel == "geral":
+            resultado["geral"] = registro
+        elif nivel == "por_host":
+            resultado["por_host"].append({"hostid": linha["hostid"], "hostname": linha["hostname"], **registro})
+        elif nivel == "por_trigger":
+            resultado["por_trigger"].append({"triggerid": linha["triggerid"], "name": linha["name"], **registro})
+        else:
+            resultado["por_severidade"].append({"severity": linha["severity"], **registro})
+
+    for chave in ("por_host", "por_trigger", "por_severidade"):
+        resultado[chave].sort(key=lambda r: r["mttr_medio_minutos"], reverse=True)
+
+    return resultado
+
+
+def get_mttr(cliente_id: int, ano: int, mes: int) -> float:
+    geral = get_mttr_breakdown(cliente_id, ano, mes)["geral"]
 
-    if not mttrs:
+    if not geral or not geral["total"]:
         return 0.0
 
-    return round(sum(mttrs) / len(mttrs), 2)
\ No newline at end of file
+    return geral["mttr_medio_minutos"]
@@ -0,0 +1,150 @@
+import json
+from datetime import timedelta
+
+import zstandard
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from zabbix_integration.models import ZabbixRawPayload
+from .utils import chunked, content_hash
+
+
+# ZABBIX_RAW_STORAGE
+RAW_STORAGE_FULL = "full"  # raw inteiro na linha, regravado em todo upsert (comportamento original)
+RAW_STORAGE_ON_CHANGE = "on_change"  # raw inteiro na linha, só regrava se o hash mudou
+RAW_STORAGE_COMPRESSED = "compressed"  # raw em ZabbixRawPayload (zstd, por hash); linha guarda só raw_hash
+RAW_STORAGE_OFF = "off"  # não guarda raw (só o hash, para detectar mudança)
+
+RAW_STORAGE_POLICIES = (RAW_STORAGE_FULL, RAW_STORAGE_ON_CHANGE, RAW_STORAGE_COMPRESSED, RAW_STORAGE_OFF)
+
+DEFAULT_ZSTD_LEVEL = 3
+
+# payload recém-gravado pode ainda não ter a linha que o referencia (upsert em andamento)
+DEFAULT_RAW_PRUNE_GRACE_HOURS = 24
+
+
+def get_raw_storage_policy() -> str:
+    policy = getattr(settings, "ZABBIX_RAW_STORAGE", RAW_STORAGE_FULL)
+    if policy not in RAW_STORAGE_POLICIES:
+        raise ImproperlyConfigured(f"ZABBIX_RAW_STORAGE inválido: {policy!r} (use {', '.join(RAW_STORAGE_POLICIES)})")
+    return policy
+
+
+def tracks_raw(model) -> bool:
+    return any(f.name == "raw_hash" for f in model._meta.concrete_fields)
+
+
+def _empty_raw(model):
+    field = model._meta.get_field("raw")
+    return None if field.null else field.get_default()
+
+
+def store_payloads(payloads: dict[str, dict]) -> int:
+    """
+    Grava payloads comprimidos (zstd) que ainda não existem. Conteúdo igual = mesmo hash = uma linha.
+    """
+    if not payloads:
+        return 0
+
+    compressor = zstandard.ZstdCompressor(level=getattr(settings, "ZABBIX_RAW_ZSTD_LEVEL", DEFAULT_ZSTD_LEVEL))
+    rows = []
+    for raw_hash, raw in payloads.items():
+        data = json.dumps(raw, separators=(",", ":"), default=str).encode("utf-8")
+        rows.append(ZabbixRawPayload(hash=raw_hash, data=compressor.compress(data), tamanho_original=len(data)))
+
+    ZabbixRawPayload.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return len(rows)
+
+
+def prune_payloads() -> int:
+    """
+    Remove de ZabbixRawPayload os hashes que nenhuma tabela espelhada referencia mais
+    (linha apagada ou payload trocado). Só considera payloads mais antigos que a carência.
+    """
+    grace = getattr(settings, "ZABBIX_RAW_PRUNE_GRACE_HOURS", DEFAULT_RAW_PRUNE_GRACE_HOURS)
+    orfaos = ZabbixRawPayload.objects.filter(criado_em__lt=timezone.now() - timedelta(hours=grace))
+
+    for model in apps.get_app_config("zabbix_integration").get_models():
+        if tracks_raw(model):
+            orfaos = orfaos.filter(~Exists(model.objects.filter(raw_hash=OuterRef("hash"))))
+
+    removidos, _ = orfaos.delete()
+    return removidos
+
+
+def load_raw(obj):
+    """
+    Payload bruto de uma linha espelhada, qualquer que seja a política com que foi gravada.
+    """
+    if obj.raw:
+        return obj.raw
+
+    raw_hash = getattr(obj, "raw_hash", None)
+    if not raw_hash:
+        return obj.raw
+
+    payload = ZabbixRawPayload.objects.filter(hash=raw_hash).values_list("data", flat=True).first()
+    if payload is None:
+        return None
+
+    return json.loads(zstandard.ZstdDecompressor().decompress(bytes(payload)))
+
+
+def apply_raw_policy(model, objs: list, policy: str | None = None) -> list:
+    """
+    Calcula raw_hash de cada objeto e ajusta raw conforme a política
+    (comprimido na tabela lateral ou descartado). Altera os objetos no lugar.
+    """
+    policy = policy or get_raw_storage_policy()
+    comprimir = {}
+
+    for obj in objs:
+        obj.raw_hash = content_hash(obj.raw) if obj.raw is not None else None
+
+        if policy == RAW_STORAGE_COMPRESSED and obj.raw_hash:
+            comprimir[obj.raw_hash] = obj.raw
+
+        if policy in (RAW_STORAGE_COMPRESSED, RAW_STORAGE_OFF):
+            obj.raw = _empty_raw(model)
+
+    store_payloads(comprimir)
+    return objs
+
+
+def _ref_attnames(model, update_fields: list[str]) -> list[str]:
+    # FKs resolvidas localmente (trigger, host...) também contam: payload igual com FK nova precisa gravar
+    attnames = []
+    for name in update_fields:
+        field = model._meta.get_field(name)
+        if field.is_relation and field.many_to_one:
+            attnames.append(field.attname)
+    return attnames
+
+
+def drop_unchanged(model, objs: list, unique_fields: list[str], update_fields: list[str], batch_size: int = 1000) -> tuple[list, int]:
+    """
+    Remove da lista os objetos cujo raw_hash (e FKs) já estão gravados iguais.
+    Uma consulta por lote. Retorna (objetos a gravar, quantidade ignorada).
+    """
+    keys = [model._meta.get_field(f).attname for f in unique_fields]
+    refs = _ref_attnames(model, update_fields)
+
+    def key_of(obj):
+        return tuple(getattr(obj, k) for k in keys)
+
+    def state_of(obj):
+        return (obj.raw_hash, *(getattr(obj, r) for r in refs))
+
+    gravar = []
+    for lote in chunked(objs, batch_size):
+        filtro = {f"{k}__in": {getattr(o, k) for o in lote} for k in keys}
+        atuais = {
+            tuple(row[:len(keys)]): tuple(row[len(keys):])
+            for row in model.objects.filter(**filtro).values_list(*keys, "raw_hash", *refs)
+        }
+        gravar.extend(o for o in lote if atuais.get(key_of(o)) != state_of(o))
+
+    return gravar, len(objs) - len(gravar)
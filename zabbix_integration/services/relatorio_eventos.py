@@ -1,21 +1,44 @@
 import os
-from datetime import timedelta
+from datetime import datetime, time, timezone
+from xml.sax.saxutils import escape
+
 from django.conf import settings
-from django.db.models import Q
-
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
-)
+from django.utils.dateparse import parse_date, parse_datetime
+
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.pagesizes import A4, landscape
 
-from zabbix_integration.models import ZabbixEvent, ZabbixHost, ZabbixTrigger
+from zabbix_integration.models import ZabbixIncident
+
+
+PAGINA = landscape(A4)
+MARGEM = 0.35 * inch
+
+# 🔥 Definindo largura fixa das colunas (somam a largura útil do A4 landscape)
+COL_WIDTHS = [
+    2.2 * inch,  # Host
+    4.0 * inch,  # Trigger
+    1.8 * inch,  # Evento original
+    1.8 * inch,  # Recovery
+    1.2 * inch,  # Duração
+]
+
+PADDING_H = 4
+PADDING_V = 3
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 0.4, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), PADDING_H),
+    ('RIGHTPADDING', (0, 0), (-1, -1), PADDING_H),
+    ('TOPPADDING', (0, 0), (-1, -1), PADDING_V),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), PADDING_V),
+])
 
 
 def formatar_duracao(inicio, fim):
@@ -29,30 +52,67 @@ def formatar_duracao(inicio, fim):
     return f"{horas:02d}:{minutos:02d}:{segundos:02d}"
 
 
-def gerar_relatorio_eventos_recovery(cliente_id: int) -> str:
-
-    eventos_problem = ZabbixEvent.objects.filter(
-        cliente_id=cliente_id,
-        value=1
-    ).exclude(
-        Q(r_eventid__isnull=True) | Q(r_eventid="") | Q(r_eventid="0")
-    )
+def parse_periodo(valor, fim_do_dia: bool = False):
+    """
+    Aceita datetime ISO ("2026-02-01T00:00:00") ou data ("2026-02-01"); devolve datetime UTC.
+    """
+    if not valor:
+        return None
+    if isinstance(valor, datetime):
+        dt = valor
+    else:
+        try:
+            d = parse_date(str(valor))
+        except ValueError:
+            d = None
+        if d is not None:
+            dt = datetime.combine(d, time.max if fim_do_dia else time.min)
+        else:
+            dt = parse_datetime(str(valor))
+            if dt is None:
+                raise ValueError(f"Data inválida: {valor}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _linha(celulas, estilo):
+    """
+    Paragraphs da linha + altura medida (maior célula + padding).
+    """
+    paragrafos = [Paragraph(escape(str(c)), estilo) for c in celulas]
+    altura = max(p.wrap(w - 2 * PADDING_H, PAGINA[1])[1] for p, w in zip(paragrafos, COL_WIDTHS))
+    return paragrafos, altura + 2 * PADDING_V
+
+
+def gerar_relatorio_eventos_recovery(cliente_id: int, data_inicio=None, data_fim=None, nome_arquivo: str | None = None) -> dict:
+    """
+    PDF de incidentes (problema -> recovery) do cliente, opcionalmente filtrado
+    pelo início do incidente.
+
+    Uma consulta só (ZabbixIncident, iterator) e renderização página a página
+    direto no canvas: cada página vira uma tabela própria e é descartada após
+    ser desenhada, então a memória não cresce com a quantidade de linhas.
+    """
+    incidentes = ZabbixIncident.objects.filter(cliente_id=cliente_id, end__isnull=False)
+
+    data_inicio = parse_periodo(data_inicio)
+    data_fim = parse_periodo(data_fim, fim_do_dia=True)
+    if data_inicio:
+        incidentes = incidentes.filter(start__gte=data_inicio)
+    if data_fim:
+        incidentes = incidentes.filter(start__lte=data_fim)
+
+    incidentes = incidentes.order_by("start").values_list("hostname", "name", "start", "end")
 
     pasta = os.path.join(settings.MEDIA_ROOT, "relatorios")
     os.makedirs(pasta, exist_ok=True)
 
     caminho = os.path.join(
         pasta,
-        f"relatorio_eventos_cliente_{cliente_id}.pdf"
-    )
-
-    # 🔥 LANDSCAPE
-    doc = SimpleDocTemplate(
-        caminho,
-        pagesize=landscape(A4)
+        nome_arquivo or f"relatorio_eventos_cliente_{cliente_id}.pdf"
     )
 
-    elements = []
     styles = getSampleStyleSheet()
 
     # 🔥 Fonte menor para tabela
@@ -62,80 +122,62 @@ def gerar_relatorio_eventos_recovery(cliente_id: int) -> str:
         fontSize=8,
         leading=10
     )
-
-    elements.append(
-        Paragraph("Relatório de Eventos com Recovery - Zabbix", styles["Heading1"])
-    )
-    elements.append(Spacer(1, 0.3 * inch))
-
-    dados_tabela = [[
-        "Host",
-        "Trigger",
-        "Evento Original",
-        "Recovery",
-        "Duração"
-    ]]
-
-    for evento in eventos_problem:
-
-        recovery = ZabbixEvent.objects.filter(
-            cliente_id=cliente_id,
-            eventid=evento.r_eventid
-        ).first()
-
-        if not recovery:
-            continue
-
-        duracao = formatar_duracao(evento.clock, recovery.clock)
-        #buscar trigger para pegar nome e host
-        trigger = ZabbixTrigger.objects.filter(
-            cliente_id=cliente_id,
-            triggerid=str(evento.objectid)
-        ).first()
-
-        host_nome = "-"
-        trigger_nome = "-"
-
-        if trigger:
-            trigger_nome = trigger.description or trigger.name or "-"
-            
-            item = trigger.items.first()
-            if item and item.host:
-                host_nome = item.host.nome
-
-                dados_tabela.append([
-                                    Paragraph(host_nome, estilo_tabela),
-                                    Paragraph(evento.name or "-", estilo_tabela),
-                                    Paragraph(evento.clock.strftime("%d/%m/%Y %H:%M:%S"), estilo_tabela),
-                                    Paragraph(recovery.clock.strftime("%d/%m/%Y %H:%M:%S"), estilo_tabela),
-                                    Paragraph(duracao, estilo_tabela),
-                                ])
-
-    # 🔥 Definindo largura fixa das colunas
-    largura_total = 11 * inch  # largura útil landscape A4
-    col_widths = [
-        2.2 * inch,  # Host
-        4.0 * inch,  # Trigger
-        1.8 * inch,  # Evento original
-        1.8 * inch,  # Recovery
-        1.2 * inch,  # Duração
-    ]
-
-    tabela = Table(
-        dados_tabela,
-        colWidths=col_widths,
-        repeatRows=1
+    estilo_cabecalho = ParagraphStyle(
+        name="TabelaCabecalho",
+        parent=estilo_tabela,
+        fontName="Helvetica-Bold",
     )
 
-    tabela.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('GRID', (0, 0), (-1, -1), 0.4, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    cabecalho = _linha(["Host", "Trigger", "Evento Original", "Recovery", "Duração"], estilo_cabecalho)
 
-    elements.append(tabela)
-    doc.build(elements)
+    largura, altura = PAGINA
+    topo = altura - MARGEM
 
-    return caminho
\ No newline at end of file
+    # 🔥 LANDSCAPE
+    c = canvas.Canvas(caminho, pagesize=PAGINA)
+    pagina = 1
+
+    titulo = Paragraph("Relatório de Eventos com Recovery - Zabbix", styles["Heading1"])
+    _, altura_titulo = titulo.wrap(largura - 2 * MARGEM, altura)
+    titulo.drawOn(c, MARGEM, topo - altura_titulo)
+    inicio_tabela = topo - altura_titulo - 0.3 * inch
+
+    linhas, alturas = [cabecalho[0]], [cabecalho[1]]
+    usado = cabecalho[1]
+    total = 0
+
+    def _desenhar_pagina():
+        tabela = Table(linhas, colWidths=COL_WIDTHS, rowHeights=alturas)
+        tabela.setStyle(TABLE_STYLE)
+        tabela.wrapOn(c, largura, altura)
+        tabela.drawOn(c, MARGEM, inicio_tabela - usado)
+        c.setFont("Helvetica", 7)
+        c.drawRightString(largura - MARGEM, MARGEM / 2, f"Página {pagina}")
+        c.showPage()
+
+    for host_nome, trigger_nome, inicio, fim in incidentes.iterator():
+        celulas, h = _linha([
+            host_nome or "-",
+            trigger_nome or "-",
+            inicio.strftime("%d/%m/%Y %H:%M:%S"),
+            fim.strftime("%d/%m/%Y %H:%M:%S"),
+            formatar_duracao(inicio, fim),
+        ], estilo_tabela)
+
+        # página cheia: desenha e recomeça com o cabeçalho
+        if usado + h > inicio_tabela - MARGEM and len(linhas) > 1:
+            _desenhar_pagina()
+            pagina += 1
+            inicio_tabela = topo
+            linhas, alturas = [cabecalho[0]], [cabecalho[1]]
+            usado = cabecalho[1]
+
+        linhas.append(celulas)
+        alturas.append(h)
+        usado += h
+        total += 1
+
+    _desenhar_pagina()
+    c.save()
+
+    return {"caminho": caminho, "total_linhas": total, "paginas": pagina}
@@ -0,0 +1,42 @@
+from django.utils import timezone
+
+from zabbix_integration.models import ZabbixRelatorioJob
+from .relatorio_eventos import gerar_relatorio_eventos_recovery
+
+
+# tipo de job -> função que gera o arquivo
+GERADORES = {
+    "eventos_recovery": gerar_relatorio_eventos_recovery,
+}
+
+
+def executar_relatorio_job(job_id: int) -> ZabbixRelatorioJob:
+    """
+    Executa um ZabbixRelatorioJob pendente e registra o resultado (ou o erro) nele.
+    """
+    job = ZabbixRelatorioJob.objects.get(pk=job_id)
+
+    job.status = "processando"
+    job.save(update_fields=["status", "atualizado_em"])
+
+    try:
+        gerar = GERADORES[job.tipo]
+        result = gerar(
+            job.cliente_id,
+            nome_arquivo=f"relatorio_{job.tipo}_cliente_{job.cliente_id}_job_{job.pk}.pdf",
+            **(job.parametros or {}),
+        )
+    except Exception as e:
+        job.status = "erro"
+        job.erro = str(e)
+        job.concluido_em = timezone.now()
+        job.save(update_fields=["status", "erro", "concluido_em", "atualizado_em"])
+        raise
+
+    job.status = "concluido"
+    job.arquivo = result["caminho"]
+    job.total_linhas = result["total_linhas"]
+    job.concluido_em = timezone.now()
+    job.save(update_fields=["status", "arquivo", "total_linhas", "concluido_em", "atualizado_em"])
+
+    return job
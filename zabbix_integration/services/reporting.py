@@ -3,9 +3,17 @@ from __future__ import annotations
 from datetime import datetime, timezone
 import calendar
 
+from django.db import transaction
+
+from zabbix_integration.models import ZabbixSLAMensal
+from .bulk import bulk_upsert
 from .sync import get_client_for_cliente
 
 
+# linha marcadora de mês fechado sem nenhum SLA (sem ela, o mês vazio iria ao Zabbix em toda consulta)
+MES_SEM_SLA = ""
+
+
 def _month_range_utc(year: int, month: int) -> tuple[int, int]:
     """
     Retorna timestamps UTC do início do mês (inclusive) e do início do próximo mês (exclusive).
@@ -20,7 +28,22 @@ def _month_range_utc(year: int, month: int) -> tuple[int, int]:
     return int(start.timestamp()), int(end.timestamp())
 
 
-def build_monthly_sla_report(cliente_id: int, year: int, month: int) -> dict:
+def _previous_month(year: int, month: int) -> tuple[int, int]:
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+def _float_or_none(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fetch_month_rows(cliente_id: int, year: int, month: int) -> list[dict]:
+    """
+    Duas requisições: sla.get (lista os SLAs) e um POST (JSON-RPC batch)
+    com todos os sla.getsli do mês.
+    """
     client = get_client_for_cliente(cliente_id)
 
     period_from, period_to = _month_range_utc(year, month)
@@ -32,18 +55,7 @@ def build_monthly_sla_report(cliente_id: int, year: int, month: int) -> dict:
     if not isinstance(slas, list):
         slas = [slas]
 
-    report_rows = []
-    overall = {
-        "month": f"{year:04d}-{month:02d}",
-        "period_from": period_from,
-        "period_to": period_to,
-        "slas_count": len(slas),
-        "services_count": 0,
-        "uptime_seconds_total": 0,
-        "downtime_seconds_total": 0,
-        "sli_avg": None,
-    }
-
+    validos = []
     for sla in slas:
         if not isinstance(sla, dict):
             continue
@@ -52,15 +64,22 @@ def build_monthly_sla_report(cliente_id: int, year: int, month: int) -> dict:
         if not slaid:
             continue
 
-        params = {
-            "slaid": slaid,
-            "period_from": period_from,
-            "period_to": period_to,
-            "periods": 1,
-        }
+        validos.append((slaid, sla))
+
+    # 2) Um único POST (JSON-RPC batch) com todos os sla.getsli do mês
+    request_ids = {}
+    with client.batch() as batch:
+        for slaid, _ in validos:
+            request_ids[slaid] = batch.add("sla.getsli", {
+                "slaid": slaid,
+                "period_from": period_from,
+                "period_to": period_to,
+                "periods": 1,
+            })
 
-        print("ZABBIX sla.getsli params:", params)
-        result = client._call("sla.getsli", params) or {}
+    rows = []
+    for slaid, sla in validos:
+        result = batch.result(request_ids[slaid]) or {}
         if not isinstance(result, dict):
             result = {}
 
@@ -78,35 +97,144 @@ def build_monthly_sla_report(cliente_id: int, year: int, month: int) -> dict:
             if not isinstance(cell, dict):
                 cell = {}
 
-            uptime = int(cell.get("uptime") or 0)
-            downtime = int(cell.get("downtime") or 0)
-
             services_data.append({
                 "serviceid": sid,
                 "sli": cell.get("sli"),
-                "uptime": uptime,
-                "downtime": downtime,
+                "uptime": int(cell.get("uptime") or 0),
+                "downtime": int(cell.get("downtime") or 0),
                 "error_budget": cell.get("error_budget"),
                 "excluded_downtimes": cell.get("excluded_downtimes", []),
             })
 
-            overall["uptime_seconds_total"] += uptime
-            overall["downtime_seconds_total"] += downtime
-
-        overall["services_count"] += len(services_data)
-
         sli_values = [s["sli"] for s in services_data if s.get("sli") is not None]
-        sla_sli_avg = (sum(sli_values) / len(sli_values)) if sli_values else None
 
-        report_rows.append({
+        rows.append({
             "slaid": slaid,
             "name": sla.get("name"),
             "slo": sla.get("slo"),
+            "services": services_data,
+            "sli_avg": (sum(sli_values) / len(sli_values)) if sli_values else None,
+        })
+
+    return rows
+
+
+def _store_month(cliente_id: int, year: int, month: int, rows: list[dict], fechado: bool):
+    period_from, period_to = _month_range_utc(year, month)
+
+    # mês fechado sem SLA: grava só o marcador
+    if fechado and not rows:
+        rows = [{"slaid": MES_SEM_SLA, "name": None, "slo": None, "sli_avg": None, "services": []}]
+
+    with transaction.atomic():
+        # SLA que sumiu do Zabbix não fica "fantasma" no mês (nem o marcador, se vieram SLAs)
+        ZabbixSLAMensal.objects.filter(cliente_id=cliente_id, ano=year, mes=month).exclude(
+            slaid__in=[r["slaid"] for r in rows]
+        ).delete()
+
+        bulk_upsert(
+            ZabbixSLAMensal,
+            [
+                ZabbixSLAMensal(
+                    cliente_id=cliente_id,
+                    slaid=r["slaid"],
+                    ano=year,
+                    mes=month,
+                    name=r["name"],
+                    slo=_float_or_none(r["slo"]),
+                    sli_avg=_float_or_none(r["sli_avg"]),
+                    uptime_seconds=sum(s["uptime"] for s in r["services"]),
+                    downtime_seconds=sum(s["downtime"] for s in r["services"]),
+                    services=r["services"],
+                    period_from=period_from,
+                    period_to=period_to,
+                    fechado=fechado,
+                )
+                for r in rows
+            ],
+            unique_fields=["cliente", "slaid", "ano", "mes"],
+            update_fields=[
+                "name", "slo", "sli_avg", "uptime_seconds", "downtime_seconds",
+                "services", "period_from", "period_to", "fechado", "atualizado_em",
+            ],
+        )
+
+
+def get_month_sla(cliente_id: int, year: int, month: int, refresh: bool = False) -> tuple[list[ZabbixSLAMensal], str]:
+    """
+    SLIs do mês: mês fechado já gravado vem do banco; mês corrente (ou ainda
+    não gravado, ou refresh=True) é buscado no Zabbix e gravado.
+    Retorna (registros, origem) com origem "local" ou "zabbix".
+    """
+    _, period_to = _month_range_utc(year, month)
+    mes_fechado = period_to <= int(datetime.now(tz=timezone.utc).timestamp())
+
+    local = ZabbixSLAMensal.objects.filter(cliente_id=cliente_id, ano=year, mes=month).order_by("name", "slaid")
+
+    if mes_fechado and not refresh and local.filter(fechado=True).exists():
+        return list(local.exclude(slaid=MES_SEM_SLA)), "local"
+
+    _store_month(cliente_id, year, month, _fetch_month_rows(cliente_id, year, month), fechado=mes_fechado)
+
+    return list(local.exclude(slaid=MES_SEM_SLA)), "zabbix"
+
+
+def _comparativo(atual: list[ZabbixSLAMensal], anterior: list[ZabbixSLAMensal]) -> list[dict]:
+    anterior_por_sla = {r.slaid: r for r in anterior}
+    comparativo = []
+
+    for r in atual:
+        prev = anterior_por_sla.get(r.slaid)
+        delta = None
+        if prev and r.sli_avg is not None and prev.sli_avg is not None:
+            delta = r.sli_avg - prev.sli_avg
+
+        comparativo.append({
+            "slaid": r.slaid,
+            "name": r.name,
+            "sli_avg": r.sli_avg,
+            "sli_avg_mes_anterior": prev.sli_avg if prev else None,
+            "variacao": delta,
+        })
+
+    return comparativo
+
+
+def build_monthly_sla_report(cliente_id: int, year: int, month: int, refresh: bool = False) -> dict:
+    period_from, period_to = _month_range_utc(year, month)
+
+    registros, origem = get_month_sla(cliente_id, year, month, refresh=refresh)
+
+    # mês anterior já está fechado: depois da primeira vez, vem sempre do banco
+    prev_year, prev_month = _previous_month(year, month)
+    anteriores, _ = get_month_sla(cliente_id, prev_year, prev_month)
+
+    report_rows = []
+    overall = {
+        "month": f"{year:04d}-{month:02d}",
+        "period_from": period_from,
+        "period_to": period_to,
+        "slas_count": len(registros),
+        "services_count": 0,
+        "uptime_seconds_total": 0,
+        "downtime_seconds_total": 0,
+        "sli_avg": None,
+    }
+
+    for r in registros:
+        overall["services_count"] += len(r.services or [])
+        overall["uptime_seconds_total"] += r.uptime_seconds
+        overall["downtime_seconds_total"] += r.downtime_seconds
+
+        report_rows.append({
+            "slaid": r.slaid,
+            "name": r.name,
+            "slo": r.slo,
             "month": f"{year:04d}-{month:02d}",
             "period_from": period_from,
             "period_to": period_to,
-            "services": services_data,
-            "sli_avg": sla_sli_avg,
+            "services": r.services or [],
+            "sli_avg": r.sli_avg,
         })
 
     # Média geral ponderada via uptime/downtime agregados (melhor que média de médias)
@@ -119,6 +247,8 @@ def build_monthly_sla_report(cliente_id: int, year: int, month: int) -> dict:
         "month": month,
         "period_from": period_from,
         "period_to": period_to,
+        "origem": origem,
         "overall": overall,
         "rows": report_rows,
+        "comparativo_mes_anterior": _comparativo(registros, anteriores),
     }
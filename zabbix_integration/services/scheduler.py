@@ -0,0 +1,97 @@
+import random
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from zabbix_integration.models import ZabbixConnection, ZabbixSyncControl
+from .sync_lock import claim_enqueue
+from .webhook import DEFAULT_RECONCILE_SECONDS, webhook_tenants
+
+
+DEFAULT_WINDOW_SECONDS = 300
+DEFAULT_FULL_WINDOW_SECONDS = 3600
+DEFAULT_JITTER_SECONDS = 30
+
+
+def active_tenants() -> list[tuple[int, int]]:
+    """
+    (cliente_id, intervalo_sync_segundos) dos clientes com ZabbixConnection ativa.
+    """
+    return list(
+        ZabbixConnection.objects
+        .filter(ativo=True)
+        .order_by("cliente_id")
+        .values_list("cliente_id", "intervalo_sync_segundos")
+    )
+
+
+def tenant_offset(cliente_id: int, window: int, jitter: int) -> int:
+    """
+    Atraso (s) do cliente dentro da janela: slot fixo pelo hash do id + jitter
+    aleatório. Clientes ficam espalhados e cada um mantém uma cadência estável.
+    """
+    if window <= 1:
+        return 0
+    slot = zlib.crc32(str(cliente_id).encode()) % window
+    return int(min(window - 1, slot + random.uniform(0, max(jitter, 0))))
+
+
+def _is_due(last_sync, intervalo: int, window: int, agora) -> bool:
+    # roda se o próximo sync "vence" dentro desta janela (intervalo < janela = toda janela)
+    if not last_sync:
+        return True
+    return agora - last_sync >= timedelta(seconds=max(intervalo - window, 0))
+
+
+def schedule_tenants(kind: str, task) -> dict:
+    """
+    Enfileira `task` para cada cliente ativo que está no prazo, com countdown
+    espalhado na janela (ZABBIX_SYNC_WINDOW_SECONDS / ZABBIX_FULL_SYNC_WINDOW_SECONDS).
+
+    Clientes com webhook ativo recebem os eventos em tempo real: o incremental deles
+    vira reconciliação a cada ZABBIX_WEBHOOK_RECONCILE_SECONDS.
+    """
+    if kind == "full":
+        window = getattr(settings, "ZABBIX_FULL_SYNC_WINDOW_SECONDS", DEFAULT_FULL_WINDOW_SECONDS)
+    else:
+        window = getattr(settings, "ZABBIX_SYNC_WINDOW_SECONDS", DEFAULT_WINDOW_SECONDS)
+    jitter = getattr(settings, "ZABBIX_SYNC_JITTER_SECONDS", DEFAULT_JITTER_SECONDS)
+
+    tenants = active_tenants()
+    ultimos = dict(
+        ZabbixSyncControl.objects
+        .filter(cliente_id__in=[cid for cid, _ in tenants])
+        .values_list("cliente_id", "last_incremental_sync")
+    )
+
+    via_webhook = webhook_tenants(cid for cid, _ in tenants) if kind == "incremental" else set()
+    reconciliacao = getattr(settings, "ZABBIX_WEBHOOK_RECONCILE_SECONDS", DEFAULT_RECONCILE_SECONDS)
+
+    agora = timezone.now()
+    enfileirados = 0
+    fora_do_prazo = 0
+
+    for cliente_id, intervalo in tenants:
+        if cliente_id in via_webhook:
+            intervalo = max(intervalo, reconciliacao)
+
+        if kind == "incremental" and not _is_due(ultimos.get(cliente_id), intervalo, window, agora):
+            fora_do_prazo += 1
+            continue
+
+        # 🔁 dedup: não enfileira de novo quem ainda está na fila/rodando
+        if not claim_enqueue(cliente_id, kind):
+            continue
+
+        task.apply_async(args=[cliente_id], countdown=tenant_offset(cliente_id, window, jitter))
+        enfileirados += 1
+
+    return {
+        "total_clientes": len(tenants),
+        "enfileirados": enfileirados,
+        "fora_do_prazo": fora_do_prazo,
+        "via_webhook": len(via_webhook),
+        "descartados": len(tenants) - enfileirados - fora_do_prazo,
+    }
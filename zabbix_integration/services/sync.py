@@ -1,9 +1,12 @@
 from zabbix_integration.models import ZabbixConnection
 from .zabbix_client import ZabbixClient
+from .client_pool import get_client_pool
 
 
 def get_client_for_cliente(cliente_id: int) -> ZabbixClient:
+    """
+    Retorna um client já autenticado, reaproveitado do pool do processo
+    (sessão HTTP keep-alive + token em cache).
+    """
     conn = ZabbixConnection.objects.get(cliente_id=cliente_id, ativo=True)
-    client = ZabbixClient(conn.base_url)
-    client.login(conn.usuario, conn.senha)
-    return client
+    return get_client_pool().get_client(conn)
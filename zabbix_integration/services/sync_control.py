@@ -1,5 +1,8 @@
 from django.utils import timezone
-from zabbix_integration.models import ZabbixSyncControl
+from zabbix_integration.models import ZabbixSyncControl, ZabbixSyncWatermark
+
+
+WATERMARK_EVENTS = "events"
 
 
 def get_or_create_control(cliente_id):
@@ -20,4 +23,31 @@ def update_incremental_sync(cliente_id):
 
 def get_last_incremental(cliente_id):
     control = get_or_create_control(cliente_id)
-    return control.last_incremental_sync
\ No newline at end of file
+    return control.last_incremental_sync
+
+
+def get_watermark(cliente_id, entity):
+    return ZabbixSyncWatermark.objects.filter(cliente_id=cliente_id, entity=entity).first()
+
+
+def advance_watermark(cliente_id, entity, last_id=None, last_clock=None, **extra):
+    """
+    Avança a marca d'água de (cliente, entidade). Nunca retrocede.
+
+    Deve ser chamada dentro da mesma transação que grava o lote, para que
+    dados e marca d'água sejam confirmados (ou desfeitos) juntos.
+    """
+    wm, _ = ZabbixSyncWatermark.objects.select_for_update().get_or_create(
+        cliente_id=cliente_id,
+        entity=entity,
+    )
+
+    if last_id is not None and (wm.last_id is None or int(last_id) > wm.last_id):
+        wm.last_id = int(last_id)
+    if last_clock is not None and (wm.last_clock is None or last_clock > wm.last_clock):
+        wm.last_clock = last_clock
+    if extra:
+        wm.extra = {**(wm.extra or {}), **extra}
+
+    wm.save()
+    return wm
@@ -1,23 +1,260 @@
 from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from django.db import transaction
 from zabbix_integration.models import ZabbixEvent, ZabbixTrigger
 from zabbix_integration.services.sync import get_client_for_cliente
+from .bulk import bulk_upsert
+from .chunk_executor import run_chunks_concurrently
+from .event_stream import aiter_events, iter_events
+from .incidents import apply_events_to_incidents, close_incidents
+from .sync_control import WATERMARK_EVENTS, advance_watermark, get_watermark
 from .utils import chunked, dt_from_epoch
 
 
 BATCH_TRIGGERS = 200
 
+EVENT_OUTPUT = [
+    "eventid",
+    "objectid",
+    "clock",
+    "value",
+    "acknowledged",
+    "severity",
+    "name",
+    "r_eventid",
+    "c_eventid",
+    "opdata",
+]
 
-def sync_events_incremental(cliente_id: int, last_sync=None):
+RECONCILE_EVENTS_PER_CALL = 500
+# só problemas recentes são relidos (mês corrente + anterior cobrem MTTR/relatórios), com teto por execução
+DEFAULT_RECONCILE_WINDOW_DAYS = 62
+DEFAULT_RECONCILE_MAX_EVENTS = 20000
 
+EVENT_UPDATE_FIELDS = [
+    "trigger",
+    "name",
+    "severity",
+    "acknowledged",
+    "value",
+    "clock",
+    "raw",
+    "objectid",
+    "r_eventid",
+    "c_eventid",
+    "opdata",
+    "host",
+    "hostid",
+    "hostname",
+]
+
+
+def _trigger_pks(cliente_id: int, triggerids=None) -> dict[str, int]:
+    qs = ZabbixTrigger.objects.filter(cliente_id=cliente_id)
+    if triggerids is not None:
+        qs = qs.filter(triggerid__in=triggerids)
+    return dict(qs.values_list("triggerid", "id"))
+
+
+def _trigger_hosts(cliente_id: int, trigger_pks=None) -> dict[int, tuple]:
+    """
+    trigger pk -> (host pk, hostid, nome do host), pelo primeiro item vinculado à trigger.
+    """
+    links = (
+        ZabbixTrigger.items.through.objects
+        .filter(zabbixtrigger__cliente_id=cliente_id, zabbixitem__host__isnull=False)
+        .order_by("id")
+    )
+    if trigger_pks is not None:
+        links = links.filter(zabbixtrigger_id__in=trigger_pks)
+
+    hosts = {}
+    for trigger_pk, host_pk, hostid, nome in links.values_list(
+        "zabbixtrigger_id", "zabbixitem__host_id", "zabbixitem__host__hostid", "zabbixitem__host__nome"
+    ):
+        hosts.setdefault(trigger_pk, (host_pk, hostid, nome))
+    return hosts
+
+
+def _eventid_ref(value) -> str | None:
+    # Zabbix devolve "0" quando não há evento relacionado
+    return str(value) if value and str(value) != "0" else None
+
+
+def _event_rows(cliente_id: int, events: list[dict], trigger_pks: dict[str, int], trigger_hosts: dict[int, tuple]) -> list[ZabbixEvent]:
+    rows = []
+    for ev in events:
+        trigger_pk = trigger_pks.get(str(ev.get("objectid")))
+        host_pk, hostid, hostname = trigger_hosts.get(trigger_pk, (None, None, None))
+
+        rows.append(
+            ZabbixEvent(
+                cliente_id=cliente_id,
+                eventid=str(ev["eventid"]),
+                trigger_id=trigger_pk,
+                name=ev.get("name"),
+                severity=int(ev.get("severity") or 0),
+                acknowledged=bool(int(ev.get("acknowledged") or 0)),
+                value=int(ev.get("value") or 0),
+                clock=dt_from_epoch(ev.get("clock")),
+                raw=ev,
+                objectid=str(ev.get("objectid")),
+                r_eventid=_eventid_ref(ev.get("r_eventid")),
+                c_eventid=_eventid_ref(ev.get("c_eventid")),
+                opdata=(ev.get("opdata") or "")[:255] or None,
+                host_id=host_pk,
+                hostid=hostid,
+                hostname=hostname,
+            )
+        )
+    return rows
+
+
+def reconcile_open_problems(client, cliente_id: int) -> int:
+    """
+    Problemas gravados antes de serem resolvidos ficam sem r_eventid (cada
+    evento só é lido uma vez pelo stream). Relê só esses eventos, em lote,
+    e grava o r_eventid dos que já têm recuperação.
+
+    Limitado aos problemas dos últimos ZABBIX_RECONCILE_WINDOW_DAYS (mais novos
+    primeiro, até ZABBIX_RECONCILE_MAX_EVENTS). Os que o Zabbix não devolve mais
+    são marcados ausente_no_zabbix e não são consultados de novo.
+    """
+    desde = datetime.now(tz=timezone.utc) - timedelta(
+        days=getattr(settings, "ZABBIX_RECONCILE_WINDOW_DAYS", DEFAULT_RECONCILE_WINDOW_DAYS)
+    )
+    abertos = list(
+        ZabbixEvent.objects
+        .filter(cliente_id=cliente_id, value=1, r_eventid__isnull=True, ausente_no_zabbix=False, clock__gte=desde)
+        .order_by("-clock")
+        .values_list("eventid", flat=True)[:getattr(settings, "ZABBIX_RECONCILE_MAX_EVENTS", DEFAULT_RECONCILE_MAX_EVENTS)]
+    )
+    if not abertos:
+        return 0
+
+    with client.batch() as batch:
+        request_ids = [
+            batch.add("event.get", {
+                "output": ["eventid", "r_eventid"],
+                "eventids": chunk,
+                "source": 0,
+                "object": 0,
+            })
+            for chunk in chunked(abertos, RECONCILE_EVENTS_PER_CALL)
+        ]
+
+    resolvidos = {}
+    devolvidos = set()
+    for request_id in request_ids:
+        for ev in batch.result(request_id) or []:
+            devolvidos.add(str(ev["eventid"]))
+            r_eventid = _eventid_ref(ev.get("r_eventid"))
+            if r_eventid:
+                resolvidos[str(ev["eventid"])] = r_eventid
+
+    ausentes = set(abertos) - devolvidos
+    if ausentes:
+        ZabbixEvent.objects.filter(cliente_id=cliente_id, eventid__in=list(ausentes)).update(ausente_no_zabbix=True)
+
+    if not resolvidos:
+        return 0
+
+    objs = list(ZabbixEvent.objects.filter(cliente_id=cliente_id, eventid__in=list(resolvidos.keys())).only("id", "eventid"))
+    for obj in objs:
+        obj.r_eventid = resolvidos[obj.eventid]
+    ZabbixEvent.objects.bulk_update(objs, ["r_eventid"], batch_size=1000)
+
+    close_incidents(cliente_id, explicitos=resolvidos)
+
+    return len(objs)
+
+
+def _ultimo_eventid(client) -> int | None:
+    ultimo = client.event_get(
+        output=["eventid"],
+        source=0,
+        object=0,
+        sortfield=["eventid"],
+        sortorder="DESC",
+        limit=1,
+    )
+    return int(ultimo[0]["eventid"]) if ultimo else None
+
+
+def sync_events_incremental(cliente_id: int, last_sync=None, concurrency: int | None = None):
+    """
+    Sync incremental de eventos guiado pela marca d'água (maior eventid gravado).
+
+    - com marca d'água: stream sequencial por eventid a partir dela; cada página
+      é gravada junto com a nova marca d'água na mesma transação.
+    - sem marca d'água (primeira execução): backfill em paralelo por blocos de
+      triggers desde `last_sync` (ou 30 dias) até o eventid atual do Zabbix,
+      que vira a marca d'água ao final.
+    """
     print(f"Iniciando sync de eventos cliente {cliente_id}")
 
     client = get_client_for_cliente(cliente_id)
 
+    wm = get_watermark(cliente_id, WATERMARK_EVENTS)
+    if wm and wm.last_id is not None:
+        result = _sync_events_from_watermark(client, cliente_id, wm.last_id)
+    else:
+        result = _backfill_events(client, cliente_id, last_sync, concurrency)
+
+    # ✅ problemas que foram resolvidos depois de gravados
+    result["problemas_reconciliados"] = reconcile_open_problems(client, cliente_id)
+
+    return result
+
+
+def _sync_events_from_watermark(client, cliente_id: int, last_id: int):
+    trigger_pks = _trigger_pks(cliente_id)
+    trigger_hosts = _trigger_hosts(cliente_id)
+    total_events = 0
+
+    for events in iter_events(
+        client,
+        eventid_from=last_id + 1,
+        source=0,
+        object=0,
+        output=EVENT_OUTPUT,
+    ):
+        ultimo = events[-1]
+
+        rows = _event_rows(cliente_id, events, trigger_pks, trigger_hosts)
+
+        # 🔥 página + incidentes + marca d'água confirmados juntos
+        with transaction.atomic():
+            bulk_upsert(
+                ZabbixEvent,
+                rows,
+                unique_fields=["cliente", "eventid"],
+                update_fields=EVENT_UPDATE_FIELDS,
+            )
+            apply_events_to_incidents(cliente_id, rows)
+            advance_watermark(
+                cliente_id,
+                WATERMARK_EVENTS,
+                last_id=ultimo["eventid"],
+                last_clock=dt_from_epoch(ultimo.get("clock")),
+            )
+
+        total_events += len(events)
+
+        print(f"Eventos processados até agora: {total_events}")
+
+    return {"total_eventos_processados": total_events, "modo": "watermark"}
+
+
+def _backfill_events(client, cliente_id: int, last_sync=None, concurrency: int | None = None):
     if not last_sync:
         last_sync = datetime.now(tz=timezone.utc) - timedelta(hours=720)
 
     timestamp = int(last_sync.timestamp())
 
+    # teto fixo: o que chegar depois dele fica para o stream por marca d'água
+    teto = _ultimo_eventid(client)
+
     triggerids = list(
         ZabbixTrigger.objects
         .filter(cliente_id=cliente_id)
@@ -25,60 +262,60 @@ def sync_events_incremental(cliente_id: int, last_sync=None):
     )
 
     total_events = 0
-    print(chunked(triggerids, BATCH_TRIGGERS))
-    for trigger_chunk in chunked(triggerids, BATCH_TRIGGERS):
-        print(f"Processando chunk de triggers: {trigger_chunk}")
-        events = client.event_get(
+
+    # 🔥 event.get por blocos de triggers, vários blocos em paralelo,
+    #    cada bloco paginado por eventid (memória limitada a uma página)
+    async def fetch(aclient, trigger_chunk):
+        async for page in aiter_events(
+            aclient,
+            time_from=timestamp,
             source=0,
             object=0,
             objectids=trigger_chunk,  # 🔥 FILTRA POR TRIGGER
-            time_from=timestamp,
-            output=[
-                "eventid",
-                "objectid",
-                "clock",
-                "value",
-                "acknowledged",
-                "severity",
-                "name",
-                "objectid",
-            ],
-            sortfield="clock",
-            sortorder="ASC",
-        )
-
-        if not events:
-            continue
+            eventid_till=str(teto),
+            output=EVENT_OUTPUT,
+        ):
+            yield page
 
-        trigger_map = {
-            t.triggerid: t
-            for t in ZabbixTrigger.objects.filter(
-                cliente_id=cliente_id,
-                triggerid__in=trigger_chunk
-            )
-        }
+    def handle(trigger_chunk, events):
+        nonlocal total_events
 
-        for ev in events:
+        if not events:
+            return
 
-            trigger = trigger_map.get(str(ev["objectid"]))
+        trigger_pks = _trigger_pks(cliente_id, trigger_chunk)
+        rows = _event_rows(cliente_id, events, trigger_pks, _trigger_hosts(cliente_id, list(trigger_pks.values())))
 
-            ZabbixEvent.objects.update_or_create(
-                cliente_id=cliente_id,
-                eventid=str(ev["eventid"]),
-                defaults={
-                    "trigger": trigger,
-                    "name": ev.get("name"),
-                    "severity": int(ev.get("severity") or 0),
-                    "acknowledged": bool(int(ev.get("acknowledged") or 0)),
-                    "value": int(ev.get("value") or 0),
-                    "clock": dt_from_epoch(ev.get("clock")),
-                    "raw": ev,
-                    "objectid": str(ev.get("objectid")),
-                },
+        # 🔥 INSERT ... ON CONFLICT (eventid) DO UPDATE, em lotes (+ incidentes)
+        with transaction.atomic():
+            bulk_upsert(
+                ZabbixEvent,
+                rows,
+                unique_fields=["cliente", "eventid"],
+                update_fields=EVENT_UPDATE_FIELDS,
             )
+            apply_events_to_incidents(cliente_id, rows)
 
         total_events += len(events)
 
         print(f"Eventos processados até agora: {total_events}")
 
-    return {"total_eventos_processados": total_events}
\ No newline at end of file
+    if teto is not None:
+        run_chunks_concurrently(
+            client,
+            chunked(triggerids, BATCH_TRIGGERS),
+            fetch,
+            handle,
+            concurrency=concurrency,
+        )
+
+    # só depois de todos os blocos: um backfill interrompido é refeito (upsert idempotente)
+    with transaction.atomic():
+        advance_watermark(
+            cliente_id,
+            WATERMARK_EVENTS,
+            last_id=teto or 0,
+            backfill_desde=timestamp,
+        )
+
+    return {"total_eventos_processados": total_events, "modo": "backfill"}
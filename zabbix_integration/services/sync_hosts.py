@@ -1,41 +1,123 @@
+from django.db import transaction
+
 from zabbix_integration.models import ZabbixHost, ZabbixHostGroup
+from .bulk import bulk_upsert, sync_m2m
+from .change_detection import prefetch_row_hashes, split_changed, update_changed
 from .sync import get_client_for_cliente
+from .utils import content_hash, row_hash
 
 
-def sync_hosts(cliente_id: int):
-    print(f"Iniciando sincronização de hosts para cliente_id={cliente_id}")
-    client = get_client_for_cliente(cliente_id)
+HOST_UPDATE_FIELDS = ["hostname", "nome", "status", "raw", "row_hash", "atualizado_em"]
+GROUP_UPDATE_FIELDS = ["name", "raw", "atualizado_em"]
 
-    hosts = client.host_get(
-        output=["hostid", "host", "name", "status"],
-        selectGroups=["groupid", "name"]
+
+@transaction.atomic
+def upsert_hosts_payload(cliente_id: int, hosts: list[dict]) -> dict:
+    """
+    Grava o resultado de um host.get (com selectGroups) de forma set-based:
+
+    - bulk upsert de ZabbixHostGroup; ZabbixHost só os novos/alterados (row_hash)
+    - vínculos host <-> grupo calculados em memória
+    - só as diferenças vão para a tabela intermediária (um DELETE + um INSERT)
+
+    A quantidade de statements não depende da quantidade de hosts (só do tamanho dos lotes).
+    """
+    groups = {}
+    for h in hosts:
+        for g in h.get("groups") or []:
+            groups[str(g["groupid"])] = ZabbixHostGroup(
+                cliente_id=cliente_id,
+                groupid=str(g["groupid"]),
+                name=g.get("name"),
+                raw=g,
+            )
+
+    bulk_upsert(
+        ZabbixHostGroup,
+        groups.values(),
+        unique_fields=["cliente", "groupid"],
+        update_fields=GROUP_UPDATE_FIELDS,
     )
 
+    host_rows = []
     for h in hosts:
-        print(f"Sincronizando host: {h['host']} (ID: {h['hostid']})")
-        host_obj, _ = ZabbixHost.objects.update_or_create(
+        row = ZabbixHost(
             cliente_id=cliente_id,
-            hostid=h["hostid"],
-            defaults={
-                "nome": h.get("name"),
-                "status": h.get("status"),
-                "raw": h
-            }
+            hostid=str(h["hostid"]),
+            hostname=h.get("host") or "",
+            nome=h.get("name") or "",
+            status=str(h.get("status") or 0),
+            raw=h,
         )
+        # raw_hash entra no hash: campo extra do payload (ex.: output maior do servico.sync_hosts)
+        # também conta como mudança, senão o raw gravado ficaria velho
+        row.raw_hash = content_hash(h)
+        row.row_hash = row_hash(
+            row.hostname,
+            row.nome,
+            row.status,
+            sorted(str(g["groupid"]) for g in h.get("groups") or []),
+            row.raw_hash,
+        )
+        host_rows.append(row)
 
-        # 🔥 Atualiza grupos do host
-        grupos_relacionados = []
+    # 🔎 só o que mudou vai para o banco (hash comparado em memória)
+    novos, alterados, inalterados = split_changed(
+        host_rows, "hostid", prefetch_row_hashes(ZabbixHost, cliente_id, "hostid")
+    )
 
-        for g in h.get("groups", []):
-            group_obj, _ = ZabbixHostGroup.objects.update_or_create(
-                cliente_id=cliente_id,
-                groupid=g["groupid"],
-                defaults={
-                    "name": g["name"],
-                    "raw": g
-                }
-            )
-            grupos_relacionados.append(group_obj)
+    bulk_upsert(
+        ZabbixHost,
+        novos,
+        unique_fields=["cliente", "hostid"],
+        update_fields=HOST_UPDATE_FIELDS,
+    )
+    update_changed(ZabbixHost, alterados, ["hostname", "nome", "status", "raw"])
+
+    # mapas id Zabbix -> pk local (uma consulta cada)
+    host_pks = dict(
+        ZabbixHost.objects
+        .filter(cliente_id=cliente_id, hostid__in=[r.hostid for r in host_rows])
+        .values_list("hostid", "id")
+    )
+    group_pks = dict(
+        ZabbixHostGroup.objects
+        .filter(cliente_id=cliente_id, groupid__in=list(groups.keys()))
+        .values_list("groupid", "id")
+    )
+
+    # 🔥 relação M2M desejada (host sem grupo => remove todos os vínculos)
+    desired = {
+        host_pks[str(h["hostid"])]: {
+            group_pks[str(g["groupid"])]
+            for g in h.get("groups") or []
+            if str(g["groupid"]) in group_pks
+        }
+        for h in hosts
+        if str(h["hostid"]) in host_pks
+    }
+
+    vinculos = sync_m2m(ZabbixHost.groups, desired)
+
+    return {
+        "hosts": len(host_pks),
+        "novos": len(novos),
+        "alterados": len(alterados),
+        "inalterados": inalterados,
+        "grupos": len(group_pks),
+        "vinculos_adicionados": vinculos["adicionados"],
+        "vinculos_removidos": vinculos["removidos"],
+    }
+
+
+def sync_hosts(cliente_id: int):
+    print(f"Iniciando sincronização de hosts para cliente_id={cliente_id}")
+    client = get_client_for_cliente(cliente_id)
+
+    hosts = client.host_get(
+        output=["hostid", "host", "name", "status"],
+        selectGroups=["groupid", "name"]
+    )
 
-        # 🔥 Atualiza relação M2M (substitui completamente)
-        host_obj.groups.set(grupos_relacionados)
\ No newline at end of file
+    # 🔥 hosts, grupos e relação M2M em lote
+    return upsert_hosts_payload(cliente_id, hosts)
@@ -1,107 +1,153 @@
-from django.utils import timezone
 from zabbix_integration.models import ZabbixItem, ZabbixHost
 from zabbix_integration.services.sync import get_client_for_cliente
-from .utils import dt_from_epoch
+from .chunk_executor import run_chunks_concurrently
+from .change_detection import split_changed, update_changed
+from .raw_storage import apply_raw_policy
+from .utils import chunked, dt_from_epoch, row_hash
+
+
+BATCH_HOSTS = 200
+
+ITEM_OUTPUT = [
+    "itemid",
+    "hostid",
+    "name",
+    "key_",
+    "value_type",
+    "units",
+    "delay",
+    "lastvalue",
+    "lastclock",
+    "status",
+]
+
+ITEM_UPDATE_FIELDS = ["host", "name", "key", "value_type", "units", "delay", "enabled", "raw"]
+
+# último valor muda a cada coleta: fora do row_hash, gravado num UPDATE estreito só quando mudou
+ITEM_VALUE_FIELDS = ["lastvalue", "lastclock"]
+
+
+def _item_row(cliente_id: int, host_id: int, it: dict) -> ZabbixItem:
+    row = ZabbixItem(
+        cliente_id=cliente_id,
+        itemid=str(it["itemid"]),
+        host_id=host_id,
+        name=it.get("name"),
+        key=it.get("key_"),
+        value_type=int(it.get("value_type") or 0),
+        units=it.get("units"),
+        delay=it.get("delay"),
+        lastvalue=it.get("lastvalue"),
+        lastclock=dt_from_epoch(it.get("lastclock")),
+        enabled=(it.get("status") == "0"),
+        raw=it,
+    )
+    row.row_hash = row_hash(
+        host_id,
+        row.name,
+        row.key,
+        row.value_type,
+        row.units,
+        row.delay,
+        row.enabled,
+    )
+    return row
+
+
+def _prefetch_items(cliente_id: int, itemids: list[str], batch_size: int = 1000) -> dict:
+    """
+    {itemid: (pk, row_hash, lastvalue, lastclock)} dos itens já gravados.
+    """
+    qs = ZabbixItem.objects.filter(cliente_id=cliente_id)
+
+    atuais = {}
+    for lote in chunked(itemids, batch_size):
+        atuais.update(
+            (itemid, (pk, h, lastvalue, lastclock))
+            for itemid, pk, h, lastvalue, lastclock in qs.filter(itemid__in=lote).values_list(
+                "itemid", "id", "row_hash", "lastvalue", "lastclock"
+            )
+        )
+    return atuais
 
 
-PAGE_SIZE = 2000
+def _valores_alterados(rows: list, atuais: dict) -> list:
+    # configuração igual (row_hash), mas lastvalue/lastclock diferente do gravado
+    mudaram = []
+    for r in rows:
+        atual = atuais.get(r.itemid)
+        if atual and atual[1] == r.row_hash and atual[2:] != (r.lastvalue, r.lastclock):
+            r.pk = atual[0]
+            mudaram.append(r)
+    return mudaram
 
 
-def sync_items_enterprise(cliente_id: int):
+def sync_items_enterprise(cliente_id: int, concurrency: int | None = None):
 
     client = get_client_for_cliente(cliente_id)
 
-    last_itemid = 0
-    total_processed = 0
+    totais = {"processados": 0, "novos": 0, "alterados": 0, "inalterados": 0, "valores": 0}
 
-    host_map = {
-        h.hostid: h
-        for h in ZabbixHost.objects.filter(cliente_id=cliente_id)
-    }
+    # hostid -> pk local
+    host_map = dict(
+        ZabbixHost.objects
+        .filter(cliente_id=cliente_id)
+        .values_list("hostid", "id")
+    )
 
-    while True:
-
-        items = client.item_get(
-            output=[
-                "itemid",
-                "hostid",
-                "name",
-                "key_",
-                "value_type",
-                "units",
-                "delay",
-                "lastvalue",
-                "lastclock",
-                "status",
-            ],
+    # 🔥 item.get por blocos de hosts, vários blocos em paralelo
+    async def fetch(aclient, host_chunk):
+        return await aclient.item_get(
+            output=ITEM_OUTPUT,
+            hostids=host_chunk,
             sortfield="itemid",
             sortorder="ASC",
-            filter={"itemid": f">{last_itemid}"},
-            limit=PAGE_SIZE,
         )
 
+    def handle(host_chunk, items):
         if not items:
-            break
-
-        itemids = [str(it["itemid"]) for it in items]
-
-        existing = {
-            obj.itemid: obj
-            for obj in ZabbixItem.objects.filter(
-                cliente_id=cliente_id,
-                itemid__in=itemids
-            )
-        }
-
-        to_create = []
-        to_update = []
-
-        for it in items:
-
-            itemid = str(it["itemid"])
-            host = host_map.get(str(it["hostid"]))
-
-            if not host:
-                continue
-
-            if itemid in existing:
-                obj = existing[itemid]
-                obj.name = it.get("name")
-                obj.lastvalue = it.get("lastvalue")
-                obj.lastclock = dt_from_epoch(it.get("lastclock"))
-                obj.enabled = (it.get("status") == "0")
-                to_update.append(obj)
-            else:
-                to_create.append(
-                    ZabbixItem(
-                        cliente_id=cliente_id,
-                        itemid=itemid,
-                        host=host,
-                        name=it.get("name"),
-                        key=it.get("key_"),
-                        value_type=int(it.get("value_type") or 0),
-                        units=it.get("units"),
-                        delay=it.get("delay"),
-                        lastvalue=it.get("lastvalue"),
-                        lastclock=dt_from_epoch(it.get("lastclock")),
-                        enabled=(it.get("status") == "0"),
-                        raw=it,
-                    )
-                )
-
-        if to_create:
-            ZabbixItem.objects.bulk_create(to_create, batch_size=1000)
-
-        if to_update:
-            ZabbixItem.objects.bulk_update(
-                to_update,
-                ["name", "lastvalue", "lastclock", "enabled"],
-                batch_size=1000
-            )
-
-        last_itemid = int(items[-1]["itemid"])
-        total_processed += len(items)
-
-        print(f"Processados até itemid {last_itemid} | total {total_processed}")
-
-    return {"total_items_processados": total_processed}
\ No newline at end of file
+            return
+
+        rows = [
+            _item_row(cliente_id, host_map[str(it["hostid"])], it)
+            for it in items
+            if str(it["hostid"]) in host_map
+        ]
+
+        # 🔎 hash da configuração de cada item comparado em memória com o gravado: só o que mudou é escrito
+        atuais = _prefetch_items(cliente_id, [r.itemid for r in rows])
+        novos, alterados, inalterados = split_changed(rows, "itemid", atuais)
+        valores = _valores_alterados(rows, atuais)
+
+        if novos:
+            apply_raw_policy(ZabbixItem, novos)
+            ZabbixItem.objects.bulk_create(novos, batch_size=1000)
+
+        update_changed(ZabbixItem, alterados, ITEM_UPDATE_FIELDS + ITEM_VALUE_FIELDS)
+
+        if valores:
+            ZabbixItem.objects.bulk_update(valores, ITEM_VALUE_FIELDS, batch_size=1000)
+
+        totais["processados"] += len(items)
+        totais["novos"] += len(novos)
+        totais["alterados"] += len(alterados)
+        totais["inalterados"] += inalterados
+        totais["valores"] += len(valores)
+
+        print(f"Itens processados até agora: {totais['processados']}")
+
+    run_chunks_concurrently(
+        client,
+        chunked(list(host_map.keys()), BATCH_HOSTS),
+        fetch,
+        handle,
+        concurrency=concurrency,
+    )
+
+    return {
+        "total_items_processados": totais["processados"],
+        "novos": totais["novos"],
+        "alterados": totais["alterados"],
+        "inalterados": totais["inalterados"],
+        "valores_atualizados": totais["valores"],
+    }
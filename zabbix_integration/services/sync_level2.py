@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta, timezone
 from django.db import transaction
 
-from zabbix_integration.models import ZabbixHost, ZabbixItem, ZabbixHistory, ZabbixEvent, ZabbixTrigger
+from zabbix_integration.models import ZabbixHost, ZabbixItem, ZabbixEvent, ZabbixTrigger
+from zabbix_integration.services.history_ingest import ingest_history
 from zabbix_integration.services.sync import get_client_for_cliente
 from typing import Any
 
@@ -191,59 +192,13 @@ def sync_events(
         "filtros_aplicados": filtros or {},
     }
 
-@transaction.atomic
 def sync_history(cliente_id: int, itemids: list[str], time_from: datetime, time_till: datetime):
     """
     Sincroniza histórico (history.get) para uma lista de itemids em uma janela.
     OBS: history.get precisa do tipo (history=0/3/1/2/4) baseado em value_type.
+
+    Fatiado por tempo e por blocos de itens, gravado via COPY (ver history_ingest).
     """
     client = get_client_for_cliente(cliente_id)
 
-    items = list(ZabbixItem.objects.filter(cliente_id=cliente_id, itemid__in=itemids).select_related("host"))
-
-    if not items:
-        return
-
-    # agrupamento por value_type (porque history.get exige o 'history' correto)
-    by_type: dict[int, list[ZabbixItem]] = {}
-    for it in items:
-        by_type.setdefault(it.value_type, []).append(it)
-
-    tf = int(time_from.replace(tzinfo=timezone.utc).timestamp())
-    tt = int(time_till.replace(tzinfo=timezone.utc).timestamp())
-
-    for value_type, typed_items in by_type.items():
-        ids = [it.itemid for it in typed_items]
-
-        rows = client.history_get(
-            output="extend",
-            history=value_type,  # 0 float, 1 char, 2 log, 3 uint, 4 text
-            itemids=ids,
-            time_from=tf,
-            time_till=tt,
-            sortfield="clock",
-            sortorder="ASC",
-            limit=50000,
-        )
-
-        # Mapa itemid -> item local
-        local_item_map = {it.itemid: it for it in typed_items}
-
-        # Bulk insert ignorando duplicados (mais rápido)
-        to_create = []
-        for r in rows:
-            item = local_item_map.get(r["itemid"])
-            if not item:
-                continue
-            to_create.append(
-                ZabbixHistory(
-                    cliente_id=cliente_id,
-                    item=item,
-                    clock=_dt_from_epoch(r["clock"]),
-                    value=r.get("value"),
-                )
-            )
-
-        # evita crash se vier muito grande (você pode chunkar depois)
-        if to_create:
-            ZabbixHistory.objects.bulk_create(to_create, ignore_conflicts=True, batch_size=2000)
+    return ingest_history(client, cliente_id, itemids, time_from, time_till)
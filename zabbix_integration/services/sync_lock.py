@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from zabbix_integration.models import ZabbixSyncControl
+from .sync_control import get_or_create_control
+
+
+DEFAULT_LEASE_SECONDS = 3600
+
+# namespace do advisory lock de sync (1º inteiro de pg_try_advisory_lock). Um lock por
+# cliente para full e incremental: os dois gravam eventos/incidentes do mesmo cliente
+LOCK_NAMESPACE = 7101
+
+
+def get_lease_seconds() -> int:
+    return getattr(settings, "ZABBIX_SYNC_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+
+
+@contextmanager
+def tenant_sync_lock(cliente_id: int):
+    """
+    Lock exclusivo por cliente (qualquer tipo de sync). Não bloqueia: entrega True se
+    conseguiu o lock, False se outra execução (full ou incremental) já está rodando.
+
+    Postgres: pg_try_advisory_lock na sessão (liberado no fim ou se o worker
+    cair, junto com a conexão). Outros bancos: lease no cache com expiração.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", [LOCK_NAMESPACE, int(cliente_id)])
+            adquirido = cursor.fetchone()[0]
+        try:
+            yield adquirido
+        finally:
+            if adquirido:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s, %s)", [LOCK_NAMESPACE, int(cliente_id)])
+        return
+
+    chave = f"zabbix-sync-lock:{cliente_id}"
+    adquirido = cache.add(chave, 1, timeout=get_lease_seconds())
+    try:
+        yield adquirido
+    finally:
+        if adquirido:
+            cache.delete(chave)
+
+
+def claim_enqueue(cliente_id: int, kind: str) -> bool:
+    """
+    Marca o cliente como "na fila" para este tipo de sync (UPDATE atômico).
+
+    Retorna False se já existe uma execução enfileirada/rodando e ainda dentro
+    do lease — o enfileiramento é descartado e contado em runs_coalesced.
+    """
+    control = get_or_create_control(cliente_id)
+    campo = f"{kind}_queued_at"
+    agora = timezone.now()
+    expirado = agora - timedelta(seconds=get_lease_seconds())
+
+    marcado = (
+        ZabbixSyncControl.objects
+        .filter(pk=control.pk)
+        .filter(Q(**{f"{campo}__isnull": True}) | Q(**{f"{campo}__lt": expirado}))
+        .update(**{campo: agora})
+    )
+
+    if not marcado:
+        ZabbixSyncControl.objects.filter(pk=control.pk).update(runs_coalesced=F("runs_coalesced") + 1)
+
+    return bool(marcado)
+
+
+def release_enqueue(cliente_id: int, kind: str):
+    ZabbixSyncControl.objects.filter(cliente_id=cliente_id).update(**{f"{kind}_queued_at": None})
+
+
+def record_skipped(cliente_id: int):
+    ZabbixSyncControl.objects.filter(cliente_id=cliente_id).update(runs_skipped=F("runs_skipped") + 1)
+
+
+def run_with_tenant_lock(cliente_id: int, func) -> dict:
+    """
+    Executa func(cliente_id) sob o lock do cliente; se o lock estiver ocupado
+    a execução é pulada (sem erro, para não disparar retry) e contada.
+    """
+    with tenant_sync_lock(cliente_id) as adquirido:
+        if not adquirido:
+            record_skipped(cliente_id)
+            return {"cliente_id": cliente_id, "status": "skipped"}
+
+        func(cliente_id)
+
+    return {"cliente_id": cliente_id, "status": "success"}
+
+
+def sync_lock_metrics() -> list[dict]:
+    return list(
+        ZabbixSyncControl.objects
+        .order_by("cliente_id")
+        .values(
+            "cliente_id",
+            "last_full_sync",
+            "last_incremental_sync",
+            "full_queued_at",
+            "incremental_queued_at",
+            "runs_skipped",
+            "runs_coalesced",
+        )
+    )
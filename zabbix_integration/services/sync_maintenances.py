@@ -0,0 +1,60 @@
+from django.db import transaction
+
+from zabbix_integration.models import ZabbixMaintenance
+from .bulk import bulk_upsert
+from .sync import get_client_for_cliente
+from .utils import dt_from_epoch
+
+
+MAINTENANCE_UPDATE_FIELDS = [
+    "name", "active_since", "active_till", "hostids", "groupids", "periods", "raw", "atualizado_em",
+]
+
+
+def sync_maintenances(cliente_id: int) -> dict:
+    """
+    Sincroniza as manutenções (maintenance.get) com hosts, grupos e timeperiods.
+    Manutenções removidas no Zabbix são apagadas localmente.
+    """
+    client = get_client_for_cliente(cliente_id)
+
+    maintenances = client.maintenance_get(
+        output=["maintenanceid", "name", "active_since", "active_till", "maintenance_type"],
+        selectHosts=["hostid"],
+        selectHostGroups=["groupid"],
+        selectTimeperiods="extend",
+    ) or []
+
+    rows = [
+        ZabbixMaintenance(
+            cliente_id=cliente_id,
+            maintenanceid=str(m["maintenanceid"]),
+            name=m.get("name"),
+            active_since=dt_from_epoch(m.get("active_since")),
+            active_till=dt_from_epoch(m.get("active_till")),
+            hostids=[str(h["hostid"]) for h in m.get("hosts") or []],
+            # Zabbix < 6.2 devolve "groups"
+            groupids=[str(g["groupid"]) for g in m.get("hostgroups") or m.get("groups") or []],
+            periods=m.get("timeperiods") or [],
+            raw=m,
+        )
+        for m in maintenances
+    ]
+
+    with transaction.atomic():
+        bulk_upsert(
+            ZabbixMaintenance,
+            rows,
+            unique_fields=["cliente", "maintenanceid"],
+            update_fields=MAINTENANCE_UPDATE_FIELDS,
+        )
+
+        removidas, _ = ZabbixMaintenance.objects.filter(cliente_id=cliente_id).exclude(
+            maintenanceid__in=[r.maintenanceid for r in rows]
+        ).delete()
+
+    return {
+        "cliente_id": cliente_id,
+        "manutencoes": len(rows),
+        "removidas": removidas,
+    }
@@ -1,17 +1,29 @@
 from zabbix_integration.models import ZabbixTrigger, ZabbixItem
 from zabbix_integration.services.sync import get_client_for_cliente
-from .utils import dt_from_epoch
+from .bulk import bulk_upsert, sync_m2m
+from .change_detection import prefetch_row_hashes, split_changed, update_changed
+from .chunk_executor import run_chunks_concurrently
+from .utils import chunked, dt_from_epoch, row_hash
 
 
-PAGE_SIZE = 1000
-
-
-from .utils import chunked, dt_from_epoch
-
 BATCH_ITEMS = 200
 
+TRIGGER_UPDATE_FIELDS = [
+    "name",
+    "description",
+    "expression",
+    "priority",
+    "severity",
+    "value",
+    "enabled",
+    "status",
+    "lastchange",
+    "raw",
+    "row_hash",
+]
+
 
-def sync_triggers_enterprise(cliente_id: int):
+def sync_triggers_enterprise(cliente_id: int, concurrency: int | None = None):
 
     print(f"Iniciando sincronização de triggers para cliente {cliente_id}")
 
@@ -24,10 +36,12 @@ def sync_triggers_enterprise(cliente_id: int):
     )
 
     total_processed = 0
+    links = {"adicionados": 0, "removidos": 0}
+    contagem = {"novos": 0, "alterados": 0, "inalterados": 0}
 
-    for item_chunk in chunked(itemids, BATCH_ITEMS):
-
-        triggers = client.trigger_get(
+    # 🔥 trigger.get por blocos de itens, vários blocos em paralelo
+    async def fetch(aclient, item_chunk):
+        return await aclient.trigger_get(
             output=[
                 "triggerid",
                 "description",
@@ -41,58 +55,108 @@ def sync_triggers_enterprise(cliente_id: int):
             itemids=item_chunk,   # 🔥 FILTRA POR ITEM
         )
 
-        if not triggers:
-            continue
+    def handle(item_chunk, triggers):
+        nonlocal total_processed
 
-        triggerids = [str(t["triggerid"]) for t in triggers]
+        if not triggers:
+            return
 
-        existing = {
-            t.triggerid: t
-            for t in ZabbixTrigger.objects.filter(
+        rows = []
+        for trg in triggers:
+            row = ZabbixTrigger(
                 cliente_id=cliente_id,
-                triggerid__in=triggerids
+                triggerid=str(trg["triggerid"]),
+                name=trg.get("description"),
+                description=trg.get("description"),
+                expression=trg.get("expression"),
+                priority=int(trg.get("priority") or 0),
+                severity=int(trg.get("priority") or 0),
+                value=int(trg.get("value") or 0),
+                enabled=(trg.get("status") == "0"),
+                status=(trg.get("status") == "0"),
+                lastchange=dt_from_epoch(trg.get("lastchange")),
+                raw=trg,
             )
-        }
-
-        item_map = {
-            i.itemid: i
-            for i in ZabbixItem.objects.filter(
-                cliente_id=cliente_id,
-                itemid__in=item_chunk
+            row.row_hash = row_hash(
+                row.description,
+                row.expression,
+                row.priority,
+                row.value,
+                row.enabled,
+                trg.get("lastchange"),
+                sorted(str(i["itemid"]) for i in trg.get("items") or []),
             )
-        }
+            rows.append(row)
 
-        for trg in triggers:
+        # 🔎 só triggers novas ou com hash diferente do gravado vão para o banco
+        novos, alterados, inalterados = split_changed(
+            rows,
+            "triggerid",
+            prefetch_row_hashes(ZabbixTrigger, cliente_id, "triggerid", [r.triggerid for r in rows]),
+        )
 
-            triggerid = str(trg["triggerid"])
+        bulk_upsert(
+            ZabbixTrigger,
+            novos,
+            unique_fields=["cliente", "triggerid"],
+            update_fields=TRIGGER_UPDATE_FIELDS,
+        )
+        update_changed(ZabbixTrigger, alterados, [f for f in TRIGGER_UPDATE_FIELDS if f != "row_hash"])
 
-            trigger_obj, _ = ZabbixTrigger.objects.update_or_create(
-                cliente_id=cliente_id,
-                triggerid=triggerid,
-                defaults={
-                    "name": trg.get("description"),
-                    "description": trg.get("description"),
-                    "expression": trg.get("expression"),
-                    "priority": int(trg.get("priority") or 0),
-                    "severity": int(trg.get("priority") or 0),
-                    "value": int(trg.get("value") or 0),
-                    "enabled": (trg.get("status") == "0"),
-                    "status": (trg.get("status") == "0"),
-                    "lastchange": dt_from_epoch(trg.get("lastchange")),
-                    "raw": trg,
-                }
-            )
+        contagem["novos"] += len(novos)
+        contagem["alterados"] += len(alterados)
+        contagem["inalterados"] += inalterados
+
+        trigger_pks = dict(
+            ZabbixTrigger.objects
+            .filter(cliente_id=cliente_id, triggerid__in=[r.triggerid for r in rows])
+            .values_list("triggerid", "id")
+        )
 
-            # limpa relações antigas
-            trigger_obj.items.clear()
+        # selectItems traz TODOS os itens da trigger (inclusive fora deste chunk)
+        payload_itemids = {
+            str(item_data["itemid"])
+            for trg in triggers
+            for item_data in trg.get("items") or []
+        }
+        item_pks = dict(
+            ZabbixItem.objects
+            .filter(cliente_id=cliente_id, itemid__in=list(payload_itemids))
+            .values_list("itemid", "id")
+        )
+
+        # 🔥 só a diferença vai para a tabela intermediária
+        desired = {
+            trigger_pks[str(trg["triggerid"])]: {
+                item_pks[str(item_data["itemid"])]
+                for item_data in trg.get("items") or []
+                if str(item_data["itemid"]) in item_pks
+            }
+            for trg in triggers
+            if str(trg["triggerid"]) in trigger_pks
+        }
 
-            for item_data in trg.get("items", []):
-                local_item = item_map.get(str(item_data["itemid"]))
-                if local_item:
-                    trigger_obj.items.add(local_item)
+        vinculos = sync_m2m(ZabbixTrigger.items, desired)
+        links["adicionados"] += vinculos["adicionados"]
+        links["removidos"] += vinculos["removidos"]
 
-            total_processed += 1
+        total_processed += len(rows)
 
         print(f"Triggers processadas até agora: {total_processed}")
 
-    return {"total_triggers_processadas": total_processed}
\ No newline at end of file
+    run_chunks_concurrently(
+        client,
+        chunked(itemids, BATCH_ITEMS),
+        fetch,
+        handle,
+        concurrency=concurrency,
+    )
+
+    return {
+        "total_triggers_processadas": total_processed,
+        "vinculos_adicionados": links["adicionados"],
+        "vinculos_removidos": links["removidos"],
+        "novos": contagem["novos"],
+        "alterados": contagem["alterados"],
+        "inalterados": contagem["inalterados"],
+    }
@@ -1,5 +1,8 @@
+import json
 from datetime import datetime, timezone
 
+import xxhash
+
 
 def dt_from_epoch(epoch):
     if not epoch:
@@ -9,4 +12,20 @@ def dt_from_epoch(epoch):
 
 def chunked(lst, size):
     for i in range(0, len(lst), size):
-        yield lst[i:i + size]
\ No newline at end of file
+        yield lst[i:i + size]
+
+
+def content_hash(dados) -> str:
+    """
+    Hash estável de um dict/list (JSON canônico: chaves ordenadas, sem espaços).
+    """
+    payload = json.dumps(dados, sort_keys=True, separators=(",", ":"), default=str)
+    return xxhash.xxh3_128_hexdigest(payload.encode("utf-8"))
+
+
+def row_hash(*values) -> str:
+    """
+    Hash compacto (xxh3-64, 16 hex) de uma sequência de valores normalizados.
+    """
+    payload = json.dumps(values, separators=(",", ":"), default=str)
+    return xxhash.xxh3_64_hexdigest(payload.encode("utf-8"))
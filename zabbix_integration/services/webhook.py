@@ -0,0 +1,397 @@
+import hmac
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from zabbix_integration.models import ZabbixAlarm, ZabbixConnection, ZabbixEvent, ZabbixHost, ZabbixWebhookEvent
+from .bulk import bulk_upsert
+from .incidents import apply_events_to_incidents
+from .raw_storage import apply_raw_policy
+from .sync_events import _event_rows, _eventid_ref, _trigger_hosts, _trigger_pks
+from .sync_lock import tenant_sync_lock
+
+
+DEFAULT_FLUSH_BATCH = 1000
+DEFAULT_FLUSH_DELAY_SECONDS = 5
+DEFAULT_RECONCILE_SECONDS = 3600
+DEFAULT_STALE_SECONDS = 900
+
+# ultimo_webhook_em é gravado no máximo uma vez por intervalo (não um UPDATE por requisição)
+LAST_SEEN_THROTTLE_SECONDS = 60
+
+FLUSH_PENDING_KEY = "zabbix-webhook-flush-pendente"
+# marca do debounce expira sozinha se a task agendada se perder (o beat cobre o resto)
+FLUSH_PENDING_TTL_SECONDS = 60
+
+# {EVENT.SEVERITY} vem por nome; {EVENT.NSEVERITY} / {TRIGGER.NSEVERITY} vem numérico
+SEVERITY_NAMES = {
+    "not classified": 0,
+    "information": 1,
+    "warning": 2,
+    "average": 3,
+    "high": 4,
+    "disaster": 5,
+}
+
+# payload do webhook é enxuto: num evento já gravado pelo polling só atualiza o estado,
+# sem apagar c_eventid/opdata nem trocar raw, trigger e host pelos do webhook.
+# (ZabbixEvent não tem r_clock: a hora da recuperação é o clock do evento de recuperação)
+WEBHOOK_EVENT_UPDATE_FIELDS = ["value", "r_eventid", "acknowledged", "severity", "name"]
+
+ALARM_UPDATE_FIELDS = ["name", "severity", "acknowledged", "clock", "hostid", "hostname", "raw", "atualizado_em"]
+
+
+class WebhookPayloadError(ValueError):
+    pass
+
+
+def get_flush_delay() -> int:
+    return getattr(settings, "ZABBIX_WEBHOOK_FLUSH_DELAY_SECONDS", DEFAULT_FLUSH_DELAY_SECONDS)
+
+
+def webhook_tenants(cliente_ids) -> set[int]:
+    """
+    Clientes com webhook configurado que receberam evento recentemente
+    (ZABBIX_WEBHOOK_STALE_SECONDS). Para eles o incremental é só reconciliação.
+    """
+    limite = timezone.now() - timedelta(seconds=getattr(settings, "ZABBIX_WEBHOOK_STALE_SECONDS", DEFAULT_STALE_SECONDS))
+    return set(
+        ZabbixConnection.objects
+        .filter(cliente_id__in=list(cliente_ids), ultimo_webhook_em__gte=limite)
+        .exclude(webhook_token__isnull=True)
+        .exclude(webhook_token="")
+        .values_list("cliente_id", flat=True)
+    )
+
+
+# -------------------------------------------------------
+# 🔐 Recepção
+# -------------------------------------------------------
+
+def token_from_request(request) -> str | None:
+    auth = request.headers.get("Authorization") or ""
+    if auth.lower().startswith("bearer "):
+        return auth[7:].strip()
+    return request.headers.get("X-Zabbix-Token")
+
+
+def authenticate_webhook(cliente_id: int, token: str | None) -> ZabbixConnection | None:
+    conn = (
+        ZabbixConnection.objects
+        .filter(cliente_id=cliente_id, ativo=True)
+        .only("id", "cliente_id", "webhook_token", "ultimo_webhook_em")
+        .first()
+    )
+    if not conn or not conn.webhook_token or not token:
+        return None
+    if not hmac.compare_digest(conn.webhook_token.encode(), token.encode()):
+        return None
+    return conn
+
+
+def _macro(value):
+    # macro não resolvida pelo Zabbix chega literal ("{EVENT.RECOVERY.ID}")
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value or (value.startswith("{") and value.endswith("}")):
+        return None
+    return value
+
+
+def _epoch(ev: dict, clock_key: str, date_key: str, time_key: str) -> int | None:
+    clock = _macro(ev.get(clock_key))
+    if clock:
+        return int(clock)
+
+    data, hora = _macro(ev.get(date_key)), _macro(ev.get(time_key))
+    if not data or not hora:
+        return None
+
+    # {EVENT.DATE} {EVENT.TIME}: "2026.10.18" "14:25:03", no fuso do Zabbix
+    tz = ZoneInfo(getattr(settings, "ZABBIX_WEBHOOK_TIME_ZONE", settings.TIME_ZONE))
+    dt = datetime.strptime(f"{data} {hora}", "%Y.%m.%d %H:%M:%S").replace(tzinfo=tz)
+    return int(dt.timestamp())
+
+
+def _severity(value) -> int:
+    value = _macro(value)
+    if value is None:
+        return 0
+    if value.isdigit():
+        return int(value)
+    return SEVERITY_NAMES.get(value.lower(), 0)
+
+
+def _acknowledged(value) -> bool:
+    return (_macro(value) or "").lower() in ("1", "yes", "sim", "true")
+
+
+def normalize_webhook_event(ev: dict) -> dict:
+    """
+    Payload do media type -> formato gravado no buffer.
+
+    Campos: eventid, value (1 problema / 0 recuperação), triggerid, recovery_eventid,
+    clock ou date/time, recovery_clock ou recovery_date/recovery_time,
+    severity, name, hostid, hostname, acknowledged.
+    """
+    if not isinstance(ev, dict):
+        raise WebhookPayloadError("cada evento deve ser um objeto")
+
+    eventid = _macro(ev.get("eventid"))
+    if not eventid or not eventid.isdigit():
+        raise WebhookPayloadError("eventid é obrigatório e numérico")
+
+    value = _macro(ev.get("value"))
+    if value not in ("0", "1"):
+        raise WebhookPayloadError(f"evento {eventid}: value deve ser 1 (problema) ou 0 (recuperação)")
+
+    triggerid = _macro(ev.get("triggerid"))
+    if not triggerid:
+        raise WebhookPayloadError(f"evento {eventid}: triggerid é obrigatório")
+
+    r_eventid = _eventid_ref(_macro(ev.get("recovery_eventid")))
+    if value == "0" and not r_eventid:
+        raise WebhookPayloadError(f"evento {eventid}: recovery_eventid é obrigatório na recuperação")
+
+    try:
+        clock = _epoch(ev, "clock", "date", "time")
+        r_clock = _epoch(ev, "recovery_clock", "recovery_date", "recovery_time")
+    except ValueError:
+        raise WebhookPayloadError(f"evento {eventid}: data/hora inválida")
+
+    return {
+        "eventid": eventid,
+        "value": int(value),
+        "triggerid": triggerid,
+        "r_eventid": r_eventid if value == "0" else None,
+        "clock": clock,
+        "r_clock": r_clock,
+        "severity": _severity(ev.get("severity")),
+        "name": (_macro(ev.get("name")) or "")[:255],
+        "hostid": _macro(ev.get("hostid")),
+        "hostname": _macro(ev.get("hostname")),
+        "acknowledged": _acknowledged(ev.get("acknowledged")),
+    }
+
+
+def enqueue_webhook_events(conn: ZabbixConnection, data) -> int:
+    """
+    Valida e grava os eventos no buffer (ZabbixWebhookEvent). Aceita um objeto ou lista.
+    A gravação em ZabbixEvent/ZabbixAlarm fica para o flush em lote.
+    """
+    eventos = data if isinstance(data, list) else [data]
+    if not eventos:
+        raise WebhookPayloadError("nenhum evento recebido")
+
+    agora = int(timezone.now().timestamp())
+    rows = []
+    for ev in eventos:
+        payload = normalize_webhook_event(ev)
+        # sem data no payload: o evento notificado (problema ou recuperação) vale pela hora de chegada
+        if payload["value"] == 1 and payload["clock"] is None:
+            payload["clock"] = agora
+        if payload["value"] == 0 and payload["r_clock"] is None:
+            payload["r_clock"] = agora
+        rows.append(ZabbixWebhookEvent(cliente_id=conn.cliente_id, payload=payload))
+
+    ZabbixWebhookEvent.objects.bulk_create(rows)
+
+    ZabbixConnection.objects.filter(pk=conn.pk).filter(
+        Q(ultimo_webhook_em__isnull=True)
+        | Q(ultimo_webhook_em__lt=timezone.now() - timedelta(seconds=LAST_SEEN_THROTTLE_SECONDS))
+    ).update(ultimo_webhook_em=timezone.now())
+
+    return len(rows)
+
+
+def claim_flush() -> bool:
+    """
+    Debounce do flush: só a primeira requisição da janela agenda a task.
+    Chamar depois do commit do buffer (a task libera a marca antes de ler).
+    """
+    return cache.add(FLUSH_PENDING_KEY, 1, timeout=get_flush_delay() + FLUSH_PENDING_TTL_SECONDS)
+
+
+# -------------------------------------------------------
+# 💾 Flush do buffer
+# -------------------------------------------------------
+
+def _event_dicts(payloads: list[dict]) -> list[dict]:
+    """
+    Payloads do buffer -> eventos no formato do event.get (para _event_rows).
+    Recuperação gera o evento de recuperação e, se a data do problema veio,
+    o problema já com r_eventid (abre e fecha o incidente mesmo sem o webhook do problema).
+    """
+    eventos = {}
+    for p in payloads:
+        base = {
+            "objectid": p["triggerid"],
+            "severity": p["severity"],
+            "name": p["name"],
+            "acknowledged": int(p["acknowledged"]),
+        }
+
+        if p["clock"] is not None:
+            eventos[p["eventid"]] = {
+                **base,
+                "eventid": p["eventid"],
+                "value": 1,
+                "clock": p["clock"],
+                "r_eventid": p["r_eventid"],
+            }
+
+        if p["value"] == 0:
+            eventos[p["r_eventid"]] = {
+                **base,
+                "eventid": p["r_eventid"],
+                "value": 0,
+                "clock": p["r_clock"],
+            }
+
+    return list(eventos.values())
+
+
+def _merge(anterior: dict | None, novo: dict) -> dict:
+    # mesmo evento repetido no lote: vale o último recebido, sem perder a data
+    # do problema nem uma recuperação já vista
+    if not anterior:
+        return novo
+    merged = {**anterior, **{k: v for k, v in novo.items() if v is not None}}
+    if anterior["value"] == 0:
+        merged.update(value=0, r_eventid=anterior["r_eventid"], r_clock=anterior["r_clock"])
+    return merged
+
+
+def _flush_cliente(cliente_id: int, payloads: list[dict]) -> dict:
+    eventos = _event_dicts(payloads)
+
+    trigger_pks = _trigger_pks(cliente_id, {e["objectid"] for e in eventos if e["objectid"]})
+    rows = _event_rows(cliente_id, eventos, trigger_pks, _trigger_hosts(cliente_id, list(trigger_pks.values())))
+
+    # trigger ainda não sincronizada: host pelo que veio no payload
+    host_payload = {p["eventid"]: (p["hostid"], p["hostname"]) for p in payloads}
+    host_payload.update({p["r_eventid"]: (p["hostid"], p["hostname"]) for p in payloads if p["r_eventid"]})
+    sem_host = [r for r in rows if r.host_id is None and host_payload.get(r.eventid, (None,))[0]]
+    if sem_host:
+        host_pks = dict(
+            ZabbixHost.objects
+            .filter(cliente_id=cliente_id, hostid__in={host_payload[r.eventid][0] for r in sem_host})
+            .values_list("hostid", "id")
+        )
+        for r in sem_host:
+            r.hostid, r.hostname = host_payload[r.eventid]
+            r.host_id = host_pks.get(r.hostid)
+
+    # atualização tardia de um problema já resolvido (ex.: ack) não apaga o r_eventid gravado
+    ja_resolvidos = dict(
+        ZabbixEvent.objects
+        .filter(
+            cliente_id=cliente_id,
+            eventid__in=[r.eventid for r in rows if r.value == 1 and not r.r_eventid],
+            r_eventid__isnull=False,
+        )
+        .values_list("eventid", "r_eventid")
+    )
+    for r in rows:
+        if r.eventid in ja_resolvidos:
+            r.r_eventid = ja_resolvidos[r.eventid]
+
+    # raw conforme ZABBIX_RAW_STORAGE só vale para linhas novas (raw fica fora do update);
+    # a política esvazia raw, e o alarme precisa do payload original
+    raw_por_evento = {r.eventid: r.raw for r in rows}
+    apply_raw_policy(ZabbixEvent, rows)
+
+    bulk_upsert(ZabbixEvent, rows, unique_fields=["cliente", "eventid"], update_fields=WEBHOOK_EVENT_UPDATE_FIELDS)
+    incidentes = apply_events_to_incidents(cliente_id, rows)
+
+    # ZabbixAlarm = problemas ativos: entra no problema, sai na recuperação
+    problemas = [r for r in rows if r.value == 1 and not r.r_eventid]
+    resolvidos = [p["eventid"] for p in payloads if p["value"] == 0]
+
+    bulk_upsert(
+        ZabbixAlarm,
+        [
+            ZabbixAlarm(
+                cliente_id=cliente_id,
+                eventid=r.eventid,
+                name=r.name or "",
+                severity=r.severity,
+                acknowledged=r.acknowledged,
+                clock=r.clock,
+                hostid=r.hostid,
+                hostname=r.hostname,
+                raw=raw_por_evento[r.eventid],
+            )
+            for r in problemas
+        ],
+        unique_fields=["cliente", "eventid"],
+        update_fields=ALARM_UPDATE_FIELDS,
+    )
+    if resolvidos:
+        ZabbixAlarm.objects.filter(cliente_id=cliente_id, eventid__in=resolvidos).delete()
+
+    return {"eventos": len(rows), "recuperacoes": len(resolvidos), **incidentes}
+
+
+def flush_webhook_events(batch_size: int | None = None) -> dict:
+    """
+    Grava o buffer do webhook em ZabbixEvent/ZabbixAlarm/ZabbixIncident, em lotes
+    por ordem de chegada. Cada lote é gravado e removido do buffer na mesma transação;
+    SKIP LOCKED deixa dois flushes simultâneos pegarem lotes diferentes.
+
+    Cada cliente é gravado sob o tenant_sync_lock (o mesmo do sync): se um sync do
+    cliente estiver rodando, os eventos dele ficam no buffer para o próximo flush.
+    """
+    batch_size = batch_size or getattr(settings, "ZABBIX_WEBHOOK_FLUSH_BATCH", DEFAULT_FLUSH_BATCH)
+
+    # libera o debounce antes de ler: o que chegar daqui em diante agenda outro flush
+    cache.delete(FLUSH_PENDING_KEY)
+
+    total = {"recebidos": 0, "eventos": 0, "recuperacoes": 0, "abertos": 0, "fechados": 0, "adiados": 0}
+    ocupados: set[int] = set()
+
+    while True:
+        with transaction.atomic():
+            lote = list(
+                ZabbixWebhookEvent.objects
+                .exclude(cliente_id__in=ocupados)
+                .select_for_update(skip_locked=True)
+                .order_by("id")[:batch_size]
+            )
+            if not lote:
+                break
+
+            por_cliente: dict[int, dict[str, dict]] = {}
+            for item in lote:
+                payloads = por_cliente.setdefault(item.cliente_id, {})
+                payloads[item.payload["eventid"]] = _merge(payloads.get(item.payload["eventid"]), item.payload)
+
+            gravados = set()
+            for cliente_id, payloads in por_cliente.items():
+                with tenant_sync_lock(cliente_id) as adquirido:
+                    if not adquirido:
+                        ocupados.add(cliente_id)
+                        continue
+
+                    parcial = _flush_cliente(cliente_id, list(payloads.values()))
+
+                gravados.add(cliente_id)
+                for chave in ("eventos", "recuperacoes", "abertos", "fechados"):
+                    total[chave] += parcial[chave]
+
+            processados = [item.id for item in lote if item.cliente_id in gravados]
+            ZabbixWebhookEvent.objects.filter(id__in=processados).delete()
+
+        total["recebidos"] += len(processados)
+        total["adiados"] += len(lote) - len(processados)
+
+        if len(lote) < batch_size:
+            break
+
+    return total
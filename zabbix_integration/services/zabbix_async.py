@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+
+from .zabbix_client import ZabbixAPIError, ZabbixClient, is_auth_error
+
+
+class AsyncZabbixClient:
+    """
+    Client JSON-RPC assíncrono (httpx) para buscas concorrentes.
+
+    Reaproveita o token do ZabbixClient síncrono (vindo do pool); se o Zabbix
+    responder erro de auth, o login é refeito pelo client síncrono e a chamada
+    é repetida uma vez.
+    """
+
+    def __init__(self, client: ZabbixClient, max_connections: int = 4):
+        self.sync_client = client
+        self.endpoint = client.endpoint
+        self.timeout = client.timeout
+        self.max_connections = max_connections
+        self._http: httpx.AsyncClient | None = None
+        self._relogin_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        self._http = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._http.aclose()
+        self._http = None
+        return False
+
+    async def _relogin(self, token_usado):
+        async with self._relogin_lock:
+            # outra task pode ter renovado enquanto esperávamos o lock
+            if self.sync_client.auth_token == token_usado:
+                await asyncio.to_thread(self.sync_client.relogin)
+                self.sync_client.add_stat("relogins_por_erro")
+
+    async def call(self, method: str, params: dict | list | None = None, _retry: bool = True):
+        token = self.sync_client.auth_token
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params if params is not None else {},
+            "id": self.sync_client._next_id(),
+        }
+        if token:
+            payload["auth"] = token
+
+        self.sync_client.add_stat("requisicoes")
+        r = await self._http.post(self.endpoint, json=payload)
+
+        if r.status_code >= 400:
+            print("ZABBIX HTTP ERROR:", r.status_code, r.text[:2000])
+            raise ZabbixAPIError(f"HTTP {r.status_code}: {r.text[:500]}")
+
+        try:
+            data = r.json()
+        except Exception:
+            print("ZABBIX NON-JSON RESPONSE:", r.text[:2000])
+            raise ZabbixAPIError(f"Resposta não-JSON do Zabbix: {r.text[:500]}")
+
+        if "error" in data:
+            if _retry and self.sync_client.has_credentials and is_auth_error(data["error"]):
+                await self._relogin(token)
+                return await self.call(method, params, _retry=False)
+
+            print("ZABBIX RPC ERROR:", data["error"])
+            raise ZabbixAPIError(f"{data['error']}")
+
+        return data.get("result")
+
+    async def item_get(self, **kwargs):
+        return await self.call("item.get", kwargs)
+
+    async def trigger_get(self, **kwargs):
+        return await self.call("trigger.get", kwargs)
+
+    async def event_get(self, **kwargs):
+        return await self.call("event.get", kwargs)
+
+    async def history_get(self, **kwargs):
+        return await self.call("history.get", kwargs)
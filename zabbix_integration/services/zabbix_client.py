@@ -1,5 +1,8 @@
 import requests
 import json
+import threading
+import time
+import weakref
 from urllib.parse import urljoin
 
 
@@ -7,50 +10,217 @@ class ZabbixAPIError(Exception):
     pass
 
 
+# Mensagens que o Zabbix devolve quando o token expirou/foi invalidado
+AUTH_ERROR_MARKERS = (
+    "re-login",
+    "not authorised",
+    "not authorized",
+    "session terminated",
+    "invalid auth",
+)
+
+
+def is_auth_error(error) -> bool:
+    texto = json.dumps(error, ensure_ascii=False).lower() if not isinstance(error, str) else error.lower()
+    return any(marker in texto for marker in AUTH_ERROR_MARKERS)
+
+
+def _encerrar_sessao(session, endpoint: str, sessao: dict, timeout: int):
+    # roda no weakref.finalize: não pode referenciar o client
+    if sessao.get("token"):
+        try:
+            session.post(
+                endpoint,
+                json={"jsonrpc": "2.0", "method": "user.logout", "params": [], "id": 0, "auth": sessao["token"]},
+                timeout=timeout,
+            )
+        except Exception:
+            pass
+        sessao["token"] = None
+    session.close()
+
+
+class ZabbixBatch:
+    """
+    Acumula chamadas JSON-RPC e envia todas num único POST (batch array).
+
+        with client.batch() as batch:
+            ids = {slaid: batch.add("sla.getsli", {...}) for slaid in slaids}
+        resultado = batch.result(ids[slaid])
+    """
+
+    def __init__(self, client: "ZabbixClient", max_size: int = 100):
+        self.client = client
+        self.max_size = max_size
+        self._pendentes: list[dict] = []
+        self.results: dict[int, object] = {}
+        self.errors: dict[int, object] = {}
+
+    def add(self, method: str, params: dict | list | None = None) -> int:
+        request_id = self.client._next_id()
+        self._pendentes.append({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params if params is not None else {},
+            "id": request_id,
+        })
+        return request_id
+
+    def execute(self) -> dict[int, object]:
+        pendentes, self._pendentes = self._pendentes, []
+
+        for i in range(0, len(pendentes), self.max_size):
+            self._enviar(pendentes[i:i + self.max_size])
+
+        return self.results
+
+    def _enviar(self, payloads: list[dict], _retry: bool = True):
+        for p in payloads:
+            if self.client.auth_token:
+                p["auth"] = self.client.auth_token
+
+        data = self.client._post(payloads)
+
+        # erro no envelope (ex.: batch inválido) vem como objeto único
+        if isinstance(data, dict):
+            if "error" in data:
+                print("ZABBIX RPC ERROR:", data["error"])
+                raise ZabbixAPIError(f"{data['error']}")
+            data = [data]
+
+        erros_auth = [d for d in data if "error" in d and is_auth_error(d["error"])]
+        if erros_auth and _retry and self.client.has_credentials:
+            self.client.add_stat("relogins_por_erro")
+            self.client.relogin()
+            return self._enviar(payloads, _retry=False)
+
+        for d in data:
+            if "error" in d:
+                self.errors[d.get("id")] = d["error"]
+            else:
+                self.results[d.get("id")] = d.get("result")
+
+    def result(self, request_id: int):
+        if request_id in self.errors:
+            raise ZabbixAPIError(f"{self.errors[request_id]}")
+        return self.results.get(request_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+        return False
+
+
 class ZabbixClient:
-    def __init__(self, base_url: str, timeout: int = 30):
+    def __init__(self, base_url: str, timeout: int = 30, session: requests.Session | None = None):
         self.base_url = base_url.rstrip("/") + "/"
         self.timeout = timeout
-        self.auth_token = None
+        self._sessao = {"token": None}
         self._id = 1
 
+        # Sessão HTTP persistente (keep-alive): evita novo handshake TLS por chamada.
+        # O client do pool é compartilhado entre threads: o POST síncrono é serializado
+        # (a concorrência das buscas em paralelo vai pelo AsyncZabbixClient, com pool próprio)
+        self.session = session or requests.Session()
+        self._http_lock = threading.Lock()
+
+        # Guardamos as credenciais para renovar o token sozinhos (expiração / erro de auth)
+        self._credentials = None
+        self.token_obtido_em = None
+        self._lock = threading.RLock()
+
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "requisicoes": 0,
+            "logins": 0,
+            "relogins_por_erro": 0,
+        }
+
+    @property
+    def auth_token(self):
+        return self._sessao["token"]
+
+    @auth_token.setter
+    def auth_token(self, token):
+        self._sessao["token"] = token
+
+    @property
+    def has_credentials(self) -> bool:
+        return self._credentials is not None
+
+    def set_credentials(self, user: str, password: str):
+        """
+        Troca as credenciais usadas nos logins automáticos. Se mudaram, o token
+        atual é descartado e o próximo ensure_token faz login com as novas.
+        """
+        with self._lock:
+            if self._credentials == (user, password):
+                return
+            self._credentials = (user, password)
+            self.token_obtido_em = None
+
+    def add_stat(self, nome: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[nome] += n
+
     @property
     def endpoint(self) -> str:
         # Zabbix JSON-RPC endpoint padrão
         return urljoin(self.base_url, "api_jsonrpc.php")
 
+    def _post(self, payload):
+        self.add_stat("requisicoes")
+        with self._http_lock:
+            r = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
 
+        # ✅ log útil antes de estourar
+        if r.status_code >= 400:
+            print("ZABBIX HTTP ERROR:", r.status_code, r.text[:2000])
+            raise ZabbixAPIError(f"HTTP {r.status_code}: {r.text[:500]}")
 
-    def _call(self, method: str, params: dict | list | None = None, auth: bool = True):
+        # ✅ protege contra resposta não-JSON
+        try:
+            return r.json()
+        except Exception:
+            print("ZABBIX NON-JSON RESPONSE:", r.text[:2000])
+            raise ZabbixAPIError(f"Resposta não-JSON do Zabbix: {r.text[:500]}")
+
+    def _next_id(self) -> int:
+        with self._lock:
+            request_id = self._id
+            self._id += 1
+            return request_id
+
+    def batch(self, max_size: int = 100) -> ZabbixBatch:
+        """
+        Modo batch: as chamadas adicionadas vão num único POST ao sair do `with`.
+        """
+        return ZabbixBatch(self, max_size=max_size)
+
+    def _call(self, method: str, params: dict | list | None = None, auth: bool = True, _retry: bool = True):
         payload = {
             "jsonrpc": "2.0",
             "method": method,
             "params": params if params is not None else {},
-            "id": self._id,  # ✅ usa o contador
+            "id": self._next_id(),  # ✅ usa o contador
         }
-        self._id += 1
 
         if auth and self.auth_token:
             payload["auth"] = self.auth_token
 
         #print("ZABBIX RPC:", json.dumps(payload, ensure_ascii=False)[:2000])
-        #print(f"Calling Zabbix API at {self.endpoint} with method {method} and params {params}")
-        r = requests.post(self.endpoint, json=payload, timeout=self.timeout)
-        #print(r)
-        #print(f"ZABBIX RESPONSE (status {r.status_code}): {r.text[:2000]}")  # ✅ log da resposta
-        # ✅ log útil antes de estourar
-        if r.status_code >= 400:
-            print("ZABBIX HTTP ERROR:", r.status_code, r.text[:2000])
-            raise ZabbixAPIError(f"HTTP {r.status_code}: {r.text[:500]}")
-
-        # ✅ protege contra resposta não-JSON
-        try:
-            data = r.json()
-        except Exception:
-            print("ZABBIX NON-JSON RESPONSE:", r.text[:2000])
-            raise ZabbixAPIError(f"Resposta não-JSON do Zabbix: {r.text[:500]}")
+        data = self._post(payload)
 
         if "error" in data:
+            # 🔁 token expirado: faz login de novo e repete UMA vez
+            if auth and _retry and self._credentials and is_auth_error(data["error"]):
+                self.add_stat("relogins_por_erro")
+                self.relogin()
+                return self._call(method, params, auth=auth, _retry=False)
+
             print("ZABBIX RPC ERROR:", data["error"])
             raise ZabbixAPIError(f"{data['error']}")
 
@@ -58,9 +228,51 @@ class ZabbixClient:
 
 
     def login(self, user: str, password: str) -> str:
-        token = self._call("user.login", {"username": user, "password": password}, auth=False)
-        self.auth_token = token
-        return token
+        with self._lock:
+            token = self._call("user.login", {"username": user, "password": password}, auth=False)
+            self.auth_token = token
+            self._credentials = (user, password)
+            self.token_obtido_em = time.monotonic()
+            self.add_stat("logins")
+            return token
+
+    def relogin(self) -> str:
+        with self._lock:
+            user, password = self._credentials
+            return self.login(user, password)
+
+    def token_expirado(self, ttl_seconds: int) -> bool:
+        if not self.auth_token or self.token_obtido_em is None:
+            return True
+        return (time.monotonic() - self.token_obtido_em) >= ttl_seconds
+
+    def ensure_token(self, ttl_seconds: int) -> bool:
+        """
+        Garante token válido. Retorna True se precisou fazer login.
+        """
+        with self._lock:
+            if not self.token_expirado(ttl_seconds):
+                return False
+            self.relogin()
+            return True
+
+    def close(self):
+        # logout é "best effort": se falhar, o token expira sozinho no Zabbix
+        with self._lock:
+            if self.auth_token:
+                try:
+                    self._call("user.logout", [], _retry=False)
+                except Exception:
+                    pass
+                self.auth_token = None
+            self.session.close()
+
+    def close_when_unused(self):
+        """
+        Logout + fechamento da sessão quando ninguém mais usar este client
+        (o pool descarta o client, mas outra thread pode estar no meio de um sync com ele).
+        """
+        weakref.finalize(self, _encerrar_sessao, self.session, self.endpoint, self._sessao, self.timeout)
 
     # Métodos úteis (exemplos)
     def host_get(self, **kwargs):
@@ -103,6 +315,9 @@ class ZabbixClient:
 
     def alert_get(self, **kwargs):
         return self._call("alert.get", kwargs)
-    
+
     def hostgroup_get(self, **kwargs):
         return self._call("hostgroup.get", kwargs)
+
+    def maintenance_get(self, **kwargs):
+        return self._call("maintenance.get", kwargs)
@@ -3,6 +3,9 @@ from __future__ import annotations
 from typing import Any
 
 from zabbix_integration.services.sync import get_client_for_cliente
+from zabbix_integration.services.sync_hosts import upsert_hosts_payload
+from zabbix_integration.services.bulk import bulk_upsert
+from zabbix_integration.services.event_stream import iter_events
 from .models import ZabbixHost, ZabbixItem, ZabbixTrigger, ZabbixEvent, ZabbixHostGroup
 from datetime import datetime, timedelta, timezone as dt_timezone
 from django.db import transaction
@@ -58,47 +61,16 @@ def sync_hosts(
     # 🔹 chamada ao Zabbix
     result = client.host_get(**params)
 
-    saved = 0
-
-    for h in result:
-        interfaces = h.get("interfaces") or []
-        i0 = interfaces[0] if interfaces else {}
-
-        defaults = {
-            "hostname": h.get("host"),
-            "nome": h.get("name"),
-            "status": int(h.get("status") or 0),
-            "raw": h,
-        }
-
-        host_obj, _ = ZabbixHost.objects.update_or_create(
-            cliente_id=cliente_id,
-            hostid=str(h["hostid"]),
-            defaults=defaults,
-        )
-
-        # 🔥 -------- SINCRONIZAÇÃO DOS GRUPOS --------
-        grupos_relacionados = []
-
-        for g in h.get("groups", []):
-            group_obj, _ = ZabbixHostGroup.objects.update_or_create(
-                cliente_id=cliente_id,
-                groupid=str(g["groupid"]),
-                defaults={
-                    "name": g.get("name"),
-                    "raw": g,
-                }
-            )
-            grupos_relacionados.append(group_obj)
-
-        # 🔥 Atualiza relação ManyToMany (remove antigos e adiciona atuais)
-        host_obj.groups.set(grupos_relacionados)
-
-        saved += 1
+    # 🔥 hosts, grupos e relação M2M em lote (statements não crescem com o nº de hosts)
+    resumo = upsert_hosts_payload(cliente_id, result)
+    saved = resumo["hosts"]
 
     return {
         "count": len(result),
         "saved": saved,
+        "grupos": resumo["grupos"],
+        "vinculos_adicionados": resumo["vinculos_adicionados"],
+        "vinculos_removidos": resumo["vinculos_removidos"],
         "filtros_aplicados": filtros or {}
     }
 
@@ -198,49 +170,56 @@ def sync_events(cliente_id: int, since_hours: int = 24):
 
     time_from = int((datetime.now(tz=dt_timezone.utc) - timedelta(hours=since_hours)).timestamp())
 
-    events = client.event_get(
-        output=["eventid", "clock", "value", "name", "severity", "acknowledged", "objectid"],
-        source=0,  # ✅ trigger events
-        object=148958,  # ✅ trigger
-        #objectids=["148958", "138328"],
-        time_from=time_from,
-        sortfield=["clock"],
-        sortorder="DESC",
-        limit=2000,
-    )
-
     # mapas locais
     local_triggers = {
         t.triggerid: t
         for t in ZabbixTrigger.objects.filter(cliente_id=cliente_id)
     }
-    local_hosts = {
-        str(h.hostid): h
-        for h in ZabbixHost.objects.filter(cliente_id=cliente_id)
-    }
 
-    # Para ligar host ao evento: pega o host principal da trigger (ou nenhum)
-    for ev in events:
-        trig_id = str(ev.get("objectid") or "")
-        trig = local_triggers.get(trig_id)
+    # host "principal" da trigger = host do primeiro item vinculado (uma consulta só)
+    trigger_host = {}
+    for trigger_pk, host_pk in (
+        ZabbixTrigger.items.through.objects
+        .filter(zabbixtrigger__cliente_id=cliente_id, zabbixitem__host__isnull=False)
+        .order_by("id")
+        .values_list("zabbixtrigger_id", "zabbixitem__host_id")
+    ):
+        trigger_host.setdefault(trigger_pk, host_pk)
+
+    total = 0
+
+    # 🔥 paginado por eventid: sem teto de 2000 eventos por janela
+    for events in iter_events(
+        client,
+        time_from=time_from,
+        output=["eventid", "clock", "value", "name", "severity", "acknowledged", "objectid"],
+        source=0,  # ✅ trigger events
+        object=0,  # ✅ trigger
+    ):
+        rows = []
+        for ev in events:
+            trig = local_triggers.get(str(ev.get("objectid") or ""))
+
+            rows.append(
+                ZabbixEvent(
+                    cliente_id=cliente_id,
+                    eventid=str(ev["eventid"]),
+                    trigger=trig,
+                    host_id=trigger_host.get(trig.pk) if trig else None,
+                    name=ev.get("name"),
+                    severity=int(ev.get("severity") or 0),
+                    value=int(ev.get("value") or 0),
+                    acknowledged=bool(int(ev.get("acknowledged") or 0)),
+                    clock=_dt_from_epoch(ev["clock"]),
+                    raw=ev,
+                )
+            )
 
-        host = None
-        if trig:
-            # se M2M: escolha o primeiro host como "principal" pro evento
-            first = trig.hosts.first()
-            host = first
+        total += bulk_upsert(
+            ZabbixEvent,
+            rows,
+            unique_fields=["cliente", "eventid"],
+            update_fields=["trigger", "host", "name", "severity", "value", "acknowledged", "clock", "raw"],
+        )
 
-        ZabbixEvent.objects.update_or_create(
-            eventid=str(ev["eventid"]),
-            defaults={
-                "cliente_id": cliente_id,
-                "trigger": trig,
-                "host": host,
-                "name": ev.get("name"),
-                "severity": int(ev.get("severity") or 0),
-                "value": int(ev.get("value") or 0),
-                "acknowledged": bool(int(ev.get("acknowledged") or 0)),
-                "clock": _dt_from_epoch(ev["clock"]),
-                "raw": ev,
-            },
-        )
\ No newline at end of file
+    return {"total_eventos": total, "since_hours": since_hours}
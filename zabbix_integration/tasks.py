@@ -5,11 +5,20 @@ from django.db import transaction
 
 from zabbix_integration.services.sync_full import run_full_sync
 from zabbix_integration.services.sync_incremental import run_incremental_sync
-from zabbix_integration.models import ZabbixSyncControl
+from zabbix_integration.services.history_partitions import maintain_history_partitions
+from zabbix_integration.services.raw_storage import prune_payloads
+from zabbix_integration.services.relatorio_jobs import executar_relatorio_job
+from zabbix_integration.services.scheduler import schedule_tenants
+from zabbix_integration.services.sync_lock import release_enqueue, run_with_tenant_lock
+from zabbix_integration.services.availability_engine import calcular_disponibilidade_mensal
+from zabbix_integration.services.webhook import flush_webhook_events
+from zabbix_integration.dashboards.executivo import atualizar_snapshot_executivo
 
 
 logger = logging.getLogger(__name__)
 
+SYNC_MAX_RETRIES = 5
+
 
 # -------------------------------------------------------
 # 🔵 FULL SYNC TASK
@@ -19,7 +28,7 @@ logger = logging.getLogger(__name__)
     bind=True,
     autoretry_for=(Exception,),
     retry_backoff=True,
-    retry_kwargs={"max_retries": 5},
+    retry_kwargs={"max_retries": SYNC_MAX_RETRIES},
 )
 def full_sync_task(self, cliente_id: int):
     """
@@ -30,18 +39,27 @@ def full_sync_task(self, cliente_id: int):
     logger.info(f"[FULL SYNC] Iniciando cliente {cliente_id}")
 
     try:
-        run_full_sync(cliente_id)
+        # 🔒 uma execução por cliente; se já houver outra rodando, pula
+        result = run_with_tenant_lock(cliente_id, run_full_sync)
+        release_enqueue(cliente_id, "full")
 
-        logger.info(f"[FULL SYNC] Finalizado cliente {cliente_id}")
+        if result["status"] == "skipped":
+            logger.info(f"[FULL SYNC] Cliente {cliente_id} já em execução, pulando")
+        else:
+            logger.info(f"[FULL SYNC] Finalizado cliente {cliente_id}")
+            # 📊 dados novos -> recalcula o dashboard executivo do mês fora do lock
+            refresh_dashboard_snapshot_task.delay(cliente_id)
 
         return {
-            "cliente_id": cliente_id,
-            "status": "success",
+            **result,
             "finished_at": timezone.now().isoformat(),
         }
 
     except Exception as e:
         logger.error(f"[FULL SYNC] Erro cliente {cliente_id}: {str(e)}")
+        # 🔁 com retry pendente a task continua "na fila" (o beat não enfileira outra)
+        if self.request.retries >= SYNC_MAX_RETRIES:
+            release_enqueue(cliente_id, "full")
         raise
 
 
@@ -53,7 +71,7 @@ def full_sync_task(self, cliente_id: int):
     bind=True,
     autoretry_for=(Exception,),
     retry_backoff=True,
-    retry_kwargs={"max_retries": 5},
+    retry_kwargs={"max_retries": SYNC_MAX_RETRIES},
 )
 def incremental_sync_task(self, cliente_id: int):
     """
@@ -64,18 +82,27 @@ def incremental_sync_task(self, cliente_id: int):
     logger.info(f"[INCREMENTAL SYNC] Iniciando cliente {cliente_id}")
 
     try:
-        run_incremental_sync(cliente_id)
+        # 🔒 uma execução por cliente; se já houver outra rodando, pula
+        result = run_with_tenant_lock(cliente_id, run_incremental_sync)
+        release_enqueue(cliente_id, "incremental")
 
-        logger.info(f"[INCREMENTAL SYNC] Finalizado cliente {cliente_id}")
+        if result["status"] == "skipped":
+            logger.info(f"[INCREMENTAL SYNC] Cliente {cliente_id} já em execução, pulando")
+        else:
+            logger.info(f"[INCREMENTAL SYNC] Finalizado cliente {cliente_id}")
+            # 📊 dados novos -> recalcula o dashboard executivo do mês fora do lock
+            refresh_dashboard_snapshot_task.delay(cliente_id)
 
         return {
-            "cliente_id": cliente_id,
-            "status": "success",
+            **result,
             "finished_at": timezone.now().isoformat(),
         }
 
     except Exception as e:
         logger.error(f"[INCREMENTAL SYNC] Erro cliente {cliente_id}: {str(e)}")
+        # 🔁 com retry pendente a task continua "na fila" (o beat não enfileira outra)
+        if self.request.retries >= SYNC_MAX_RETRIES:
+            release_enqueue(cliente_id, "incremental")
         raise
 
 
@@ -86,34 +113,111 @@ def incremental_sync_task(self, cliente_id: int):
 @shared_task
 def full_sync_all_clients():
     """
-    Dispara full sync para todos clientes.
+    Dispara full sync para os clientes com ZabbixConnection ativa,
+    espalhados na janela com jitter.
     """
 
-    from clientes.models import Cliente
+    return schedule_tenants("full", full_sync_task)
+
 
-    clientes = Cliente.objects.values_list("id", flat=True)
+# -------------------------------------------------------
+# ⚡ INCREMENTAL PARA TODOS CLIENTES
+# -------------------------------------------------------
 
-    for cliente_id in clientes:
-        full_sync_task.delay(cliente_id)
+@shared_task
+def incremental_sync_all_clients():
+    """
+    Dispara incremental para os clientes com ZabbixConnection ativa,
+    espalhados na janela com jitter.
+    """
 
-    return {"total_clientes": len(clientes)}
+    return schedule_tenants("incremental", incremental_sync_task)
 
 
 # -------------------------------------------------------
-# ⚡ INCREMENTAL PARA TODOS CLIENTES
+# 🗂️ PARTIÇÕES DO HISTÓRICO (criação antecipada + retenção)
 # -------------------------------------------------------
 
 @shared_task
-def incremental_sync_all_clients():
+def maintain_history_partitions_task():
+    """
+    Cria partições mensais futuras do histórico e remove as que passaram da retenção.
+    Também limpa os payloads brutos comprimidos que nenhuma linha referencia mais.
+    Ideal rodar 1x por dia.
+    """
+
+    result = maintain_history_partitions()
+    result["payloads_removidos"] = prune_payloads()
+
+    logger.info(
+        f"[HISTORY PARTITIONS] criadas={result['criadas']} removidas={result['removidas']} "
+        f"payloads_removidos={result['payloads_removidos']}"
+    )
+
+    return result
+
+
+# -------------------------------------------------------
+# 📄 RELATÓRIOS EM BACKGROUND
+# -------------------------------------------------------
+
+@shared_task
+def gerar_relatorio_task(job_id: int):
     """
-    Dispara incremental para todos clientes.
+    Gera o arquivo de um ZabbixRelatorioJob (status/erro ficam gravados no job).
     """
 
-    from clientes.models import Cliente
+    logger.info(f"[RELATORIO] Iniciando job {job_id}")
+
+    job = executar_relatorio_job(job_id)
+
+    logger.info(f"[RELATORIO] Job {job_id} concluído: {job.total_linhas} linhas")
+
+    return {"job_id": job_id, "status": job.status, "arquivo": job.arquivo}
+
+
+# -------------------------------------------------------
+# 📊 SNAPSHOT DO DASHBOARD EXECUTIVO
+# -------------------------------------------------------
+
+@shared_task
+def refresh_dashboard_snapshot_task(cliente_id: int, ano: int | None = None, mes: int | None = None):
+    """
+    Recalcula o snapshot do dashboard executivo (mês corrente por padrão).
+    O resumo da IA só é regerado se os KPIs mudaram.
+    """
+
+    now = timezone.now()
+    ano = ano or now.year
+    mes = mes or now.month
+
+    # disponibilidade do mês (incidentes - manutenção) antes dos KPIs
+    calcular_disponibilidade_mensal(cliente_id, ano, mes)
+
+    snapshot = atualizar_snapshot_executivo(cliente_id, ano, mes)
+
+    logger.info(f"[DASHBOARD] Snapshot cliente {cliente_id} {mes}/{ano} hash={snapshot.kpis_hash[:12]}")
+
+    return {"cliente_id": cliente_id, "ano": ano, "mes": mes, "kpis_hash": snapshot.kpis_hash}
+
+
+# -------------------------------------------------------
+# 🪝 FLUSH DO BUFFER DO WEBHOOK
+# -------------------------------------------------------
+
+@shared_task
+def flush_webhook_events_task():
+    """
+    Grava os eventos recebidos pelo webhook em ZabbixEvent/ZabbixAlarm/ZabbixIncident.
+    Agendada pelo webhook (debounce) e pelo beat como rede de segurança.
+    """
 
-    clientes = Cliente.objects.values_list("id", flat=True)
+    result = flush_webhook_events()
 
-    for cliente_id in clientes:
-        incremental_sync_task.delay(cliente_id)
+    if result["recebidos"] or result["adiados"]:
+        logger.info(
+            f"[WEBHOOK] flush recebidos={result['recebidos']} eventos={result['eventos']} "
+            f"abertos={result['abertos']} fechados={result['fechados']} adiados={result['adiados']}"
+        )
 
-    return {"total_clientes": len(clientes)}
\ No newline at end of file
+    return result
@@ -1,3 +1,285 @@
-from django.test import TestCase
+from datetime import datetime, timezone
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from clientes.models import Cliente
+from zabbix_integration.models import ZabbixEvent, ZabbixHost, ZabbixRawPayload
+from zabbix_integration.services.availability_engine import (
+    DIA,
+    PERIODO_DIARIO,
+    PERIODO_MENSAL,
+    PERIODO_SEMANAL,
+    PERIODO_UNICO,
+    maintenance_intervals,
+    merge_intervals,
+    split_downtime,
+)
+from zabbix_integration.services.bulk import bulk_upsert
+from zabbix_integration.services.raw_storage import drop_unchanged, load_raw
+from zabbix_integration.services.utils import content_hash
+from zabbix_integration.services.webhook import WebhookPayloadError, normalize_webhook_event
+
+
+def _epoch(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+class MergeIntervalsTests(SimpleTestCase):
+    def test_une_sobrepostos_e_encostados(self):
+        starts, ends = merge_intervals([30, 0, 10, 50], [40, 10, 20, 60])
+        self.assertEqual(list(zip(starts.tolist(), ends.tolist())), [(0, 20), (30, 40), (50, 60)])
+
+    def test_intervalo_contido_nao_encurta_o_bloco(self):
+        starts, ends = merge_intervals([0, 5, 20], [100, 10, 30])
+        self.assertEqual(list(zip(starts.tolist(), ends.tolist())), [(0, 100)])
+
+    def test_descarta_intervalos_vazios(self):
+        starts, ends = merge_intervals([10, 5], [10, 3])
+        self.assertEqual(starts.size, 0)
+        self.assertEqual(ends.size, 0)
+
+
+class SplitDowntimeTests(SimpleTestCase):
+    def test_incidente_parcialmente_em_manutencao(self):
+        inc = merge_intervals([0], [100])
+        man = merge_intervals([40, 90], [60, 120])
+        # 100s de incidente, 30s cobertos por manutenção; manutenção total 20 + 30
+        self.assertEqual(split_downtime(*inc, *man), (70, 50))
+
+    def test_sem_manutencao(self):
+        inc = merge_intervals([0, 50], [10, 70])
+        man = merge_intervals([], [])
+        self.assertEqual(split_downtime(*inc, *man), (30, 0))
+
+    def test_sem_intervalos(self):
+        vazio = merge_intervals([], [])
+        self.assertEqual(split_downtime(*vazio, *vazio), (0, 0))
+
+
+class MaintenanceIntervalsTests(SimpleTestCase):
+    inicio = _epoch(2026, 3, 1)
+    fim = _epoch(2026, 4, 1)
+
+    def test_periodo_unico_recortado_pela_janela(self):
+        tp = {"timeperiod_type": PERIODO_UNICO, "start_date": self.inicio - 3600, "period": 7200}
+        self.assertEqual(
+            maintenance_intervals([tp], 0, 2**40, self.inicio, self.fim),
+            [(self.inicio, self.inicio + 3600)],
+        )
+
+    def test_diario_a_cada_dois_dias(self):
+        tp = {"timeperiod_type": PERIODO_DIARIO, "every": 2, "start_time": 3600, "period": 1800}
+        intervalos = maintenance_intervals([tp], self.inicio, 2**40, self.inicio, self.inicio + 5 * DIA)
+        self.assertEqual(
+            intervalos,
+            [(self.inicio + d * DIA + 3600, self.inicio + d * DIA + 5400) for d in (0, 2, 4)],
+        )
+
+    def test_semanal_alinhado_na_segunda(self):
+        # 01/03/2026 é domingo; bit 0 = segunda, bit 2 = quarta
+        tp = {"timeperiod_type": PERIODO_SEMANAL, "dayofweek": 0b101, "start_time": 0, "period": 3600}
+        intervalos = maintenance_intervals([tp], self.inicio, 2**40, self.inicio, _epoch(2026, 3, 9))
+        self.assertEqual(
+            intervalos,
+            [(_epoch(2026, 3, 2), _epoch(2026, 3, 2, 1)), (_epoch(2026, 3, 4), _epoch(2026, 3, 4, 1))],
+        )
+
+    def test_semanal_que_atravessa_o_inicio_da_janela(self):
+        # domingo 22h por 4h: a ocorrência de 01/03 começa antes e termina dentro da janela
+        tp = {"timeperiod_type": PERIODO_SEMANAL, "dayofweek": 1 << 6, "start_time": 22 * 3600, "period": 4 * 3600}
+        intervalos = maintenance_intervals([tp], 0, 2**40, _epoch(2026, 3, 2), _epoch(2026, 3, 3))
+        self.assertEqual(intervalos, [(_epoch(2026, 3, 2), _epoch(2026, 3, 2, 2))])
+
+    def test_recorte_por_active_since_e_active_till(self):
+        tp = {"timeperiod_type": PERIODO_DIARIO, "every": 1, "start_time": 0, "period": DIA}
+        intervalos = maintenance_intervals(
+            [tp], _epoch(2026, 3, 10, 12), _epoch(2026, 3, 12, 6), self.inicio, self.fim
+        )
+        # dias contam da meia-noite do dia de active_since; as pontas são recortadas
+        self.assertEqual(
+            intervalos,
+            [
+                (_epoch(2026, 3, 10, 12), _epoch(2026, 3, 11)),
+                (_epoch(2026, 3, 11), _epoch(2026, 3, 12)),
+                (_epoch(2026, 3, 12), _epoch(2026, 3, 12, 6)),
+            ],
+        )
+
+    def test_manutencao_fora_da_janela(self):
+        tp = {"timeperiod_type": PERIODO_DIARIO, "every": 1, "start_time": 0, "period": 3600}
+        self.assertEqual(maintenance_intervals([tp], self.fim, self.fim + DIA, self.inicio, self.fim), [])
+
+    def test_mensal_por_dia_do_mes(self):
+        tp = {"timeperiod_type": PERIODO_MENSAL, "month": 0b111111111111, "day": 15, "start_time": 7200, "period": 7200}
+        self.assertEqual(
+            maintenance_intervals([tp], 0, 2**40, self.inicio, self.fim),
+            [(_epoch(2026, 3, 15, 2), _epoch(2026, 3, 15, 4))],
+        )
+
+    def test_mensal_dia_inexistente_no_mes(self):
+        tp = {"timeperiod_type": PERIODO_MENSAL, "month": 0b111111111111, "day": 31, "start_time": 0, "period": 3600}
+        self.assertEqual(maintenance_intervals([tp], 0, 2**40, _epoch(2026, 4, 1), _epoch(2026, 5, 1)), [])
+
+    def test_mensal_ultimo_domingo(self):
+        tp = {
+            "timeperiod_type": PERIODO_MENSAL,
+            "month": 1 << 2,  # março
+            "dayofweek": 1 << 6,  # domingo
+            "every": 5,  # última ocorrência do mês
+            "start_time": 22 * 3600,
+            "period": 4 * 3600,
+        }
+        self.assertEqual(
+            maintenance_intervals([tp], 0, 2**40, self.inicio, self.fim),
+            [(_epoch(2026, 3, 29, 22), _epoch(2026, 3, 30, 2))],
+        )
+
+    def test_mensal_do_mes_anterior_que_atravessa_a_virada(self):
+        tp = {"timeperiod_type": PERIODO_MENSAL, "month": 1 << 1, "day": 28, "start_time": 22 * 3600, "period": 4 * 3600}
+        self.assertEqual(
+            maintenance_intervals([tp], 0, 2**40, self.inicio, self.fim),
+            [(self.inicio, _epoch(2026, 3, 1, 2))],
+        )
+
+
+class BulkUpsertTests(TestCase):
+    host_fields = ["hostname", "nome", "status", "raw"]
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(nome="a")
+
+    def _host(self, hostid, nome, raw=None):
+        return ZabbixHost(
+            cliente=self.cliente, hostid=hostid, hostname=nome, nome=nome, status="0", raw=raw or {"name": nome}
+        )
+
+    def _upsert(self, hosts):
+        return bulk_upsert(ZabbixHost, hosts, unique_fields=["cliente", "hostid"], update_fields=self.host_fields)
+
+    def test_repetido_no_lote_vale_o_ultimo(self):
+        self.assertEqual(self._upsert([self._host("1", "velho"), self._host("1", "novo"), self._host("2", "b")]), 2)
+        self.assertEqual(ZabbixHost.objects.get(hostid="1").nome, "novo")
+
+    def test_atualiza_sem_duplicar(self):
+        self._upsert([self._host("1", "velho")])
+        self._upsert([self._host("1", "novo")])
+        self.assertEqual(list(ZabbixHost.objects.values_list("hostid", "nome")), [("1", "novo")])
+
+    def test_mesmo_eventid_em_clientes_diferentes(self):
+        outro = Cliente.objects.create(nome="b")
+        eventos = [
+            ZabbixEvent(cliente=cliente, eventid="10", clock=datetime(2026, 3, 1, tzinfo=timezone.utc), name=cliente.nome)
+            for cliente in (self.cliente, outro)
+        ]
+        bulk_upsert(ZabbixEvent, eventos, unique_fields=["cliente", "eventid"], update_fields=["name", "clock"])
+
+        self.assertEqual(
+            sorted(ZabbixEvent.objects.values_list("cliente__nome", "eventid", "name")),
+            [("a", "10", "a"), ("b", "10", "b")],
+        )
+
+    @override_settings(ZABBIX_RAW_STORAGE="compressed")
+    def test_compressed_guarda_payload_fora_da_linha(self):
+        self._upsert([self._host("1", "a", raw={"host": "a"})])
+
+        host = ZabbixHost.objects.get(hostid="1")
+        self.assertEqual(host.raw, {})
+        self.assertEqual(ZabbixRawPayload.objects.count(), 1)
+        self.assertEqual(load_raw(host), {"host": "a"})
+
+
+@override_settings(ZABBIX_RAW_STORAGE="on_change")
+class DropUnchangedTests(TestCase):
+    def setUp(self):
+        self.cliente = Cliente.objects.create(nome="a")
+        self._upsert([self._host("1", {"v": 1}), self._host("2", {"v": 2})])
+
+    def _host(self, hostid, raw):
+        return ZabbixHost(cliente=self.cliente, hostid=hostid, hostname=hostid, nome=hostid, status="0", raw=raw)
+
+    def _upsert(self, hosts):
+        bulk_upsert(ZabbixHost, hosts, unique_fields=["cliente", "hostid"], update_fields=["nome", "raw"])
+
+    def test_ignora_payload_igual(self):
+        hosts = [self._host("1", {"v": 1}), self._host("2", {"v": 20}), self._host("3", {"v": 3})]
+        for host in hosts:
+            host.raw_hash = content_hash(host.raw)
+
+        gravar, ignorados = drop_unchanged(ZabbixHost, hosts, ["cliente", "hostid"], ["nome", "raw"])
+
+        self.assertEqual([h.hostid for h in gravar], ["2", "3"])
+        self.assertEqual(ignorados, 1)
+
+    def test_payload_igual_nao_regrava(self):
+        ZabbixHost.objects.filter(hostid="1").update(nome="local")
+        self._upsert([self._host("1", {"v": 1})])
+        self.assertEqual(ZabbixHost.objects.get(hostid="1").nome, "local")
+
+
+@override_settings(ZABBIX_WEBHOOK_TIME_ZONE="America/Sao_Paulo")
+class NormalizeWebhookEventTests(SimpleTestCase):
+    problema = {
+        "eventid": "5001",
+        "value": "1",
+        "triggerid": "300",
+        "recovery_eventid": "{EVENT.RECOVERY.ID}",
+        "date": "2026.10.18",
+        "time": "10:00:00",
+        "severity": "High",
+        "name": "CPU alta",
+        "hostid": "10084",
+        "hostname": "srv01",
+        "acknowledged": "No",
+    }
+
+    def test_problema(self):
+        self.assertEqual(
+            normalize_webhook_event(self.problema),
+            {
+                "eventid": "5001",
+                "value": 1,
+                "triggerid": "300",
+                "r_eventid": None,
+                "clock": _epoch(2026, 10, 18, 13),
+                "r_clock": None,
+                "severity": 4,
+                "name": "CPU alta",
+                "hostid": "10084",
+                "hostname": "srv01",
+                "acknowledged": False,
+            },
+        )
+
+    def test_recuperacao(self):
+        ev = normalize_webhook_event({
+            **self.problema,
+            "value": "0",
+            "recovery_eventid": "5002",
+            "recovery_clock": str(_epoch(2026, 10, 18, 14)),
+            "severity": "4",
+            "acknowledged": "Yes",
+        })
+
+        self.assertEqual(ev["value"], 0)
+        self.assertEqual(ev["r_eventid"], "5002")
+        self.assertEqual(ev["r_clock"], _epoch(2026, 10, 18, 14))
+        self.assertEqual(ev["severity"], 4)
+        self.assertTrue(ev["acknowledged"])
+
+    def test_macro_nao_resolvida_vira_vazio(self):
+        ev = normalize_webhook_event({**self.problema, "hostid": "{HOST.ID}", "name": "{EVENT.NAME}"})
+        self.assertIsNone(ev["hostid"])
+        self.assertEqual(ev["name"], "")
+
+    def test_payload_invalido(self):
+        invalidos = [
+            "5001",
+            {**self.problema, "eventid": "{EVENT.ID}"},
+            {**self.problema, "value": "2"},
+            {**self.problema, "triggerid": ""},
+            {**self.problema, "value": "0"},
+            {**self.problema, "date": "18/10/2026"},
+        ]
+        for ev in invalidos:
+            with self.subTest(ev=ev), self.assertRaises(WebhookPayloadError):
+                normalize_webhook_event(ev)
@@ -1,12 +1,13 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import ZabbixConnectionViewSet, ZabbixHostsView, ZabbixProblemsView, ZabbixSyncLevel1View, ZabbixSyncHostsView
-from .views_level2 import ZabbixSyncItemsView, ZabbixSyncEventsView, ZabbixSyncHistoryView
+from .views import ZabbixConnectionViewSet, ZabbixHostsView, ZabbixProblemsView, ZabbixSyncLevel1View, ZabbixSyncHostsView, ZabbixClientPoolMetricsView, ZabbixSyncMetricsView
+from .views_level2 import ZabbixSyncItemsView, ZabbixSyncEventsView, ZabbixSyncHistoryView, ZabbixHistorySeriesView
 from .views_level3 import ZabbixSyncTemplatesView, ZabbixSyncUsersView, ZabbixSyncSLAView
 from .views_reporting import ZabbixMonthlyReportView
 from .views_sla_ai import ZabbixSlaAnalyzeView
 from .views_alarms import ZabbixSyncAlarmsView, ZabbixSyncAlertsSentView, ZabbixAlarmsListView, ZabbixAlarmEventsListView, ZabbixAlertsSentListView
 from .views_triggers import ZabbixTriggersView, ZabbixSyncTriggersView
+from .views_webhook import ZabbixWebhookView
 from zabbix_integration.views_tree import ZabbixTreeView
 from zabbix_integration.views import ZabbixSyncAllItemsView
 
@@ -20,6 +21,7 @@ urlpatterns = [
     path("zabbix/sync/items/", ZabbixSyncItemsView.as_view()),
     path("zabbix/sync/events/", ZabbixSyncEventsView.as_view()),
     path("zabbix/sync/history/", ZabbixSyncHistoryView.as_view()),
+    path("zabbix/history/series/", ZabbixHistorySeriesView.as_view(), name="zabbix-history-series"),
     path("zabbix/sync/templates/", ZabbixSyncTemplatesView.as_view()),
     path("zabbix/sync/users/", ZabbixSyncUsersView.as_view()),
     path("zabbix/sync/sla/", ZabbixSyncSLAView.as_view()),
@@ -35,5 +37,8 @@ urlpatterns = [
     path("zabbix/sync/triggers/", ZabbixSyncTriggersView.as_view(), name="zabbix-sync-triggers"),
     path("zabbix/tree/", ZabbixTreeView.as_view()),
     path("zabbix/sync/all-items/", ZabbixSyncAllItemsView.as_view(), name="zabbix-sync-all-items"),
+    path("zabbix/client-pool/metrics/", ZabbixClientPoolMetricsView.as_view(), name="zabbix-client-pool-metrics"),
+    path("zabbix/sync/metrics/", ZabbixSyncMetricsView.as_view(), name="zabbix-sync-metrics"),
+    path("zabbix/webhook/<int:cliente_id>/", ZabbixWebhookView.as_view(), name="zabbix-webhook"),
 ]
 urlpatterns += router.urls
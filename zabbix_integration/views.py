@@ -1,4 +1,5 @@
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -8,6 +9,8 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import ZabbixConnection
 from .serializers import ZabbixConnectionSerializer
 from .services.sync import get_client_for_cliente
+from .services.client_pool import get_client_pool
+from .services.sync_lock import sync_lock_metrics
 from .services.sync_level1 import sync_level1
 from .servico import sync_hosts
 
@@ -19,6 +22,16 @@ class ZabbixConnectionViewSet(ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = {"cliente": ["exact"], "ativo": ["exact"]}
 
+    @action(detail=True, methods=["post"], url_path="webhook-token")
+    def webhook_token(self, request, pk=None):
+        """
+        POST /api/zabbix/connections/<id>/webhook-token/
+        Gera (ou troca) o token do webhook. O token só é exibido nesta resposta.
+        """
+        conn = self.get_object()
+        token = conn.gerar_webhook_token()
+        return Response({"webhook_token": token, "url": f"/api/zabbix/webhook/{conn.cliente_id}/"})
+
 
 class ZabbixHostsView(APIView):
     """
@@ -40,6 +53,33 @@ class ZabbixHostsView(APIView):
         return Response(result)
 
 
+class ZabbixClientPoolMetricsView(APIView):
+    """
+    GET /api/zabbix/client-pool/metrics/
+    Métricas do pool de clients deste processo (logins e handshakes evitados).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_client_pool().metrics())
+
+
+class ZabbixSyncMetricsView(APIView):
+    """
+    GET /api/zabbix/sync/metrics/
+    Execuções puladas (lock ocupado) e enfileiramentos descartados por cliente.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        clientes = sync_lock_metrics()
+        return Response({
+            "runs_skipped": sum(c["runs_skipped"] for c in clientes),
+            "runs_coalesced": sum(c["runs_coalesced"] for c in clientes),
+            "clientes": clientes,
+        })
+
+
 class ZabbixProblemsView(APIView):
     """
     GET /api/zabbix/problems/?cliente=1
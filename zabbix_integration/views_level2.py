@@ -4,6 +4,9 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from zabbix_integration.services.sync_level2 import sync_items, sync_events, sync_history
+from zabbix_integration.services.history_rollup import get_series
+from zabbix_integration.models import ZabbixItem
+from django.utils.dateparse import parse_datetime
 
 
 from rest_framework.views import APIView
@@ -105,5 +108,60 @@ class ZabbixSyncHistoryView(APIView):
         time_till = datetime.utcnow()
         time_from = time_till - timedelta(hours=hours)
 
-        sync_history(cliente_id=cliente, itemids=itemids, time_from=time_from, time_till=time_till)
-        return Response({"status": "ok"})
+        summary = sync_history(cliente_id=cliente, itemids=itemids, time_from=time_from, time_till=time_till)
+        return Response({"status": "ok", **summary})
+
+
+class ZabbixHistorySeriesView(APIView):
+    """
+    GET /api/zabbix/history/series/?cliente=1&itemid=12345&hours=720&max_points=500
+    (ou time_from/time_till ISO no lugar de hours)
+
+    Escolhe sozinho a resolução (bruto, 5m, 1h ou 1d) que cabe em max_points.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        cliente = request.query_params.get("cliente")
+        itemid = request.query_params.get("itemid")
+
+        if not cliente or not itemid:
+            return Response(
+                {"detail": "Informe ?cliente=ID&itemid=ITEMID"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            max_points = int(request.query_params.get("max_points") or 0) or None
+            hours = int(request.query_params.get("hours", 24))
+        except ValueError:
+            return Response(
+                {"detail": "max_points/hours devem ser inteiros"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        time_from = parse_datetime(request.query_params.get("time_from") or "")
+        time_till = parse_datetime(request.query_params.get("time_till") or "")
+        if not time_till:
+            time_till = datetime.utcnow()
+        if not time_from:
+            time_from = time_till - timedelta(hours=hours)
+
+        item_pk = (
+            ZabbixItem.objects
+            .filter(cliente_id=cliente, itemid=str(itemid))
+            .values_list("id", flat=True)
+            .first()
+        )
+        if not item_pk:
+            return Response({"detail": "Item não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        serie = get_series(item_pk, time_from, time_till, max_points=max_points)
+
+        return Response({
+            "cliente": int(cliente),
+            "itemid": str(itemid),
+            "time_from": time_from,
+            "time_till": time_till,
+            **serie,
+        })
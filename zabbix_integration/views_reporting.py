@@ -7,7 +7,9 @@ from .services.reporting import build_monthly_sla_report
 
 class ZabbixMonthlyReportView(APIView):
     """
-    GET /api/zabbix/report/monthly/?cliente=1&year=2026&month=1
+    GET /api/zabbix/report/monthly/?cliente=1&year=2026&month=1[&refresh=1]
+
+    Meses fechados vêm do cache local (ZabbixSLAMensal); refresh=1 força nova consulta ao Zabbix.
     """
     permission_classes = [IsAuthenticated]
 
@@ -22,5 +24,7 @@ class ZabbixMonthlyReportView(APIView):
                 status=400,
             )
 
-        data = build_monthly_sla_report(int(cliente), int(year), int(month))
+        refresh = request.query_params.get("refresh") in ("1", "true", "True")
+
+        data = build_monthly_sla_report(int(cliente), int(year), int(month), refresh=refresh)
         return Response(data)
@@ -1,3 +1,7 @@
+import json
+
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -10,77 +14,153 @@ from zabbix_integration.models import (
 )
 
 
-class ZabbixTreeView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        cliente_id = request.query_params.get("cliente")
-
-        if not cliente_id:
-            return Response({"detail": "Informe ?cliente=ID"}, status=400)
-
-        hosts = ZabbixHost.objects.filter(cliente_id=cliente_id)
-
-        tree = []
-
-        for host in hosts:
-            host_data = {
-                "hostid": host.hostid,
-                "hostname": getattr(host, "hostname", None),
-                "items": []
-            }
-
-            # 🔥 ajuste aqui: use o related_name correto
-            items = getattr(host, "items", None)
-
-            if items:
-                items = items.all()
-            else:
-                items = ZabbixItem.objects.filter(host=host)
-
-            for item in items:
-                item_data = {
-                    "itemid": item.itemid,
-                    "name": item.name,
-                    "triggers": []
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+DEFAULT_EVENTS_PER_TRIGGER = 5
+MAX_EVENTS_PER_TRIGGER = 50
+MAX_DEPTH = 4  # 1 hosts, 2 + items, 3 + triggers, 4 + eventos
+
+# hosts montados (e enviados) por vez: 4 consultas por lote
+STREAM_BATCH = 50
+
+
+def _int_param(params, name, default, minimo, maximo):
+    try:
+        valor = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' deve ser inteiro")
+    return max(minimo, min(valor, maximo))
+
+
+def _prefetches(depth: int, events_limit: int) -> list:
+    prefetches = []
+
+    if depth >= 2:
+        prefetches.append(Prefetch(
+            "items",
+            queryset=ZabbixItem.objects.only("id", "host_id", "itemid", "name").order_by("itemid"),
+            to_attr="tree_items",
+        ))
+
+    if depth >= 3:
+        prefetches.append(Prefetch(
+            "tree_items__triggers",
+            queryset=ZabbixTrigger.objects.only("id", "triggerid", "description").order_by("triggerid"),
+            to_attr="tree_triggers",
+        ))
+
+    if depth >= 4:
+        # 🔥 só os N eventos mais recentes de cada trigger (window function no banco)
+        prefetches.append(Prefetch(
+            "tree_items__tree_triggers__zabbixevent_set",
+            queryset=ZabbixEvent.objects.only(
+                "id", "trigger_id", "eventid", "severity", "acknowledged", "clock"
+            ).order_by("-clock")[:events_limit],
+            to_attr="tree_events",
+        ))
+
+    return prefetches
+
+
+def _host_data(host, depth: int) -> dict:
+    host_data = {
+        "hostid": host.hostid,
+        "hostname": host.hostname,
+    }
+
+    if depth < 2:
+        return host_data
+
+    host_data["items"] = []
+    for item in host.tree_items:
+        item_data = {
+            "itemid": item.itemid,
+            "name": item.name,
+        }
+
+        if depth >= 3:
+            item_data["triggers"] = []
+            for trigger in item.tree_triggers:
+                trigger_data = {
+                    "triggerid": trigger.triggerid,
+                    "description": trigger.description,
                 }
 
-                triggers = getattr(item, "triggers", None)
+                if depth >= 4:
+                    trigger_data["events"] = [
+                        {
+                            "eventid": event.eventid,
+                            "severity": event.severity,
+                            "acknowledged": event.acknowledged,
+                            "clock": event.clock.isoformat() if event.clock else None,
+                        }
+                        for event in trigger.tree_events
+                    ]
 
-                if triggers:
-                    triggers = triggers.all()
-                else:
-                    triggers = ZabbixTrigger.objects.filter(items=item)
+                item_data["triggers"].append(trigger_data)
 
-                for trigger in triggers:
-                    trigger_data = {
-                        "triggerid": trigger.triggerid,
-                        "description": getattr(trigger, "description", None),
-                        "events": []
-                    }
+        host_data["items"].append(item_data)
 
-                    events = getattr(trigger, "events", None)
+    return host_data
 
-                    if events:
-                        events = events.all()
-                    else:
-                        events = ZabbixEvent.objects.filter(trigger=trigger)
 
-                    for event in events:
-                        trigger_data["events"].append({
-                            "eventid": event.eventid,
-                            "severity": event.severity,
-                            "acknowledged": event.acknowledged,
-                            "clock": event.clock.isoformat() if event.clock else None,
-                        })
+class ZabbixTreeView(APIView):
+    """
+    GET /api/zabbix/tree/?cliente=1&page=1&page_size=100&depth=4&events_limit=5
 
-                    item_data["triggers"].append(trigger_data)
+    Árvore host -> items -> triggers -> eventos recentes, paginada por host.
+    Cada lote de hosts é montado com 4 consultas (prefetch) e enviado assim que
+    fica pronto (JSON em streaming).
+    """
+    permission_classes = [IsAuthenticated]
 
-                host_data["items"].append(item_data)
+    def get(self, request):
+        cliente_id = request.query_params.get("cliente")
 
-            tree.append(host_data)
+        if not cliente_id:
+            return Response({"detail": "Informe ?cliente=ID"}, status=400)
 
-        return Response({
-            "cliente": cliente_id,
-            "hosts": tree
-        })
\ No newline at end of file
+        try:
+            page = _int_param(request.query_params, "page", 1, 1, 10**6)
+            page_size = _int_param(request.query_params, "page_size", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+            depth = _int_param(request.query_params, "depth", MAX_DEPTH, 1, MAX_DEPTH)
+            events_limit = _int_param(
+                request.query_params, "events_limit", DEFAULT_EVENTS_PER_TRIGGER, 1, MAX_EVENTS_PER_TRIGGER
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        hosts = ZabbixHost.objects.filter(cliente_id=cliente_id).order_by("hostid")
+        total_hosts = hosts.count()
+
+        offset = (page - 1) * page_size
+        host_pks = list(hosts.values_list("id", flat=True)[offset:offset + page_size])
+
+        prefetches = _prefetches(depth, events_limit)
+
+        def _stream():
+            cabecalho = {
+                "cliente": cliente_id,
+                "page": page,
+                "page_size": page_size,
+                "depth": depth,
+                "total_hosts": total_hosts,
+            }
+            yield json.dumps(cabecalho)[:-1] + ', "hosts": ['
+
+            primeiro = True
+            for i in range(0, len(host_pks), STREAM_BATCH):
+                lote = (
+                    ZabbixHost.objects
+                    .filter(id__in=host_pks[i:i + STREAM_BATCH])
+                    .only("id", "hostid", "hostname")
+                    .order_by("hostid")
+                    .prefetch_related(*prefetches)
+                )
+                for host in lote:
+                    yield ("" if primeiro else ",") + json.dumps(_host_data(host, depth))
+                    primeiro = False
+
+            yield "]}"
+
+        return StreamingHttpResponse(_stream(), content_type="application/json")
@@ -0,0 +1,62 @@
+from django.db import transaction
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from zabbix_integration.services.webhook import (
+    WebhookPayloadError,
+    authenticate_webhook,
+    claim_flush,
+    enqueue_webhook_events,
+    get_flush_delay,
+    token_from_request,
+)
+from zabbix_integration.tasks import flush_webhook_events_task
+
+
+class ZabbixWebhookView(APIView):
+    """
+    POST /api/zabbix/webhook/<cliente_id>/
+
+    Recebe eventos de problema/recuperação de um media type Webhook do Zabbix.
+    Autenticação: "Authorization: Bearer <webhook_token>" ou "X-Zabbix-Token: <webhook_token>"
+    (token da ZabbixConnection do cliente).
+
+    Body (objeto ou lista):
+    {
+      "eventid": "{EVENT.ID}",
+      "value": "{EVENT.VALUE}",
+      "triggerid": "{TRIGGER.ID}",
+      "recovery_eventid": "{EVENT.RECOVERY.ID}",
+      "date": "{EVENT.DATE}", "time": "{EVENT.TIME}",
+      "recovery_date": "{EVENT.RECOVERY.DATE}", "recovery_time": "{EVENT.RECOVERY.TIME}",
+      "severity": "{EVENT.NSEVERITY}",
+      "name": "{EVENT.NAME}",
+      "hostid": "{HOST.ID}",
+      "hostname": "{HOST.NAME}",
+      "acknowledged": "{EVENT.ACK.STATUS}"
+    }
+
+    Responde 202: os eventos ficam no buffer e são gravados em lote pelo flush.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request, cliente_id: int):
+        conn = authenticate_webhook(cliente_id, token_from_request(request))
+        if not conn:
+            return Response({"detail": "token inválido"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            with transaction.atomic():
+                recebidos = enqueue_webhook_events(conn, request.data)
+        except WebhookPayloadError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ⏱️ um flush por janela curta, não um por requisição
+        if claim_flush():
+            flush_webhook_events_task.apply_async(countdown=get_flush_delay())
+
+        return Response({"recebidos": recebidos}, status=status.HTTP_202_ACCEPTED)